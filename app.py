@@ -1,562 +1,1389 @@
+if __name__ == '__main__':
+    # Antes de qualquer outro import (veja async_mode.py).
+    from async_mode import monkey_patch
+    monkey_patch()
+
 import os
-from flask import Flask, render_template, request, redirect, url_for, session
-from flask_socketio import SocketIO, emit, join_room, leave_room
+import secrets
+import signal
+import time
+from functools import wraps
+from flask import Flask, Response, abort, jsonify, render_template, request, redirect, url_for, session
+from flask_socketio import SocketIO, emit as socketio_emit, join_room, leave_room
+
+from assets import IMMUTABLE_CACHE_CONTROL, AssetPipeline, PageCache
+from async_mode import is_monkey_patched, start_daemon_task
+from event_log import EventLog
+from drain import DrainController
+from event_recorder import EventRecorder
+from fanout import fanout_emit
+from bots import HangmanBot, HangmanWordIndex, TicTacToeBook, TicTacToeBot
+from engines import InvalidMove, create_engines
+from lobby import LobbyIndex
+from match_history import MatchHistory
+from matchmaking import MatchmakingQueue
+from metrics import MetricsRegistry, SocketIOMetrics
+from rate_limit import RateLimiter, parse_rate_limits
+from room_lifecycle import RoomLifecycle
+from room_store import create_room_store
+from timer_wheel import TimerWheel
+from transport import CLIENT_BUNDLES, WebSocketDeflateFilter, payload_size_function, socketio_transport_options
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.urandom(24) 
-socketio = SocketIO(app)
+# Com SOCKETIO_MESSAGE_QUEUE (ex.: redis://...) os emits são repassados entre
+# vários workers; ROOM_STORE_URL compartilha o estado das salas entre eles.
+# Com Redis e eventlet/gevent o processo precisa do monkey patching (serve.py
+# e `python app.py` fazem isso; veja async_mode.py).
+# SOCKETIO_ASYNC_MODE escolhe eventlet, gevent ou threading (padrão: detecção
+# automática); os handlers travam a sala que alteram, então todos são seguros.
+# SOCKETIO_SERIALIZER=msgpack troca o JSON por MessagePack (servidor e
+# clientes); respostas HTTP acima de COMPRESSION_THRESHOLD bytes são
+# comprimidas e WEBSOCKET_DEFLATE=0 desliga o permessage-deflate.
+SOCKETIO_SERIALIZER = os.environ.get('SOCKETIO_SERIALIZER', 'json')
+socketio = SocketIO(app, message_queue=os.environ.get('SOCKETIO_MESSAGE_QUEUE'),
+                    async_mode=os.environ.get('SOCKETIO_ASYNC_MODE'),
+                    **socketio_transport_options(
+                        SOCKETIO_SERIALIZER,
+                        http_compression=os.environ.get('HTTP_COMPRESSION', '1') != '0',
+                        compression_threshold=int(os.environ.get('COMPRESSION_THRESHOLD', '1024'))))
+if os.environ.get('WEBSOCKET_DEFLATE', '1') == '0':
+    app.wsgi_app = WebSocketDeflateFilter(app.wsgi_app)
+
+# Motores dos jogos por game_id. HANGMAN_MAX_PLAYERS > 2 abre as salas da
+# Forca para vários adivinhadores, que chutam em turnos, e RPS_MAX_PLAYERS > 2
+# transforma as salas do PPT num torneio todos contra todos (veja RPSEngine).
+# RPS_ROUND_TIMEOUT é o prazo, em segundos, para o segundo jogador escolher no
+# PPT depois que o primeiro escolheu; ao vencer, a rodada vai para quem escolheu.
+GAME_ENGINES = create_engines({
+    'hangman': {'max_players': int(os.environ.get('HANGMAN_MAX_PLAYERS', '2'))},
+    'rock-paper-scissors': {'max_players': int(os.environ.get('RPS_MAX_PLAYERS', '2')),
+                            'round_timeout': float(os.environ.get('RPS_ROUND_TIMEOUT', '15'))}
+})
+
+# Com Redis o lock de sala expira após ROOM_LOCK_TIMEOUT segundos (worker que
+# morreu não prende a sala); um handler que passe disso é registrado no log.
+store = create_room_store(
+    os.environ.get('ROOM_STORE_URL'), int(os.environ.get('ROOM_LOCK_STRIPES', '64')),
+    lock_timeout=float(os.environ.get('ROOM_LOCK_TIMEOUT', '5')),
+    on_lock_lost=lambda room_id: log.error('room_lock_lost', room_id=room_id, timeout=store.lock_timeout)
+)
+if ((os.environ.get('ROOM_STORE_URL') or os.environ.get('SOCKETIO_MESSAGE_QUEUE'))
+        and not is_monkey_patched(socketio.server.eio.async_mode)):
+    raise RuntimeError(f'Redis com {socketio.server.eio.async_mode} exige monkey patching: suba com serve.py, '
+                       'python app.py ou um worker do gunicorn que o faça (veja async_mode.py).')
+matchmaking = MatchmakingQueue()
+
+# Salas ociosas são encerradas após estes tempos (em segundos), conforme o
+# status: aguardando oponente, em jogo ou com a partida terminada. MAX_ROOMS
+# limita o total de salas (0 desativa o limite).
+lifecycle = RoomLifecycle(
+    idle_timeout=float(os.environ.get('ROOM_IDLE_TIMEOUT', '900')),
+    waiting_timeout=float(os.environ.get('ROOM_WAITING_TIMEOUT', '600')),
+    finished_timeout=float(os.environ.get('ROOM_FINISHED_TIMEOUT', '300')),
+    max_rooms=int(os.environ.get('MAX_ROOMS', '10000')) or None
+)
+ROOM_SWEEP_INTERVAL = float(os.environ.get('ROOM_SWEEP_INTERVAL', '5'))
+# Por quantos segundos o lugar de um jogador que caiu no meio da partida fica
+# reservado para ele voltar com o token de sessão (0 desativa a reconexão).
+RECONNECT_GRACE_PERIOD = float(os.environ.get('RECONNECT_GRACE_PERIOD', '30'))
+
+# Limites de taxa por sid e evento (token bucket). RATE_LIMITS sobrescreve os
+# padrões, ex.: "chat_message=2/5,rps_choice=off"; "off" desativa todos.
+limiter = RateLimiter(parse_rate_limits(os.environ.get('RATE_LIMITS')))
+CHAT_MAX_LENGTH = int(os.environ.get('CHAT_MAX_LENGTH', '500'))
+# Limite de espectadores por sala (0 desativa o modo espectador).
+MAX_SPECTATORS_PER_ROOM = int(os.environ.get('MAX_SPECTATORS_PER_ROOM', '200'))
+
+# Bots: quem está sozinho numa sala de Jogo da Velha ou Forca pode chamar um
+# oponente automático. A jogada do bot roda na roda de temporizadores,
+# BOT_MOVE_DELAY segundos depois que chega a vez dele, nunca no handler de quem
+# jogou. HANGMAN_WORDLIST aponta para a lista de palavras do bot da Forca.
+BOT_MOVE_DELAY = float(os.environ.get('BOT_MOVE_DELAY', '0.8'))
+GAME_BOTS = {
+    'tic-tac-toe': TicTacToeBot(TicTacToeBook()),
+    'hangman': HangmanBot(HangmanWordIndex.from_file(
+        os.environ.get('HANGMAN_WORDLIST', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hangman_words.txt'))))
+}
+
+# Diretório de salas: os inscritos no lobby recebem as mudanças acumuladas no
+# máximo a cada LOBBY_UPDATE_INTERVAL segundos; listagens vêm em páginas.
+lobby = LobbyIndex(update_interval=float(os.environ.get('LOBBY_UPDATE_INTERVAL', '1')))
+LOBBY_PAGE_SIZE = int(os.environ.get('LOBBY_PAGE_SIZE', '50'))
+
+# Log estruturado (JSON lines) escrito em lotes por uma green thread. Eventos de
+# alto volume (chat e jogadas) são amostrados com LOG_SAMPLE_RATE.
+_high_volume_sample_rate = float(os.environ.get('LOG_SAMPLE_RATE', '0.1'))
+log = EventLog(
+    level=os.environ.get('LOG_LEVEL', 'info'),
+    sample_rates={event: _high_volume_sample_rate for event in ('chat_message', 'rps_choice', 'hangman_guess')}
+)
+
+# Partidas terminadas e ranking: gravados no SQLite (MATCH_HISTORY_DB) em
+# lotes por uma thread de fundo; o ranking é servido da memória. O banco só é
+# aberto pelo init_runtime().
+app.config['MATCH_HISTORY_DB'] = os.environ.get('MATCH_HISTORY_DB', 'match_history.db')
+match_history = MatchHistory(on_error=lambda exc: log.error('match_history_flush_failed', error=repr(exc)))
+
+# Temporizadores de todas as salas (prazos de rodada, reconexão) numa única
+# roda; os broadcasts acumulados são enviados uma vez por tick (TIMER_TICK).
+timers = TimerWheel(
+    tick=float(os.environ.get('TIMER_TICK', '0.05')),
+    on_error=lambda callback, exc: log.error('timer_failed', callback=getattr(callback, '__name__', repr(callback)), error=repr(exc))
+)
+
+# Métricas expostas em /metrics. O tamanho dos payloads é amostrado a cada
+# METRICS_BYTES_SAMPLE_EVERY emits de cada evento.
+metrics_registry = MetricsRegistry()
+socket_metrics = SocketIOMetrics(metrics_registry, int(os.environ.get('METRICS_BYTES_SAMPLE_EVERY', '10')),
+                                 payload_size_function(SOCKETIO_SERIALIZER))
+metrics_registry.gauge('active_rooms', 'Salas existentes no store.', store.room_count)
+metrics_registry.gauge('active_players', 'Jogadores associados a uma sala.', store.user_count)
+metrics_registry.gauge('matchmaking_waiting_players', 'Jogadores aguardando na fila de matchmaking.', matchmaking.waiting_count)
+metrics_registry.gauge('lobby_rooms', 'Salas no diretório do lobby deste worker.', lobby.room_count)
+metrics_registry.gauge('match_history_pending', 'Partidas aguardando gravação no SQLite.', match_history.pending_count)
+rooms_closed = metrics_registry.counter('rooms_closed_total', 'Salas encerradas pelo servidor (inatividade ou limite).', 'reason')
+events_rate_limited = metrics_registry.counter(
+    'socketio_events_rate_limited_total', 'Eventos descartados pelo limite de taxa.', 'event')
+chat_messages_rejected = metrics_registry.counter(
+    'chat_messages_rejected_total', 'Mensagens de chat descartadas por tamanho ou formato.')
+spectator_deliveries = metrics_registry.counter(
+    'spectator_deliveries_total', 'Pacotes entregues a espectadores (codificados uma vez por atualização).', 'event')
+
+# Com EVENT_RECORD_PATH cada evento recebido é gravado para replay offline
+# (benchmarks/replay.py). Com vários workers use {pid} no caminho para cada
+# processo gravar o próprio arquivo.
+_event_record_path = os.environ.get('EVENT_RECORD_PATH')
+recorder = EventRecorder(_event_record_path.format(pid=os.getpid())) if _event_record_path else None
+if recorder:
+    metrics_registry.gauge('event_recorder_dropped', 'Eventos não gravados por fila cheia.', lambda: recorder.dropped)
+
+def instrument(event):
+    # Métricas do handler e, se ligada, a gravação do evento recebido.
+    def decorator(handler):
+        handler = socket_metrics.instrument(event)(handler)
+        if recorder:
+            handler = recorder.wrap(event, handler, lambda: request.sid)
+        return handler
+    return decorator
+
+def emit(event, *args, **kwargs):
+    # Todos os emits dos handlers passam por aqui para alimentar as métricas.
+    source = getattr(request, 'event', None)
+    socket_metrics.count_emit(event, args, source['message'] if source else None)
+    return socketio_emit(event, *args, **kwargs)
+
+def broadcast(event, data, to):
+    # Emit que também funciona fora de um handler (tarefas em segundo plano).
+    socket_metrics.count_emit(event, (data,))
+    socketio.emit(event, data, to=to)
+
+def emit_to_room(event, data, room_id, room_data, **kwargs):
+    # Atualização da partida: vai para os jogadores e é repetida para os espectadores.
+    emit(event, data, room=room_id, **kwargs)
+    spectator_broadcast(event, data, room_id, room_data)
+
+def broadcast_to_room(event, data, room_id, room_data):
+    broadcast(event, data, room_id)
+    spectator_broadcast(event, data, room_id, room_data)
+
+def rate_limited(event):
+    """Descarta o evento, antes de qualquer lógica de jogo, se o sid estourou o limite."""
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            player_sid = request.sid
+            if limiter.allow(player_sid, event):
+                return handler(*args, **kwargs)
+            events_rate_limited.inc(event)
+            if limiter.should_notify(player_sid, event):
+                emit('rate_limited', {
+                    'event': event,
+                    'retry_after': limiter.retry_after(player_sid, event),
+                    'message': 'Você está enviando ações rápido demais. Aguarde um instante.'
+                }, room=player_sid)
+                log.warning('rate_limited', sid=player_sid, source_event=event)
+        return wrapper
+    return decorator
+
+def room_locked(handler):
+    """Executa o handler segurando o lock da sala indicada em data['room_id']."""
+    @wraps(handler)
+    def wrapper(data, *args, **kwargs):
+        room_id = data.get('room_id') if isinstance(data, dict) else None
+        if not isinstance(room_id, str):
+            emit('game_error', {'message': 'Sala inválida.'}, room=request.sid)
+            return
+        with store.lock(room_id):
+            return handler(data, *args, **kwargs)
+    return wrapper
 
-game_rooms = {}
-sid_to_user_info = {}
+# 'delta' envia apenas o que mudou em cada jogada; 'full' mantém os payloads
+# completos. Nos dois modos cada atualização leva o número de sequência da sala.
+app.config['STATE_UPDATES'] = os.environ.get('STATE_UPDATES', 'delta')
 
-# --- Funções de Inicialização dos Jogos ---
-def initialize_tic_tac_toe_game():
-    return {
-        'board': ['', '', '', '', '', '', '', '', ''],
-        'current_turn': None,
-        'players_map': {},
-        'winner': None,
-        'moves_count': 0
-    }
+# --- Motores dos Jogos ---
+def room_engine(room_data):
+    return GAME_ENGINES[room_data['game_type']]
 
-def initialize_rps_game():
-    return {
-        'player1_choice': None,
-        'player2_choice': None,
-        'player1_sid': None,
-        'player2_sid': None,
-        'round_winner': None,
-        'scores': {},  # SID: score
-        'round_ready': 0
-    }
 
-def initialize_hangman_game():
+# --- Sequência de Atualizações ---
+def next_seq(room_data):
+    room_data['seq'] = room_data.get('seq', 0) + 1
+    return room_data['seq']
+
+def delta_updates_enabled():
+    return app.config['STATE_UPDATES'] == 'delta'
+
+def build_room_snapshot(room_data, room_id, player_sid):
+    # O motor esconde o que este participante não pode ver (palavra secreta, escolha do oponente).
+    game_state = room_engine(room_data).serialize(room_data['game_state'], player_sid) if room_data['game_state'] else {}
     return {
-        'secret_word': '',
-        'guessed_letters': [],
-        'wrong_guesses': 0,
-        'max_wrong_guesses': 6,
-        'word_display': '',
-        'game_over': False,
-        'game_winner': None,
-        'setter_sid': None,
-        'guesser_sid': None
+        'room_id': room_id,
+        'seq': room_data.get('seq', 0),
+        'game_type': room_data['game_type'],
+        'state': game_state,
+        'players_sids': room_data['players'],
+        'usernames': room_data['usernames'],
+        'disconnected_sids': list(room_data.get('disconnected', {}))
     }
 
 
+# --- Ciclo de Vida das Salas ---
+# Motivo do encerramento -> mensagem mostrada aos jogadores da sala.
+ROOM_CLOSED_MESSAGES = {
+    'no_opponent': 'Nenhum oponente entrou a tempo. A sala foi encerrada.',
+    'idle': 'A sala foi encerrada por inatividade.',
+    'finished': 'A sala foi encerrada após o fim do jogo sem uma nova partida.',
+    'evicted': 'O servidor atingiu o limite de salas e esta sala, que aguardava um oponente, foi encerrada.',
+    'shutdown': 'O servidor foi reiniciado para uma atualização. Entre novamente em uma sala.'
+}
+IDLE_CLOSE_REASONS = {'waiting': 'no_opponent', 'playing': 'idle', 'finished': 'finished'}
+
+def room_status(room_data):
+    if len(room_data['players']) < room_engine(room_data).min_players:
+        return 'waiting'
+    if room_data['game_state'] is not None and room_data['game_state'].is_over():
+        return 'finished'
+    return 'playing'
+
+def save_room(room_id, room_data):
+    # Toda gravação conta como atividade; o horário vai junto para que outros
+    # workers o vejam antes de encerrar a sala.
+    room_data['last_activity'] = time.time()
+    store.save_room(room_id, room_data)
+    lifecycle.touch(room_id, room_status(room_data), room_data['last_activity'])
+    lobby.update(room_id, room_data['game_type'], lobby_entry(room_id, room_data))
+
+def delete_room(room_id):
+    store.delete_room(room_id)
+    lifecycle.forget(room_id)
+    lobby.remove(room_id)
+    timers.cancel(('round', room_id))
+    timers.cancel(('bot', room_id))
+    pending_rounds.pop(room_id, None)
+    for bot in GAME_BOTS.values():
+        bot.forget(room_id)
+
+def close_room(room_id, reason):
+    """Encerra a sala pelo servidor: avisa os jogadores e libera sala e usuários."""
+    with store.lock(room_id):
+        room_data = store.get_room(room_id)
+        lifecycle.forget(room_id)
+        if room_data is None:
+            return
+        broadcast_to_room('room_closed', {'room_id': room_id, 'reason': reason, 'message': ROOM_CLOSED_MESSAGES[reason]}, room_id, room_data)
+        record_series(room_id, room_data)
+        for sid in room_data['players']:
+            store.delete_user(sid)
+        dismiss_spectators(room_id, room_data)
+        socketio.server.close_room(room_id, namespace='/')
+        delete_room(room_id)
+    rooms_closed.inc(reason)
+    log.info('room_deleted', room_id=room_id, reason=reason, players=list(room_data['players']))
+
+def ensure_room_capacity():
+    """Abre espaço para uma sala nova; retorna False se o limite não permite."""
+    while lifecycle.is_full(store.room_count()):
+        victim = lifecycle.oldest_waiting()
+        if victim is None:
+            return False
+        close_room(victim, 'evicted')
+    return True
+
+def sweep_idle_rooms():
+    closed = 0
+    for room_id, status in lifecycle.pop_expired():
+        room_data = store.get_room(room_id)
+        if room_data is None:
+            lifecycle.forget(room_id)
+            continue
+        # Com vários workers a atividade mais recente pode ter sido gravada por outro.
+        status = room_status(room_data)
+        last_activity = max(room_data.get('last_activity', 0), lifecycle.last_activity(room_id) or 0)
+        if last_activity + lifecycle.timeouts[status] > time.time():
+            lifecycle.touch(room_id, status, last_activity)
+            continue
+        close_room(room_id, IDLE_CLOSE_REASONS[status])
+        closed += 1
+        if closed % 100 == 0:
+            socketio.sleep(0) # Muitas salas vencendo juntas: cede o hub
+    return closed
+
+def run_room_sweeper():
+    while True:
+        socketio.sleep(ROOM_SWEEP_INTERVAL)
+        try:
+            sweep_idle_rooms()
+        except Exception as exc:
+            log.error('room_sweep_failed', error=repr(exc))
+
+
+# --- Histórico de Partidas ---
+def record_match(room_id, room_data, winner_sid, details=None):
+    """Enfileira o resultado da partida, por nome de usuário, para o histórico e o ranking."""
+    if room_data.get('bots'):
+        return # Partidas contra o bot não entram no ranking
+    usernames = room_data['usernames']
+    results = [
+        (usernames[sid], 'draw' if winner_sid == 'draw' else 'win' if sid == winner_sid else 'loss')
+        for sid in room_data['players'] if sid in usernames
+    ]
+    match_history.record_match(room_data['game_type'], room_id, results, details)
+
+def record_series(room_id, room_data):
+    # Jogos sem fim de partida (séries de rodadas) vão ao histórico quando a
+    # série é reiniciada ou quando a sala acaba.
+    game_state = room_data['game_state']
+    result = room_engine(room_data).series_result(game_state) if game_state is not None else None
+    if result is not None:
+        record_match(room_id, room_data, *result)
+
+
+# --- Saúde e Drenagem ---
+# /healthz responde enquanto o processo estiver de pé; /readyz sai do ar (503)
+# durante a drenagem ou sem acesso ao store, para o balanceador parar de
+# mandar conexões novas. A drenagem começa com SIGTERM (serve.py instala o
+# handler): partidas novas são recusadas e os clientes avisados. Com o estado
+# num store compartilhado (ROOM_STORE_URL) as salas já estão gravadas e outro
+# worker as retoma pelo resume_session, então o worker sai logo; com o store
+# em memória ele espera as partidas em andamento terminarem (até
+# DRAIN_TIMEOUT segundos) e encerra as salas restantes antes de sair. Os
+# clientes espalham a reconexão por DRAIN_RECONNECT_WINDOW segundos.
+drain = DrainController(timeout=float(os.environ.get('DRAIN_TIMEOUT', '300')))
+DRAIN_RECONNECT_WINDOW = float(os.environ.get('DRAIN_RECONNECT_WINDOW', '10'))
+DRAIN_POLL_INTERVAL = 1.0
+DRAIN_MESSAGE = 'O servidor está sendo atualizado: novas partidas estão suspensas por alguns instantes.'
+STARTED_AT = time.time()
+metrics_registry.gauge('draining', 'Vale 1 enquanto o worker drena para sair.', lambda: int(drain.draining))
+
+def refuse_if_draining(player_sid, event='error'):
+    # Durante a drenagem nada que comece uma partida nova é aceito.
+    if not drain.draining:
+        return False
+    emit(event, {'message': DRAIN_MESSAGE}, room=player_sid)
+    return True
+
+def room_in_progress(room_id):
+    room_data = store.get_room(room_id)
+    if room_data is None or len(room_data['players']) < room_engine(room_data).min_players:
+        return False
+    return room_engine(room_data).in_progress(room_data['game_state'])
+
+def local_sids():
+    # Conexões deste worker: o manager só conhece as próprias, mesmo com fila de mensagens.
+    manager = socketio.server.manager
+    if '/' not in manager.rooms:
+        return []
+    return [sid for sid, _ in manager.get_participants('/', None)]
+
+def begin_drain():
+    # Chamado pelo handler do sinal, que no eventlet roda dentro do hub: ali não
+    # dá para criar nem trocar de greenlet, então só marca e o vigia faz o resto.
+    drain.begin()
+
+def run_drain_watcher():
+    while not drain.draining:
+        socketio.sleep(DRAIN_POLL_INTERVAL)
+    log.info('drain_started', shared_state=store.shared, connections=len(local_sids()))
+    run_drain()
+
+def run_drain():
+    notice = {'message': DRAIN_MESSAGE, 'shared_state': store.shared,
+              'reconnect_window_ms': int(DRAIN_RECONNECT_WINDOW * 1000)}
+    for sid in local_sids():
+        broadcast('server_draining', notice, sid)
+    if not store.shared:
+        while True:
+            active = sum(1 for room_id in lifecycle.room_ids() if room_in_progress(room_id))
+            if drain.should_exit(active):
+                break
+            socketio.sleep(DRAIN_POLL_INTERVAL)
+        for room_id in lifecycle.room_ids():
+            close_room(room_id, 'shutdown')
+    # Tempo para os últimos avisos saírem antes de as conexões caírem.
+    socketio.sleep(DRAIN_POLL_INTERVAL)
+    log.info('drain_finished', elapsed_s=round(drain.elapsed(), 1), timed_out=drain.elapsed() >= drain.timeout)
+    stop_server()
+
+def stop_server():
+    # O que ficou nas filas é gravado pelo shutdown(), depois que o servidor para.
+    log.flush_all()
+    if socketio.server.eio.async_mode == 'eventlet':
+        # socketio.stop() levantaria SystemExit só nesta greenlet; o servidor
+        # roda na greenlet principal, então a exceção vai para lá.
+        import eventlet
+        import greenlet
+        main = greenlet.getcurrent()
+        while main.parent is not None:
+            main = main.parent
+        eventlet.kill(main, SystemExit)
+    else:
+        # socketio.stop() precisaria de uma requisição do servidor do Werkzeug;
+        # o SIGINT tem o mesmo efeito de um Ctrl+C (o serve.py garante que ele
+        # não esteja ignorado).
+        os.kill(os.getpid(), signal.SIGINT)
+
+def shutdown():
+    """Grava histórico, gravação de eventos e log pendentes; o serve.py chama ao sair."""
+    match_history.flush_all()
+    if recorder:
+        recorder.flush_all()
+    log.stop()
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({'status': 'ok', 'uptime_s': round(time.time() - STARTED_AT, 1)})
+
+@app.route('/readyz')
+def readyz():
+    if drain.draining:
+        return jsonify({'status': 'draining', 'draining_for_s': round(drain.elapsed(), 1)}), 503
+    try:
+        store.ping()
+    except Exception as exc:
+        return jsonify({'status': 'unavailable', 'error': repr(exc)}), 503
+    return jsonify({'status': 'ready', 'rooms': store.room_count()})
+
+
+# --- Arquivos Estáticos e Cache de Páginas ---
+# Cada página de jogo carrega um bundle com o script.js e o JS do próprio jogo
+# (game1.html -> game1.js). Os bundles são montados pelo init_runtime() e
+# servidos em /assets com hash no nome; com ASSET_PIPELINE=0, com o servidor em
+# modo debug ou antes de os bundles existirem, as páginas voltam a carregar os
+# arquivos originais de /static. O HTML de cada página é renderizado uma vez
+# (PAGE_CACHE=0 desliga).
+ASSET_BUNDLES = {'style.css': ['css/style.css']}
+for _engine in GAME_ENGINES.values():
+    _page = os.path.splitext(_engine.template)[0]
+    ASSET_BUNDLES[f'{_page}.js'] = ['js/script.js', f'js/{_page}.js']
+ASSET_PIPELINE = os.environ.get('ASSET_PIPELINE', '1') != '0'
+PAGE_CACHE = os.environ.get('PAGE_CACHE', '1') != '0'
+app.config['ASSET_OUTPUT_DIR'] = os.environ.get('ASSET_OUTPUT_DIR', os.path.join(app.static_folder, 'dist'))
+static_assets = AssetPipeline(app.static_folder, ASSET_BUNDLES)
+page_cache = PageCache()
+
+def compressed_response(asset, cache_control):
+    # Versão pré-comprimida conforme o Accept-Encoding, com ETag para 304.
+    encoding, body = asset.variant_for(request.headers.get('Accept-Encoding'))
+    response = Response(body, content_type=asset.mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = cache_control
+    response.set_etag(asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}')
+    return response.make_conditional(request)
+
+def render_page(key, template, **context):
+    if app.debug or not PAGE_CACHE:
+        return render_template(template, **context)
+    page = page_cache.get_or_render(key, lambda: render_template(template, **context))
+    # O navegador revalida a cada visita; sem mudança a resposta é um 304 sem corpo.
+    return compressed_response(page, 'no-cache')
+
+@app.context_processor
+def template_assets():
+    def asset_urls(name):
+        if static_assets.assets and not app.debug:
+            return [url_for('bundled_asset', filename=static_assets.filename(name))]
+        return [url_for('static', filename=source) for source in ASSET_BUNDLES[name]]
+    # O bundle do cliente Socket.IO precisa usar o mesmo serializador do servidor.
+    return {'socketio_client_url': CLIENT_BUNDLES[SOCKETIO_SERIALIZER], 'asset_urls': asset_urls}
+
+@app.route('/assets/<path:filename>')
+def bundled_asset(filename):
+    asset = static_assets.get(filename)
+    if asset is None:
+        abort(404)
+    return compressed_response(asset, IMMUTABLE_CACHE_CONTROL)
+
+
 # --- Rotas do Site ---
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return render_page('index', 'index.html')
 
 @app.route('/game/<game_id>')
 def game_page(game_id):
-    template_map = {
-        'tic-tac-toe': {'template': 'game1.html', 'type': 'TCP'},
-        'rock-paper-scissors': {'template': 'game2.html', 'type': 'UDP'},
-        'hangman': {'template': 'game3.html', 'type': 'Híbrido'}
-    }
-    
-    game_info = template_map.get(game_id)
-    if game_info:
-        return render_template(game_info['template'], game_type=game_info['type'], game_id=game_id)
+    engine = GAME_ENGINES.get(game_id)
+    if engine:
+        return render_page(('game', game_id), engine.template, game_type=engine.connection_type, game_id=game_id)
     else:
         return redirect(url_for('index'))
 
+@app.route('/api/leaderboard')
+def leaderboard():
+    game_id = request.args.get('game') or None
+    if game_id is not None and game_id not in GAME_ENGINES:
+        return jsonify({'error': 'Jogo inválido.'}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    return jsonify({'game': game_id, 'players': match_history.leaderboard(game_id, limit)})
+
+@app.route('/api/lobby')
+def lobby_rooms():
+    game_id = request.args.get('game')
+    if game_id not in GAME_ENGINES:
+        return jsonify({'error': 'Jogo inválido.'}), 400
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', LOBBY_PAGE_SIZE, type=int), 1), 100)
+    rooms, total = lobby.page(game_id, offset, limit)
+    return jsonify({'game': game_id, 'total': total, 'offset': offset, 'rooms': rooms})
+
+@app.route('/metrics')
+def metrics():
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
 
 # --- Eventos de Conexão/Desconexão do SocketIO ---
 @socketio.on('connect')
-def handle_connect():
-    print(f'Cliente conectado: {request.sid}')
+@instrument('connect')
+def handle_connect(auth=None):
+    log.debug('client_connected', sid=request.sid)
 
 @socketio.on('disconnect')
+@instrument('disconnect')
 def handle_disconnect():
     player_sid = request.sid
-    if player_sid in sid_to_user_info:
-        user_info = sid_to_user_info[player_sid]
+    matchmaking.cancel(player_sid)
+    limiter.forget(player_sid)
+    user_info = store.get_user(player_sid)
+    if user_info and user_info.get('spectator'):
+        remove_spectator(user_info['room_id'], player_sid)
+    elif user_info:
         room_id = user_info['room_id']
-        username = user_info['username']
-
-        if room_id in game_rooms:
-            room_data = game_rooms[room_id]
-            if player_sid in room_data['players']:
-                room_data['players'].remove(player_sid)
-                
-                if player_sid in room_data['usernames']:
-                    del room_data['usernames'][player_sid]
-
-                emit('player_disconnected', {
-                    'sid': player_sid,
-                    'username': username,
-                    'players_in_room': len(room_data['players']),
-                    'current_players': list(room_data['usernames'].values())
-                }, room=room_id)
-                print(f'Jogador {username} ({player_sid}) desconectou da sala {room_id}. Jogadores restantes: {len(room_data["players"])}')
-
-                if not room_data['players']:
-                    del game_rooms[room_id]
-                    print(f'Sala {room_id} removida por estar vazia.')
-                elif len(room_data['players']) == 1:
-                    emit('game_ended_player_left', {
-                        'message': 'O outro jogador desconectou. O jogo foi encerrado. Por favor, crie ou entre em uma nova sala.',
-                        'room_id': room_id
-                    }, room=room_data['players'][0])
-                    del game_rooms[room_id]
-                    print(f'Jogo na sala {room_id} encerrado porque um jogador saiu. Sala removida.')
-        
-        del sid_to_user_info[player_sid]
-    print(f'Cliente desconectado: {player_sid}')
+        with store.lock(room_id):
+            room_data = store.get_room(room_id)
+            if room_data and player_sid in room_data['players']:
+                if RECONNECT_GRACE_PERIOD > 0 and room_data['game_state'] is not None:
+                    hold_seat(room_id, room_data, player_sid)
+                else:
+                    remove_player(room_id, room_data, player_sid)
+        store.delete_user(player_sid)
+    log.debug('client_disconnected', sid=player_sid)
+
+
+def remove_player(room_id, room_data, player_sid):
+    record_series(room_id, room_data)
+    username = room_data['usernames'].pop(player_sid, None)
+    room_data['players'].remove(player_sid)
+    room_data.get('disconnected', {}).pop(player_sid, None)
+    for token, sid in list(room_data.get('resume_tokens', {}).items()):
+        if sid == player_sid:
+            del room_data['resume_tokens'][token]
+
+    broadcast_to_room('player_disconnected', {
+        'sid': player_sid,
+        'username': username,
+        'players_in_room': len(room_data['players']),
+        'current_players': list(room_data['usernames'].values())
+    }, room_id, room_data)
+    log.info('player_left', room_id=room_id, sid=player_sid, username=username, players=len(room_data['players']))
+
+    if not room_data['players']:
+        dismiss_spectators(room_id, room_data)
+        delete_room(room_id)
+        log.info('room_deleted', room_id=room_id, reason='empty')
+    elif len(room_data['players']) < room_engine(room_data).min_players:
+        ended = {
+            'message': 'O outro jogador desconectou. O jogo foi encerrado. Por favor, crie ou entre em uma nova sala.',
+            'room_id': room_id
+        }
+        for sid in room_data['players']:
+            broadcast('game_ended_player_left', ended, sid)
+            store.delete_user(sid)
+        spectator_broadcast('game_ended_player_left', ended, room_id, room_data)
+        dismiss_spectators(room_id, room_data)
+        delete_room(room_id)
+        log.info('room_deleted', room_id=room_id, reason='player_left')
+    else:
+        # Sala com mais jogadores que o mínimo: a partida segue com os papéis reorganizados.
+        if room_data['game_state'] is not None:
+            room_data['game_state'] = room_engine(room_data).player_left(room_data['game_state'], room_data['players'], player_sid)
+        save_room(room_id, room_data)
+        send_snapshots(room_id, room_data)
+
+
+def send_snapshots(room_id, room_data):
+    # Cada jogador recebe o estado como ele pode vê-lo; os espectadores, uma cópia só.
+    for sid in room_data['players']:
+        broadcast('state_snapshot', build_room_snapshot(room_data, room_id, sid), sid)
+    spectator_broadcast('state_snapshot', build_room_snapshot(room_data, room_id, None), room_id, room_data)
+
+
+# --- Reconexão ---
+# Quem cai no meio de uma partida mantém o lugar por RECONNECT_GRACE_PERIOD
+# segundos. O cliente volta com o token recebido em room_joined; o servidor
+# troca o sid antigo pelo novo em toda a sala e manda um único snapshot.
+def hold_seat(room_id, room_data, player_sid):
+    room_data['disconnected'][player_sid] = time.time() + RECONNECT_GRACE_PERIOD
+    save_room(room_id, room_data)
+    broadcast_to_room('player_disconnected', {
+        'sid': player_sid,
+        'username': room_data['usernames'].get(player_sid),
+        'players_in_room': len(room_data['players']),
+        'current_players': list(room_data['usernames'].values()),
+        'reconnecting': True,
+        'grace_period': RECONNECT_GRACE_PERIOD
+    }, room_id, room_data)
+    log.info('player_seat_held', room_id=room_id, sid=player_sid, grace_period=RECONNECT_GRACE_PERIOD)
+    timers.schedule(('seat', room_id, player_sid), RECONNECT_GRACE_PERIOD, release_held_seat, room_id, player_sid)
+
+
+def release_held_seat(room_id, player_sid):
+    with store.lock(room_id):
+        room_data = store.get_room(room_id)
+        # Se o jogador já voltou, o sid antigo não está mais em 'disconnected'.
+        if room_data is None or player_sid not in room_data.get('disconnected', {}):
+            return
+        log.info('player_seat_expired', room_id=room_id, sid=player_sid)
+        remove_player(room_id, room_data, player_sid)
+
+
+@socketio.on('resume_session')
+@instrument('resume_session')
+@rate_limited('resume_session')
+def handle_resume_session(data):
+    room_id = data.get('room_id')
+    token = data.get('token')
+    player_sid = request.sid
+
+    if not isinstance(room_id, str) or not isinstance(token, str):
+        emit('resume_failed', {'message': 'Sessão inválida.'}, room=player_sid)
+        return
+
+    with store.lock(room_id), store.user_lock():
+        room_data = store.get_room(room_id)
+        old_sid = room_data.get('resume_tokens', {}).get(token) if room_data else None
+        if old_sid is None or old_sid not in room_data['players']:
+            emit('resume_failed', {'message': 'A sessão expirou ou a sala não existe mais.'}, room=player_sid)
+            return
+        if store.get_user(player_sid):
+            emit('resume_failed', {'message': 'Você já está em uma sala.'}, room=player_sid)
+            return
+
+        timers.cancel(('seat', room_id, old_sid))
+        rebind_player(room_data, old_sid, player_sid)
+        new_token = issue_resume_token(room_data, player_sid)
+        username = room_data['usernames'][player_sid]
+        matchmaking.cancel(player_sid)
+        join_room(room_id)
+        store.delete_user(old_sid)
+        store.set_user(player_sid, {'username': username, 'room_id': room_id})
+        save_room(room_id, room_data)
+
+        emit('session_resumed', {
+            'room_id': room_id,
+            'resume_token': new_token,
+            'player_sid': player_sid,
+            'username': username,
+            'players_in_room': len(room_data['players']),
+            'current_players': list(room_data['usernames'].values()),
+            'players_sids': room_data['players']
+        }, room=player_sid)
+        emit_to_room('player_reconnected', {
+            'old_sid': old_sid,
+            'sid': player_sid,
+            'username': username
+        }, room_id, room_data, include_self=False)
+        # Os SIDs mudaram para todos: cada jogador recebe o próprio snapshot.
+        send_snapshots(room_id, room_data)
+    log.info('session_resumed', room_id=room_id, old_sid=old_sid, sid=player_sid)
+
+    # Se a conexão antiga ainda não caiu do lado do servidor, ela é descartada.
+    if socketio.server.manager.is_connected(old_sid, '/'):
+        socketio.server.leave_room(old_sid, room_id, namespace='/')
+        socketio.server.disconnect(old_sid, namespace='/')
+
+
+def rebind_player(room_data, old_sid, new_sid):
+    room_data['players'][room_data['players'].index(old_sid)] = new_sid
+    # Reconstrói para manter a ordem dos jogadores em usernames.
+    room_data['usernames'] = {new_sid if sid == old_sid else sid: name for sid, name in room_data['usernames'].items()}
+    room_data['disconnected'].pop(old_sid, None)
+    if room_data['game_state'] is not None:
+        room_data['game_state'].replace_sid(old_sid, new_sid)
 
 
 @socketio.on('create_or_join_room')
+@instrument('create_or_join_room')
+@rate_limited('create_or_join_room')
 def handle_create_or_join_room(data):
     game_id = data.get('gameId')
     username = data.get('username')
-    room_id = data.get('roomId') or game_id
+    room_id = data.get('roomId')
     player_sid = request.sid
 
-    if not username:
+    if not isinstance(username, str) or not username.strip():
         emit('error', {'message': 'Por favor, insira um nome de usuário.'}, room=player_sid)
         return
 
-    if player_sid in sid_to_user_info and sid_to_user_info[player_sid]['room_id'] == room_id:
-        emit('error', {'message': 'Você já está nesta sala.'}, room=player_sid)
+    if refuse_if_draining(player_sid):
         return
 
-    if room_id not in game_rooms:
-        game_rooms[room_id] = {
-            'players': [],
-            'game_state': {},
-            'game_type': game_id,
-            'usernames': {}
-        }
-        print(f'Sala {room_id} criada para o jogo {game_id}')
+    if not room_id:
+        # Sem ID de sala o jogador entra no matchmaking em vez de cair numa sala fixa.
+        _enqueue_quick_play(game_id, username, data.get('bucket'), player_sid)
+        return
+
+    if not isinstance(game_id, str) or game_id not in GAME_ENGINES:
+        emit('error', {'message': 'Jogo inválido.'}, room=player_sid)
+        return
+
+    # ':' fica reservado para os canais internos (espectadores e lobby).
+    if not isinstance(room_id, str) or len(room_id) > 64 or ':' in room_id:
+        emit('error', {'message': 'ID de sala inválido. Use até 64 caracteres, sem ":".'}, room=player_sid)
+        return
+
+    # Abrir espaço pode encerrar outra sala (e pegar o lock dela), então
+    # acontece antes de travar esta.
+    if not store.room_exists(room_id) and not ensure_room_capacity():
+        emit('error', {'message': 'O servidor atingiu o limite de salas. Tente novamente em instantes.'}, room=player_sid)
+        return
+
+    # A verificação de lotação e a entrada do jogador precisam ser atômicas
+    # mesmo com vários workers compartilhando o store. Ordem dos locks: sala, depois usuários.
+    with store.lock(room_id), store.user_lock():
+        _join_room_locked(game_id, username, room_id, player_sid)
+
+
+def new_room_data(game_id):
+    return {
+        'players': [],
+        'game_state': None,
+        'game_type': game_id,
+        'usernames': {},
+        'seq': 0,
+        'resume_tokens': {}, # token -> sid do jogador
+        'disconnected': {},  # sid -> prazo para reconectar
+        'spectators': {}     # sid -> nome do espectador
+    }
+
+def issue_resume_token(room_data, player_sid):
+    for token, sid in list(room_data['resume_tokens'].items()):
+        if sid == player_sid:
+            del room_data['resume_tokens'][token]
+    token = secrets.token_urlsafe(16)
+    room_data['resume_tokens'][token] = player_sid
+    return token
+
+def room_joined_payload(room_id, room_data, player_sid, username):
+    # Mesmo formato para quem entra por código e para quem é pareado na fila.
+    engine = room_engine(room_data)
+    return {
+        'room_id': room_id,
+        'players_in_room': len(room_data['players']),
+        'player_sid': player_sid,
+        'username': username,
+        'current_players': list(room_data['usernames'].values()),
+        'resume_token': issue_resume_token(room_data, player_sid),
+        'min_players': engine.min_players,
+        'max_players': engine.max_players
+    }
 
-    room_data = game_rooms[room_id]
 
-    if len(room_data['players']) >= 2 and player_sid not in room_data['players']:
+def _join_room_locked(game_id, username, room_id, player_sid):
+    user_info = store.get_user(player_sid)
+    if user_info and user_info.get('spectator'):
+        emit('error', {'message': 'Você está assistindo a uma sala. Saia dela para jogar.'}, room=player_sid)
+        return
+    if user_info and user_info['room_id'] == room_id:
+        emit('error', {'message': 'Você já está nesta sala.'}, room=player_sid)
+        return
+
+    room_data = store.get_room(room_id)
+    if room_data is None:
+        room_data = new_room_data(game_id)
+        log.info('room_created', room_id=room_id, game_id=game_id)
+    engine = room_engine(room_data)
+
+    if len(room_data['players']) >= engine.max_players and player_sid not in room_data['players']:
         emit('error', {'message': 'Esta sala já está cheia. Tente outra sala ou crie uma nova.'}, room=player_sid)
         return
     
     if player_sid not in room_data['players']:
+        matchmaking.cancel(player_sid)
         join_room(room_id)
         room_data['players'].append(player_sid)
         room_data['usernames'][player_sid] = username
-        sid_to_user_info[player_sid] = {'username': username, 'room_id': room_id}
+        store.set_user(player_sid, {'username': username, 'room_id': room_id})
 
-    emit('room_joined', {
-        'room_id': room_id,
-        'players_in_room': len(room_data['players']),
-        'player_sid': player_sid,
-        'username': username,
-        'current_players': list(room_data['usernames'].values())
-    }, room=player_sid)
+    emit('room_joined', room_joined_payload(room_id, room_data, player_sid, username), room=player_sid)
 
     if len(room_data['players']) > 1 and player_sid in room_data['players'] and player_sid == room_data['players'][-1]:
-         emit('player_joined', {
+         emit_to_room('player_joined', {
             'player_sid': player_sid,
             'username': username,
             'players_in_room': len(room_data['players']),
             'current_players': list(room_data['usernames'].values())
-        }, room=room_id, include_self=False)
-
-
-    print(f'Jogador {username} ({player_sid}) entrou na sala {room_id} para o jogo {game_id}. Jogadores na sala: {len(room_data["players"])}')
-
-    if len(room_data['players']) == 2:
-        players_sids_in_order = room_data['players']
-
-        if game_id == 'tic-tac-toe':
-            room_data['game_state'] = initialize_tic_tac_toe_game()
-            room_data['game_state']['current_turn'] = players_sids_in_order[0]
-            room_data['game_state']['players_map'][players_sids_in_order[0]] = 'X'
-            room_data['game_state']['players_map'][players_sids_in_order[1]] = 'O'
-        elif game_id == 'rock-paper-scissors':
-            room_data['game_state'] = initialize_rps_game()
-            room_data['game_state']['player1_sid'] = players_sids_in_order[0]
-            room_data['game_state']['player2_sid'] = players_sids_in_order[1]
-            room_data['game_state']['scores'][players_sids_in_order[0]] = 0 # Inicializa score para o player 1
-            room_data['game_state']['scores'][players_sids_in_order[1]] = 0 # Inicializa score para o player 2
-        elif game_id == 'hangman':
-            room_data['game_state'] = initialize_hangman_game()
-            room_data['game_state']['setter_sid'] = players_sids_in_order[0]
-            room_data['game_state']['guesser_sid'] = players_sids_in_order[1]
-            print(f"Forca: Definidor: {room_data['usernames'].get(players_sids_in_order[0])}, Adivinhador: {room_data['usernames'].get(players_sids_in_order[1])}")
-
-        emit('game_start', {
-            'room_id': room_id,
-            'initial_state': room_data['game_state'],
-            'players_sids': players_sids_in_order,
-            'player_roles': room_data['game_state'].get('players_map'),
-            'setter_sid': room_data['game_state'].get('setter_sid'),
-            'guesser_sid': room_data['game_state'].get('guesser_sid'),
-            'usernames': room_data['usernames']
-        }, room=room_id)
-        print(f'Jogo na sala {room_id} iniciado com estado inicial: {room_data["game_state"]}')
-    elif len(room_data['players']) < 2:
-        emit('game_info_message', {'message': 'Aguardando outro jogador para começar o jogo...'}, room=player_sid)
+        }, room_id, room_data, include_self=False)
 
 
-# --- Chat Geral ---
-@socketio.on('chat_message')
-def handle_chat_message(data):
-    room_id = data.get('room_id')
-    message = data.get('message')
-    player_sid = request.sid
+    log.info('player_joined', room_id=room_id, game_id=game_id, sid=player_sid, username=username, players=len(room_data['players']))
 
-    if room_id in game_rooms and player_sid in game_rooms[room_id]['players']:
-        username = game_rooms[room_id]['usernames'].get(player_sid, 'Desconhecido')
-        emit('new_chat_message', {'username': username, 'message': message}, room=room_id)
-        print(f'Chat na sala {room_id} de {username}: {message}')
+    if len(room_data['players']) == engine.min_players:
+        start_game(room_id, room_data)
+    elif len(room_data['players']) < engine.min_players:
+        emit('game_info_message', {'message': 'Aguardando outro jogador para começar o jogo...'}, room=player_sid)
+    elif room_data['game_state'] is not None:
+        # Entrou com a partida em andamento (salas com mais de dois lugares).
+        room_data['game_state'] = engine.player_joined(room_data['game_state'], room_data['players'], player_sid)
+        emit('state_snapshot', build_room_snapshot(room_data, room_id, player_sid), room=player_sid)
 
+    save_room(room_id, room_data)
 
-# --- Jogo da Velha (TCP) ---
-@socketio.on('tic_tac_toe_move')
-def handle_tic_tac_toe_move(data):
-    room_id = data.get('room_id')
-    cell_index = data.get('cell_index')
+
+def start_game(room_id, room_data):
+    game_id = room_data['game_type']
+    players_sids_in_order = room_data['players']
+    engine = room_engine(room_data)
+
+    room_data['game_state'] = engine.init(players_sids_in_order)
+    initial_state = engine.serialize(room_data['game_state'])
+    emit_to_room('game_start', {
+        'room_id': room_id,
+        'seq': next_seq(room_data),
+        'initial_state': initial_state,
+        'players_sids': players_sids_in_order,
+        'player_roles': initial_state.get('players_map'),
+        'setter_sid': initial_state.get('setter_sid'),
+        'guesser_sid': initial_state.get('guesser_sid'),
+        'usernames': room_data['usernames']
+    }, room_id, room_data)
+    log.info('game_started', room_id=room_id, game_id=game_id, players=list(players_sids_in_order))
+
+
+# --- Matchmaking (Jogo Rápido) ---
+@socketio.on('quick_play')
+@instrument('quick_play')
+@rate_limited('quick_play')
+def handle_quick_play(data):
+    username = data.get('username')
     player_sid = request.sid
 
-    if room_id not in game_rooms or game_rooms[room_id]['game_type'] != 'tic-tac-toe':
-        emit('game_error', {'message': 'Estado do jogo inválido.'}, room=player_sid)
+    if not isinstance(username, str) or not username.strip():
+        emit('error', {'message': 'Por favor, insira um nome de usuário.'}, room=player_sid)
         return
 
-    game_state = game_rooms[room_id]['game_state']
-    
-    if not game_state or not game_state.get('board'):
-        emit('game_error', {'message': 'Jogo não inicializado corretamente. Aguarde o outro jogador.'}, room=player_sid)
-        return
+    _enqueue_quick_play(data.get('gameId'), username, data.get('bucket'), player_sid)
 
-    if game_state['winner'] or game_state['moves_count'] == 9:
-        emit('game_error', {'message': 'O jogo já acabou!'}, room=player_sid)
-        return
 
-    if player_sid != game_state['current_turn']:
-        emit('game_error', {'message': 'Não é a sua vez de jogar!'}, room=player_sid)
+def _enqueue_quick_play(game_id, username, bucket, player_sid):
+    if refuse_if_draining(player_sid):
         return
-
-    if game_state['board'][cell_index] != '':
-        emit('game_error', {'message': 'Essa célula já está ocupada!'}, room=player_sid)
+    if not isinstance(game_id, str) or game_id not in GAME_ENGINES:
+        emit('error', {'message': 'Jogo inválido.'}, room=player_sid)
         return
-
-    player_mark = game_state['players_map'][player_sid]
-    game_state['board'][cell_index] = player_mark
-    game_state['moves_count'] += 1
-
-    winner = check_tic_tac_toe_winner(game_state['board'], player_mark)
-    if winner:
-        game_state['winner'] = player_sid
-        emit('tic_tac_toe_update', {'board': game_state['board'], 'winner': player_sid, 'player_mark': player_mark, 'cell_index': cell_index, 'current_turn': None}, room=room_id)
-        print(f'Vencedor do Jogo da Velha na sala {room_id}: {game_rooms[room_id]["usernames"].get(player_sid, player_sid)}')
+    if bucket is not None and (not isinstance(bucket, str) or len(bucket) > 32):
+        emit('error', {'message': 'Categoria de matchmaking inválida.'}, room=player_sid)
         return
-    elif game_state['moves_count'] == 9:
-        game_state['winner'] = 'draw'
-        emit('tic_tac_toe_update', {'board': game_state['board'], 'winner': 'draw', 'player_mark': player_mark, 'cell_index': cell_index, 'current_turn': None}, room=room_id)
-        print(f'Jogo da Velha na sala {room_id}: Empate')
+    if not ensure_room_capacity():
+        emit('error', {'message': 'O servidor atingiu o limite de salas. Tente novamente em instantes.'}, room=player_sid)
         return
 
-    other_player_sid = [p for p in game_rooms[room_id]['players'] if p != player_sid][0]
-    game_state['current_turn'] = other_player_sid
+    with store.user_lock():
+        _match_quick_play_locked(game_id, username, bucket, player_sid)
 
-    emit('tic_tac_toe_update', {
-        'board': game_state['board'],
-        'current_turn': game_state['current_turn'],
-        'player_mark': player_mark,
-        'cell_index': cell_index
-    }, room=room_id)
 
-def check_tic_tac_toe_winner(board, player_mark):
-    winning_combinations = [
-        [0, 1, 2], [3, 4, 5], [6, 7, 8], # Linhas
-        [0, 3, 6], [1, 4, 7], [2, 5, 8], # Colunas
-        [0, 4, 8], [2, 4, 6]             # Diagonais
-    ]
-    for combo in winning_combinations:
-        if board[combo[0]] == board[combo[1]] == board[combo[2]] == player_mark:
-            return True
-    return False
+def _match_quick_play_locked(game_id, username, bucket, player_sid):
+    if store.get_user(player_sid):
+        emit('error', {'message': 'Você já está em uma sala.'}, room=player_sid)
+        return
+    if matchmaking.is_waiting(player_sid):
+        emit('error', {'message': 'Você já está procurando um oponente.'}, room=player_sid)
+        return
 
-@socketio.on('reset_tic_tac_toe')
-def handle_reset_tic_tac_toe(data):
-    room_id = data.get('room_id')
-    if room_id in game_rooms and game_rooms[room_id]['game_type'] == 'tic-tac-toe':
-        players = game_rooms[room_id]['players']
-        if len(players) < 2:
-            emit('game_error', {'message': 'Não há jogadores suficientes para reiniciar o jogo.'}, room=request.sid)
-            return
+    match = matchmaking.enqueue(player_sid, game_id, username, bucket or None)
+    if match is None:
+        emit('matchmaking_queued', {'game_id': game_id, 'waiting': matchmaking.waiting_count(game_id)}, room=player_sid)
+        log.info('matchmaking_queued', game_id=game_id, sid=player_sid, bucket=bucket)
+        return
 
-        current_first_player_sid = game_rooms[room_id]['game_state'].get('current_turn')
-        if not current_first_player_sid:
-            current_first_player_sid = players[0]
-        
-        new_starting_player_sid = players[1] if current_first_player_sid == players[0] else players[0]
+    opponent_sid, opponent_username = match
+    room_id = allocate_room_id(game_id)
+    room_data = new_room_data(game_id)
+    seats = ((opponent_sid, opponent_username), (player_sid, username))
+    for sid, name in seats:
+        join_room(room_id, sid=sid)
+        room_data['players'].append(sid)
+        room_data['usernames'][sid] = name
+        store.set_user(sid, {'username': name, 'room_id': room_id})
+    log.info('room_created', room_id=room_id, game_id=game_id, matchmaking=True)
+
+    for sid, name in seats:
+        emit('room_joined', room_joined_payload(room_id, room_data, sid, name), room=sid)
+
+    start_game(room_id, room_data)
+    save_room(room_id, room_data)
+
+
+def allocate_room_id(game_id):
+    while True:
+        room_id = f'{game_id}-{secrets.token_hex(4)}'
+        if not store.room_exists(room_id):
+            return room_id
+
+
+@socketio.on('cancel_matchmaking')
+@instrument('cancel_matchmaking')
+@rate_limited('cancel_matchmaking')
+def handle_cancel_matchmaking(data=None):
+    if matchmaking.cancel(request.sid):
+        emit('matchmaking_cancelled', {}, room=request.sid)
+        log.info('matchmaking_cancelled', sid=request.sid)
+
+
+# --- Lobby ---
+# Quem está escolhendo uma sala se inscreve no canal `lobby:<jogo>`: recebe uma
+# página da lista ao se inscrever e depois só diffs, agrupados pelo gancho de
+# tick no máximo a cada LOBBY_UPDATE_INTERVAL segundos, não um emit por
+# mudança de sala. Só as salas abertas (com lugar livre) estão no índice; o
+# cliente mantém apenas a página recebida e a pede de novo quando ela fica
+# incompleta. O índice é local ao worker.
+def lobby_channel(game_id):
+    return f'lobby:{game_id}'
+
+def lobby_entry(room_id, room_data):
+    return {
+        'room_id': room_id,
+        'players': len(room_data['players']),
+        'max_players': room_engine(room_data).max_players,
+        'usernames': list(room_data['usernames'].values()),
+        'status': room_status(room_data)
+    }
+
+@socketio.on('lobby_subscribe')
+@instrument('lobby_subscribe')
+@rate_limited('lobby_subscribe')
+def handle_lobby_subscribe(data):
+    game_id = data.get('gameId')
+    if game_id not in GAME_ENGINES:
+        emit('error', {'message': 'Jogo inválido.'}, room=request.sid)
+        return
+    join_room(lobby_channel(game_id))
+    rooms, total = lobby.page(game_id, 0, LOBBY_PAGE_SIZE)
+    emit('lobby_snapshot', {'game': game_id, 'total': total, 'limit': LOBBY_PAGE_SIZE, 'rooms': rooms}, room=request.sid)
+
+@socketio.on('lobby_unsubscribe')
+@instrument('lobby_unsubscribe')
+@rate_limited('lobby_unsubscribe')
+def handle_lobby_unsubscribe(data):
+    game_id = data.get('gameId')
+    if game_id in GAME_ENGINES:
+        leave_room(lobby_channel(game_id))
 
-        game_rooms[room_id]['game_state'] = initialize_tic_tac_toe_game()
-        game_rooms[room_id]['game_state']['current_turn'] = new_starting_player_sid
-        
-        game_rooms[room_id]['game_state']['players_map'][new_starting_player_sid] = 'X'
-        game_rooms[room_id]['game_state']['players_map'][players[0] if players[0] != new_starting_player_sid else players[1]] = 'O'
+def flush_lobby_updates():
+    """Gancho de tick: envia a cada jogo um único diff com as salas que mudaram."""
+    for game_id, diff in lobby.drain_changes().items():
+        diff['game'] = game_id
+        socket_metrics.count_emit('lobby_update', (diff,))
+        fanout_emit(socketio.server, 'lobby_update', diff, lobby_channel(game_id))
 
+timers.add_tick_hook(flush_lobby_updates)
 
-        emit('tic_tac_toe_reset', {'initial_state': game_rooms[room_id]['game_state'], 'usernames': game_rooms[room_id]['usernames']}, room=room_id)
-        print(f'Jogo da Velha na sala {room_id} reiniciado. Próximo a começar: {game_rooms[room_id]["usernames"].get(new_starting_player_sid, new_starting_player_sid)}')
 
+# --- Bots ---
+BOT_USERNAME = 'Computador'
 
-# --- Pedra, Papel e Tesoura (UDP) ---
-@socketio.on('rps_choice')
-def handle_rps_choice(data):
+@socketio.on('add_bot')
+@instrument('add_bot')
+@rate_limited('add_bot')
+@room_locked
+def handle_add_bot(data):
     room_id = data.get('room_id')
-    choice = data.get('choice')
+    room_data = store.get_room(room_id)
     player_sid = request.sid
 
-    if room_id not in game_rooms or game_rooms[room_id]['game_type'] != 'rock-paper-scissors':
-        emit('game_error', {'message': 'Estado do jogo PPT inválido.'}, room=player_sid)
+    if room_data is None or player_sid not in room_data['players']:
+        emit('game_error', {'message': 'Você não está nesta sala.'}, room=player_sid)
+        return
+    if room_data['game_type'] not in GAME_BOTS:
+        emit('game_error', {'message': 'O computador só joga Jogo da Velha e Forca.'}, room=player_sid)
+        return
+    if refuse_if_draining(player_sid, 'game_error'):
+        return
+    if len(room_data['players']) != 1:
+        emit('game_error', {'message': 'A sala já tem um oponente.'}, room=player_sid)
         return
 
-    game_state = game_rooms[room_id]['game_state']
-
-    if not game_state or not game_state.get('scores'):
-        emit('game_error', {'message': 'Jogo não inicializado corretamente. Aguarde o outro jogador.'}, room=player_sid)
+    # O bot ocupa um lugar com um sid próprio, sem conexão: os emits para ele não vão a lugar nenhum.
+    bot_sid = f'bot-{secrets.token_hex(8)}'
+    room_data['players'].append(bot_sid)
+    room_data['usernames'][bot_sid] = BOT_USERNAME
+    room_data['bots'] = [bot_sid]
+    emit_to_room('player_joined', {
+        'player_sid': bot_sid,
+        'username': BOT_USERNAME,
+        'players_in_room': len(room_data['players']),
+        'current_players': list(room_data['usernames'].values())
+    }, room_id, room_data)
+    log.info('bot_joined', room_id=room_id, game_id=room_data['game_type'], sid=bot_sid)
+    start_game(room_id, room_data)
+    save_room(room_id, room_data)
+    schedule_bot_turn(room_id, room_data)
+
+def bot_to_play(room_data):
+    """Sid do bot que deve agir agora, ou None."""
+    bots = room_data.get('bots')
+    game_state = room_data['game_state']
+    if not bots or game_state is None or game_state.is_over():
+        return None
+    sid = room_engine(room_data).turn_of(game_state)
+    return sid if sid in bots else None
+
+def schedule_bot_turn(room_id, room_data):
+    if bot_to_play(room_data) is not None:
+        timers.schedule(('bot', room_id), BOT_MOVE_DELAY, play_bot_turn, room_id)
+
+def play_bot_turn(room_id):
+    with store.lock(room_id):
+        room_data = store.get_room(room_id)
+        if room_data is None:
+            return
+        bot_sid = bot_to_play(room_data)
+        if bot_sid is None:
+            return
+        engine = room_engine(room_data)
+        # A jogada do bot passa pela mesma validação que a de um jogador.
+        event, data = GAME_BOTS[engine.game_id].next_move(room_id, room_data['game_state'])
+        try:
+            move = engine.validate_move(room_data['game_state'], bot_sid, event, data)
+        except InvalidMove as exc:
+            log.warning('bot_move_rejected', room_id=room_id, source_event=event, error=str(exc))
+            return
+        play_move(room_id, room_data, engine, bot_sid, event, move)
+        log.info('bot_move', room_id=room_id, source_event=event)
+        schedule_bot_turn(room_id, room_data)
+
+
+# --- Espectadores ---
+# Espectadores entram no canal `<sala>:spectators`, separado do canal dos
+# jogadores: recebem um snapshot somente leitura ao entrar e depois as mesmas
+# atualizações da partida, sem a palavra secreta da forca. Cada atualização é
+# codificada uma única vez para todos os espectadores (ver fanout.py).
+def spectator_channel(room_id):
+    return f'{room_id}:spectators'
+
+def spectator_payload(data):
+    # A palavra secreta só pode aparecer depois do fim da partida.
+    for key in ('initial_state', 'state'):
+        nested = data.get(key)
+        if isinstance(nested, dict) and nested.get('secret_word') and not nested.get('game_over'):
+            data = dict(data, **{key: dict(nested, secret_word='')})
+    if data.get('secret_word') and not data.get('game_over'):
+        data = dict(data, secret_word='')
+    return data
+
+def spectator_broadcast(event, data, room_id, room_data):
+    if not room_data.get('spectators'):
         return
+    data = spectator_payload(data)
+    socket_metrics.count_emit(event, (data,))
+    delivered = fanout_emit(socketio.server, event, data, spectator_channel(room_id))
+    if delivered:
+        spectator_deliveries.inc(event, delivered)
+
+def dismiss_spectators(room_id, room_data):
+    """Libera os espectadores de uma sala que está sendo apagada."""
+    for sid in room_data.get('spectators', {}):
+        store.delete_user(sid)
+    if room_data.get('spectators'):
+        socketio.server.close_room(spectator_channel(room_id), namespace='/')
+
+def remove_spectator(room_id, spectator_sid):
+    with store.lock(room_id):
+        room_data = store.get_room(room_id)
+        if room_data is not None and room_data.get('spectators', {}).pop(spectator_sid, None) is not None:
+            store.save_room(room_id, room_data) # Sair não conta como atividade da partida
+    store.delete_user(spectator_sid)
+    log.debug('spectator_left', room_id=room_id, sid=spectator_sid)
+
+
+@socketio.on('spectate_room')
+@instrument('spectate_room')
+@rate_limited('spectate_room')
+@room_locked
+def handle_spectate_room(data):
+    room_id = data.get('room_id')
+    username = data.get('username')
+    spectator_sid = request.sid
 
-    # Certifica que os scores para os jogadores existem
-    for p_sid in [game_state['player1_sid'], game_state['player2_sid']]:
-        if p_sid not in game_state['scores']:
-            game_state['scores'][p_sid] = 0
+    if not isinstance(username, str) or not username.strip():
+        emit('error', {'message': 'Por favor, insira um nome de usuário.'}, room=spectator_sid)
+        return
+    if MAX_SPECTATORS_PER_ROOM <= 0:
+        emit('error', {'message': 'O modo espectador está desativado neste servidor.'}, room=spectator_sid)
+        return
 
-    if player_sid == game_state['player1_sid']:
-        if game_state['player1_choice'] is None:
-            game_state['player1_choice'] = choice
-            game_state['round_ready'] += 1
-            emit('rps_player_ready', {'player_sid': player_sid, 'choice_made': True}, room=room_id)
-            print(f'Player 1 ({game_rooms[room_id]["usernames"].get(player_sid, player_sid)}) escolheu em sala {room_id}.')
-        else:
-            emit('game_error', {'message': 'Você já fez sua escolha para esta rodada!'}, room=player_sid)
+    with store.user_lock():
+        if store.get_user(spectator_sid):
+            emit('error', {'message': 'Você já está em uma sala.'}, room=spectator_sid)
             return
-    elif player_sid == game_state['player2_sid']:
-        if game_state['player2_choice'] is None:
-            game_state['player2_choice'] = choice
-            game_state['round_ready'] += 1
-            emit('rps_player_ready', {'player_sid': player_sid, 'choice_made': True}, room=room_id)
-            print(f'Player 2 ({game_rooms[room_id]["usernames"].get(player_sid, player_sid)}) escolheu em sala {room_id}.')
-        else:
-            emit('game_error', {'message': 'Você já fez sua escolha para esta rodada!'}, room=player_sid)
+        room_data = store.get_room(room_id)
+        if room_data is None or room_data['game_type'] != data.get('gameId', room_data['game_type']):
+            emit('error', {'message': 'Sala não encontrada para este jogo.'}, room=spectator_sid)
             return
-    else:
-        emit('game_error', {'message': 'Você não é um jogador válido nesta sala.'}, room=player_sid)
-        return
-
-    if game_state['round_ready'] == 2:
-        p1_choice = game_state['player1_choice']
-        p2_choice = game_state['player2_choice']
-
-        winner_sid = None
-        if p1_choice == p2_choice:
-            winner_sid = 'draw'
-        elif (p1_choice == 'pedra' and p2_choice == 'tesoura') or \
-             (p1_choice == 'papel' and p2_choice == 'pedra') or \
-             (p1_choice == 'tesoura' and p2_choice == 'papel'):
-            winner_sid = game_state['player1_sid']
-            game_state['scores'][game_state['player1_sid']] += 1
-        else:
-            winner_sid = game_state['player2_sid']
-            game_state['scores'][game_state['player2_sid']] += 1
-
-        game_state['round_winner'] = winner_sid
-        emit('rps_round_result', {
-            'player1_choice': p1_choice,
-            'player2_choice': p2_choice,
-            'winner_sid': winner_sid,
-            'scores': game_state['scores'], # Enviando o dicionário de scores atualizado
-            'player1_sid': game_state['player1_sid'],
-            'player2_sid': game_state['player2_sid'],
-            'usernames': game_rooms[room_id]['usernames']
-        }, room=room_id)
-
-        game_state['player1_choice'] = None
-        game_state['player2_choice'] = None
-        game_state['round_ready'] = 0
-        game_state['round_winner'] = None
-
-        print(f'Rodada PPT na sala {room_id} concluída. Vencedor: {game_rooms[room_id]["usernames"].get(winner_sid, winner_sid if winner_sid != "draw" else "Empate")}. Placar: {game_state["scores"]}')
-
-@socketio.on('reset_rps')
-def handle_reset_rps(data):
-    room_id = data.get('room_id')
-    if room_id in game_rooms and game_rooms[room_id]['game_type'] == 'rock-paper-scissors':
-        players = game_rooms[room_id]['players']
-        if len(players) < 2:
-            emit('game_error', {'message': 'Não há jogadores suficientes para reiniciar o jogo.'}, room=request.sid)
+        spectators = room_data.setdefault('spectators', {})
+        if len(spectators) >= MAX_SPECTATORS_PER_ROOM:
+            emit('error', {'message': 'Esta sala atingiu o limite de espectadores.'}, room=spectator_sid)
             return
 
-        game_rooms[room_id]['game_state'] = initialize_rps_game()
-        game_rooms[room_id]['game_state']['player1_sid'] = players[0]
-        game_rooms[room_id]['game_state']['player2_sid'] = players[1]
-        game_rooms[room_id]['game_state']['scores'][players[0]] = 0
-        game_rooms[room_id]['game_state']['scores'][players[1]] = 0
+        matchmaking.cancel(spectator_sid)
+        join_room(spectator_channel(room_id))
+        spectators[spectator_sid] = username
+        store.set_user(spectator_sid, {'username': username, 'room_id': room_id, 'spectator': True})
+        store.save_room(room_id, room_data)
 
-        emit('rps_reset', {'initial_state': game_rooms[room_id]['game_state'], 'usernames': game_rooms[room_id]['usernames']}, room=room_id)
-        print(f'Jogo PPT na sala {room_id} reiniciado.')
+    emit('spectate_joined', {
+        'room_id': room_id,
+        'username': username,
+        'game_type': room_data['game_type'],
+        'players_in_room': len(room_data['players']),
+        'current_players': list(room_data['usernames'].values()),
+        'spectators': len(spectators)
+    }, room=spectator_sid)
+    emit('state_snapshot', build_room_snapshot(room_data, room_id, spectator_sid), room=spectator_sid)
+    log.info('spectator_joined', room_id=room_id, sid=spectator_sid, username=username, spectators=len(spectators))
 
 
-# --- Forca (Híbrido) ---
-@socketio.on('hangman_set_word')
-def handle_hangman_set_word(data):
+# --- Chat Geral ---
+@socketio.on('chat_message')
+@instrument('chat_message')
+@rate_limited('chat_message')
+def handle_chat_message(data):
     room_id = data.get('room_id')
-    secret_word = data.get('word').strip().upper()
+    message = data.get('message')
     player_sid = request.sid
 
-    if room_id not in game_rooms or game_rooms[room_id]['game_type'] != 'hangman':
-        emit('game_error', {'message': 'Estado do jogo Forca inválido.'}, room=player_sid)
+    # Tamanho e formato são verificados antes de tocar no store.
+    if not isinstance(message, str) or not message.strip():
+        chat_messages_rejected.inc()
         return
-
-    game_state = game_rooms[room_id]['game_state']
-
-    if len(game_rooms[room_id]['players']) < 2:
-        emit('game_error', {'message': 'Não há jogadores suficientes para iniciar/prosseguir o jogo.'}, room=player_sid)
+    if len(message) > CHAT_MAX_LENGTH:
+        chat_messages_rejected.inc()
+        emit('error', {'message': f'A mensagem deve ter no máximo {CHAT_MAX_LENGTH} caracteres.'}, room=player_sid)
         return
 
-    if not game_state or game_state.get('setter_sid') is None:
-        emit('game_error', {'message': 'Jogo não inicializado corretamente. Aguarde o outro jogador.'}, room=player_sid)
-        return
-
-    if player_sid != game_state['setter_sid']:
-        emit('game_error', {'message': 'Apenas o definidor da palavra pode fazer isso!'}, room=player_sid)
-        return
-    if game_state['secret_word']:
-        emit('game_error', {'message': 'A palavra secreta já foi definida.'}, room=player_sid)
-        return
+    room_data = store.get_room(room_id)
+    if room_data and player_sid in room_data['players']:
+        username = room_data['usernames'].get(player_sid, 'Desconhecido')
+        emit_to_room('new_chat_message', {'username': username, 'message': message}, room_id, room_data)
+        lifecycle.touch(room_id, room_status(room_data))
+        log.info('chat_message', room_id=room_id, sid=player_sid, length=len(message))
 
-    if not secret_word.isalpha() or len(secret_word) < 3:
-        emit('game_error', {'message': 'A palavra deve conter apenas letras e ter no mínimo 3 caracteres.'}, room=player_sid)
-        return
-
-    game_state['secret_word'] = secret_word
-    game_state['word_display'] = '_ ' * len(secret_word)
-    game_state['guessed_letters'] = []
-    game_state['wrong_guesses'] = 0
-    game_state['game_over'] = False
-    game_state['game_winner'] = None
-
-    emit('hangman_update_tcp', {
-        'word_display': game_state['word_display'],
-        'guessed_letters': game_state['guessed_letters'],
-        'wrong_guesses': game_state['wrong_guesses'],
-        'game_over': game_state['game_over'],
-        'game_winner': game_state['game_winner'],
-        'setter_sid': game_state['setter_sid'],
-        'guesser_sid': game_state['guesser_sid']
-    }, room=room_id)
-    print(f'Palavra secreta definida para Forca na sala {room_id}.')
-    emit('game_info_message', {'message': 'A palavra secreta foi definida! Agora é a vez do adivinhador.'}, room=room_id)
 
-
-@socketio.on('hangman_guess_udp')
-def handle_hangman_guess_udp(data):
+# --- Jogadas ---
+# Os eventos de jogada e de reinício de cada jogo vêm do motor (engines.py).
+# O motor valida e aplica a jogada; aqui ficam, iguais para todos os jogos, o
+# seq, a gravação, o broadcast, o histórico e os prazos de rodada.
+def handle_game_move(event, data):
     room_id = data.get('room_id')
-    guess = data.get('letter').strip().upper()
+    room_data = store.get_room(room_id)
     player_sid = request.sid
 
-    if room_id not in game_rooms or game_rooms[room_id]['game_type'] != 'hangman':
-        emit('game_error', {'message': 'Estado do jogo Forca inválido.'}, room=player_sid)
+    if room_data is None or event not in room_engine(room_data).move_events:
+        emit('game_error', {'message': 'Estado do jogo inválido.'}, room=player_sid)
         return
+    engine = room_engine(room_data)
+    game_state = room_data['game_state']
 
-    game_state = game_rooms[room_id]['game_state']
-
-    if len(game_rooms[room_id]['players']) < 2:
+    if len(room_data['players']) < engine.min_players:
         emit('game_error', {'message': 'Não há jogadores suficientes para iniciar/prosseguir o jogo.'}, room=player_sid)
         return
-
-    if not game_state or game_state.get('guesser_sid') is None:
+    if game_state is None:
         emit('game_error', {'message': 'Jogo não inicializado corretamente. Aguarde o outro jogador.'}, room=player_sid)
         return
 
-    if player_sid != game_state['guesser_sid']:
-        emit('game_error', {'message': 'Apenas o adivinhador pode chutar letras!'}, room=player_sid)
-        return
-    if not game_state['secret_word']:
-        emit('game_error', {'message': 'Aguardando a palavra secreta ser definida!'}, room=player_sid)
-        return
-    if game_state['game_over']:
-        emit('game_error', {'message': 'O jogo já acabou!'}, room=player_sid)
-        return
-    if not guess.isalpha() or len(guess) != 1:
-        emit('game_error', {'message': 'Por favor, chute apenas uma letra!'}, room=player_sid)
+    try:
+        move = engine.validate_move(game_state, player_sid, event, data)
+    except InvalidMove as exc:
+        emit('game_error', {'message': str(exc)}, room=player_sid)
         return
-    if guess in game_state['guessed_letters']:
-        emit('game_error', {'message': f'Você já tentou a letra {guess}!'}, room=player_sid)
+    # A jogada que abre uma partida (ou rodada) é recusada durante a drenagem;
+    # a que continua uma já começada pode terminá-la.
+    if not engine.in_progress(game_state) and refuse_if_draining(player_sid, 'game_error'):
         return
 
-    game_state['guessed_letters'].append(guess)
-    new_word_display = ''
-    found_letter = False
-
-    for char in game_state['secret_word']:
-        if char in game_state['guessed_letters']:
-            new_word_display += char + ' '
-            if char == guess:
-                found_letter = True
-        else:
-            new_word_display += '_ '
+    play_move(room_id, room_data, engine, player_sid, event, move)
+    schedule_bot_turn(room_id, room_data)
+
+def play_move(room_id, room_data, engine, player_sid, event, move):
+    # Jogada já validada; usada pelo handler e pelo bot (fora de um request).
+    result = engine.apply_move(room_data['game_state'], player_sid, event, move, room_data['players'])
+    if result.opens_round:
+        room_data['round_deadline'] = time.time() + engine.round_timeout
+        timers.schedule(('round', room_id), engine.round_timeout, expire_round, room_id)
+    announce_move(room_id, room_data, result)
+    if engine.round_timeout:
+        # O aviso de pronto e o resultado saem no próximo tick, num único emit.
+        pending_rounds[room_id] = None
+
+def announce_move(room_id, room_data, result):
+    if result.event:
+        update = {'seq': next_seq(room_data), **result.update}
+        update.update(result.delta if delta_updates_enabled() else result.full)
+    save_room(room_id, room_data)
+    if result.winner is not None:
+        record_match(room_id, room_data, result.winner, result.details)
+    if result.event:
+        broadcast_to_room(result.event, update, room_id, room_data)
+    for message in result.messages:
+        broadcast_to_room('game_info_message', {'message': message}, room_id, room_data)
+    if result.log:
+        event, fields = result.log
+        log.info(event, room_id=room_id, **fields)
+    if result.winner is not None:
+        log.info('game_finished', room_id=room_id, game_id=room_data['game_type'], winner=result.winner)
+
+
+# Salas com escolhas ainda não anunciadas (dict usado como conjunto ordenado).
+pending_rounds = {}
+
+def flush_rounds():
+    """Gancho de tick: um emit por sala com a rodada resolvida ou o aviso de pronto."""
+    while pending_rounds:
+        room_id, _ = pending_rounds.popitem() # Atômico mesmo com handlers em threads
+        with store.lock(room_id):
+            room_data = store.get_room(room_id)
+            if room_data is None or room_data['game_state'] is None:
+                continue
+            result = room_engine(room_data).reveal_round(room_data['game_state'])
+            if result is not None:
+                announce_round(room_id, room_data, result)
+
+timers.add_tick_hook(flush_rounds)
+
+def expire_round(room_id):
+    with store.lock(room_id):
+        room_data = store.get_room(room_id)
+        if room_data is None or room_data['game_state'] is None:
+            return
+        result = room_engine(room_data).expire_round(room_data['game_state'])
+        if result is not None:
+            pending_rounds.pop(room_id, None)
+            announce_round(room_id, room_data, result)
+
+def announce_round(room_id, room_data, result):
+    if result.round_over:
+        timers.cancel(('round', room_id))
+        room_data.pop('round_deadline', None)
+    else:
+        result.update['time_left'] = round(max(0.0, room_data.get('round_deadline', 0) - time.time()), 1)
+    announce_move(room_id, room_data, result)
 
-    game_state['word_display'] = new_word_display.strip()
 
-    if not found_letter:
-        game_state['wrong_guesses'] += 1
+def handle_game_reset(event, data):
+    room_id = data.get('room_id')
+    room_data = store.get_room(room_id)
+    if room_data is None or room_engine(room_data).reset_event != event:
+        return
+    engine = room_engine(room_data)
+    if len(room_data['players']) < engine.min_players:
+        emit('game_error', {'message': 'Não há jogadores suficientes para reiniciar o jogo.'}, room=request.sid)
+        return
+    if refuse_if_draining(request.sid, 'game_error'):
+        return
 
-    if '_' not in game_state['word_display']:
-        game_state['game_over'] = True
-        game_state['game_winner'] = game_state['guesser_sid']
-        emit('game_info_message', {'message': f'Parabéns! O adivinhador venceu! A palavra era "{game_state["secret_word"]}"'}, room=room_id)
-    elif game_state['wrong_guesses'] >= game_state['max_wrong_guesses']:
-        game_state['game_over'] = True
-        game_state['game_winner'] = game_state['setter_sid']
-        emit('game_info_message', {'message': f'Fim de jogo! A forca foi completa. A palavra era "{game_state["secret_word"]}"'}, room=room_id)
+    timers.cancel(('round', room_id))
+    room_data.pop('round_deadline', None)
+    record_series(room_id, room_data)
+    room_data['game_state'] = engine.reset(room_data['players'], room_data['game_state'])
+    reset_fields = engine.reset_fields(room_data['game_state'])
+    seq = next_seq(room_data)
+    save_room(room_id, room_data)
+
+    emit_to_room(engine.reset_broadcast, {
+        'seq': seq,
+        'initial_state': engine.serialize(room_data['game_state']),
+        **reset_fields,
+        'usernames': room_data['usernames']
+    }, room_id, room_data)
+    log.info('game_reset', room_id=room_id, game_id=engine.game_id, **reset_fields)
+    schedule_bot_turn(room_id, room_data)
+
+
+def register_game_event(event, handler):
+    # Mesma pilha dos handlers escritos à mão: métricas, limite de taxa e lock da sala.
+    def handle(data):
+        handler(event, data)
+    handle.__name__ = f'handle_{event}'
+    socketio.on(event)(instrument(event)(rate_limited(event)(room_locked(handle))))
+
+for _engine in GAME_ENGINES.values():
+    for _event in _engine.move_events:
+        register_game_event(_event, handle_game_move)
+    register_game_event(_engine.reset_event, handle_game_reset)
+
+
+# --- Ressincronização ---
+@socketio.on('resync')
+@instrument('resync')
+@rate_limited('resync')
+@room_locked
+def handle_resync(data):
+    room_id = data.get('room_id')
+    room_data = store.get_room(room_id)
+    player_sid = request.sid
 
-    emit('hangman_update_udp', {
-        'word_display': game_state['word_display'],
-        'guessed_letters': game_state['guessed_letters'],
-        'wrong_guesses': game_state['wrong_guesses'],
-        'game_over': game_state['game_over'],
-        'game_winner': game_state['game_winner'],
-        'last_guess_letter': guess,
-        'last_guess_correct': found_letter,
-        'secret_word': game_state['secret_word']
-    }, room=room_id)
+    if room_data is None or (player_sid not in room_data['players'] and player_sid not in room_data.get('spectators', {})):
+        emit('game_error', {'message': 'Você não está nesta sala.'}, room=player_sid)
+        return
 
-    print(f'Chute de Forca UDP na sala {room_id}: {guess}. Estado: {game_state["word_display"]}')
+    # O cliente detectou um buraco na sequência: manda o estado completo atual.
+    emit('state_snapshot', build_room_snapshot(room_data, room_id, player_sid), room=player_sid)
+    log.info('resync', room_id=room_id, sid=player_sid, seq=room_data.get('seq', 0))
 
-@socketio.on('reset_hangman')
-def handle_reset_hangman(data):
-    room_id = data.get('room_id')
-    if room_id in game_rooms and game_rooms[room_id]['game_type'] == 'hangman':
-        players = game_rooms[room_id]['players']
-        if len(players) < 2:
-            emit('game_error', {'message': 'Não há jogadores suficientes para reiniciar o jogo.'}, room=request.sid)
-            return
 
-        current_setter = game_rooms[room_id]['game_state'].get('setter_sid')
-        
-        if current_setter == players[0]: 
-            new_setter_sid = players[1]
-            new_guesser_sid = players[0]
-        else: 
-            new_setter_sid = players[0]
-            new_guesser_sid = players[1]
-        
-        game_rooms[room_id]['game_state'] = initialize_hangman_game()
-        game_rooms[room_id]['game_state']['setter_sid'] = new_setter_sid
-        game_rooms[room_id]['game_state']['guesser_sid'] = new_guesser_sid
-
-        emit('hangman_reset', {
-            'initial_state': game_rooms[room_id]['game_state'],
-            'setter_sid': game_rooms[room_id]['game_state']['setter_sid'],
-            'guesser_sid': game_rooms[room_id]['game_state']['guesser_sid'],
-            'usernames': game_rooms[room_id]['usernames']
-        }, room=room_id)
-        print(f'Jogo da Forca na sala {room_id} reiniciado. Papéis trocados. Novo definidor: {game_rooms[room_id]["usernames"].get(new_setter_sid, new_setter_sid)}')
+# --- Função para rodar o servidor ---
+# Servidor de desenvolvimento (debug e reloader); em produção use serve.py.
+# --- Inicialização ---
+# Importar o app não grava arquivos nem inicia tarefas: os pontos de entrada
+# (serve.py, `python app.py`) chamam init_runtime(), que monta os bundles,
+# abre o histórico de partidas e inicia as tarefas de fundo. Servidores WSGI
+# com fábrica usam create_app() (ex.: gunicorn 'app:create_app()').
+_runtime_started = False
+
+def init_runtime():
+    global _runtime_started
+    if _runtime_started:
+        return
+    _runtime_started = True
+    if ASSET_PIPELINE:
+        static_assets.output_dir = app.config['ASSET_OUTPUT_DIR']
+        static_assets.build()
+    match_history.open(app.config['MATCH_HISTORY_DB'])
+    match_history.start()
+    log.start(socketio)
+    timers.start(socketio)
+    if recorder:
+        recorder.start(socketio)
+    start_daemon_task(socketio, run_room_sweeper)
+    start_daemon_task(socketio, run_drain_watcher)
+
+def create_app():
+    init_runtime()
+    return app
 
 
-# --- Função para rodar o servidor ---
 if __name__ == '__main__':
+    init_runtime()
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,263 @@
+import gzip
+import hashlib
+import os
+import re
+
+
+# --- Pipeline de Arquivos Estáticos ---
+# Na inicialização, os CSS/JS de cada página são concatenados em bundles,
+# minificados e gravados com o hash do conteúdo no nome (ex.:
+# game1.3f2a9c1b0d4e.js), junto com as versões .gz e .br (brotli, se o pacote
+# estiver instalado). Como o nome muda quando o conteúdo muda, os bundles são
+# servidos com cache imutável; as versões comprimidas ficam em memória e são
+# escolhidas pelo Accept-Encoding, sem comprimir nada por requisição.
+
+try:
+    import brotli
+except ImportError: # Só o .br deixa de ser gerado
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MIMETYPES = {
+    '.js': 'application/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+}
+
+
+# --- Minificação ---
+# Conservadora: remove comentários e espaços sem alterar strings, template
+# literals (o desenho da Forca depende dos espaços) e expressões regulares.
+# As quebras de linha são mantidas onde podem importar para a inserção
+# automática de ponto e vírgula.
+
+_JS_PUNCTUATION = set('{}()[];,:=+-*/%<>!&|?.~^')
+_JS_REGEX_PREFIX_WORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw', 'instanceof'}
+
+
+def _read_quoted(source, start, quote):
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if quote == '`' and source.startswith('${', i):
+            i = _read_template_expression(source, i + 2)
+            continue
+        if char == quote:
+            return i + 1
+        i += 1
+    raise ValueError('String sem fechamento no JavaScript.')
+
+
+def _read_template_expression(source, start):
+    # Conteúdo de ${...}: avança até a chave que fecha, pulando strings internas.
+    depth, i = 1, start
+    while i < len(source):
+        char = source[i]
+        if char in '"\'`':
+            i = _read_quoted(source, i, char)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise ValueError('Template literal sem fechamento no JavaScript.')
+
+
+def _read_regex(source, start):
+    i, in_class = start + 1, False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            raise ValueError('Expressão regular sem fechamento no JavaScript.')
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+                i += 1 # flags
+            return i
+        i += 1
+    raise ValueError('Expressão regular sem fechamento no JavaScript.')
+
+
+def _keeps_separator(before, after, separator):
+    if separator == '\n':
+        # Depois destes caracteres (ou antes de um fechamento) a quebra nunca encerra um comando.
+        return not (before in '{;,([' or after in ')]};,')
+    if before in _JS_PUNCTUATION or after in _JS_PUNCTUATION:
+        # Exceções: a + +b, a - -b
+        return before == after and before in '+-'
+    return True
+
+
+def _js_tokens(source):
+    """Gera (separador antes do token ou None, token), sem comentários."""
+    last_token = ''
+    separator = None
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char in ' \t\r\n':
+            j = i
+            while j < len(source) and source[j] in ' \t\r\n':
+                j += 1
+            separator = '\n' if '\n' in source[i:j] or separator == '\n' else ' '
+            i = j
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = len(source) if end == -1 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end == -1:
+                raise ValueError('Comentário sem fechamento no JavaScript.')
+            separator = separator or ' '
+            i = end + 2
+            continue
+
+        if char in '"\'`':
+            end = _read_quoted(source, i, char)
+        elif char == '/' and (not last_token or last_token[-1] in '(,=:[!&|?{};+-*%<>~^'
+                              or last_token in _JS_REGEX_PREFIX_WORDS):
+            end = _read_regex(source, i)
+        elif char.isalnum() or char in '_$':
+            end = i + 1
+            while end < len(source) and (source[end].isalnum() or source[end] in '_$'):
+                end += 1
+        else:
+            end = i + 1
+        token = source[i:end]
+        yield separator, token
+        separator = None
+        last_token = token
+        i = end
+
+
+def minify_js(source):
+    out = []
+    for separator, token in _js_tokens(source):
+        if separator and out and _keeps_separator(out[-1][-1], token[0], separator):
+            out.append(separator)
+        out.append(token)
+    return ''.join(out) + '\n'
+
+
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/|\s+', re.S)
+
+def minify_css(source):
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        return '' if match.group(0).startswith('/*') else ' '
+    css = _CSS_TOKENS.sub(replace, source)
+    css = re.sub(r' ?([{};,>]) ?', r'\1', css)
+    # Só o espaço depois de ':' sai: antes dele pode ser um seletor de descendente (a :hover).
+    css = css.replace(': ', ':')
+    return css.replace(';}', '}').strip() + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+# --- Bundles ---
+class Asset:
+    def __init__(self, name, filename, content):
+        self.name = name
+        self.filename = filename
+        self.etag = hashlib.sha256(content).hexdigest()[:12]
+        self.mimetype = MIMETYPES[os.path.splitext(name)[1]]
+        self.variants = {'identity': content, 'gzip': gzip.compress(content, 9, mtime=0)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(content, quality=11)
+
+    def variant_for(self, accept_encoding):
+        """(encoding, bytes) mais compacto aceito pelo cliente."""
+        accepted = {part.split(';')[0].strip() for part in (accept_encoding or '').lower().split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.variants:
+                return encoding, self.variants[encoding]
+        return 'identity', self.variants['identity']
+
+
+class AssetPipeline:
+    def __init__(self, static_dir, bundles, output_dir=None, minify=True):
+        """`bundles` mapeia o nome do bundle (ex.: 'game1.js') para os arquivos de `static_dir`, em ordem."""
+        self.static_dir = static_dir
+        self.bundles = bundles
+        self.output_dir = output_dir
+        self.minify = minify
+        self.assets = {}     # nome do bundle -> Asset
+        self.by_filename = {} # nome com hash -> Asset
+
+    def build(self):
+        assets = {}
+        for name, sources in self.bundles.items():
+            parts = []
+            for source in sources:
+                with open(os.path.join(self.static_dir, source), encoding='utf-8') as source_file:
+                    parts.append(source_file.read())
+            extension = os.path.splitext(name)[1]
+            # ';' evita que dois scripts concatenados virem uma só expressão.
+            content = (';\n' if extension == '.js' else '\n').join(parts)
+            if self.minify:
+                content = MINIFIERS[extension](content)
+            content = content.encode('utf-8')
+            stem = os.path.splitext(name)[0]
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            assets[name] = Asset(name, f'{stem}.{digest}{extension}', content)
+        self.assets = assets
+        self.by_filename = {asset.filename: asset for asset in assets.values()}
+        if self.output_dir:
+            self._write(assets.values())
+        return self
+
+    def _write(self, assets):
+        # Para servir os bundles direto do proxy/CDN (ex.: gzip_static do nginx).
+        os.makedirs(self.output_dir, exist_ok=True)
+        suffixes = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+        for asset in assets:
+            for encoding, content in asset.variants.items():
+                path = os.path.join(self.output_dir, asset.filename + suffixes[encoding])
+                if not os.path.exists(path):
+                    with open(path, 'wb') as output_file:
+                        output_file.write(content)
+
+    def filename(self, name):
+        return self.assets[name].filename
+
+    def sources(self, name):
+        return self.bundles[name]
+
+    def get(self, filename):
+        return self.by_filename.get(filename)
+
+    def total_bytes(self, encoding='identity'):
+        return sum(len(asset.variants.get(encoding, asset.variants['identity'])) for asset in self.assets.values())
+
+
+class PageCache:
+    """HTML renderizado por chave (página, jogo), com as versões comprimidas."""
+
+    def __init__(self):
+        self.pages = {}
+
+    def get_or_render(self, key, render):
+        page = self.pages.get(key)
+        if page is None:
+            page = self.pages[key] = Asset('page.html', None, render().encode('utf-8'))
+        return page
+
+    def clear(self):
+        self.pages.clear()
@@ -0,0 +1,104 @@
+import os
+import sys
+
+
+# --- Modo Assíncrono ---
+# Com eventlet ou gevent, o I/O da biblioteca padrão só coopera com o hub
+# depois do monkey patching: sem ele cada chamada ao Redis (ROOM_STORE_URL,
+# SOCKETIO_MESSAGE_QUEUE) e o time.sleep da espera pelo lock de sala bloqueiam
+# o worker inteiro, e o RedisManager do Flask-SocketIO se recusa a iniciar.
+# Os pontos de entrada (serve.py e `python app.py`) chamam monkey_patch()
+# antes de qualquer outro import; workers do gunicorn com eventlet/gevent já
+# fazem isso sozinhos.
+
+def selected_async_mode():
+    """O modo de SOCKETIO_ASYNC_MODE ou, sem ele, o que o Flask-SocketIO detectaria."""
+    mode = os.environ.get('SOCKETIO_ASYNC_MODE')
+    if mode:
+        return mode
+    for candidate in ('eventlet', 'gevent'):
+        try:
+            __import__(candidate)
+        except ImportError:
+            continue
+        return candidate
+    return 'threading'
+
+
+def monkey_patch():
+    mode = selected_async_mode()
+    if mode == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    elif mode == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+    return mode
+
+
+def is_monkey_patched(mode):
+    if mode == 'eventlet':
+        from eventlet.patcher import is_monkey_patched as eventlet_patched
+        return eventlet_patched('socket')
+    if mode == 'gevent':
+        from gevent import monkey
+        return monkey.is_module_patched('socket')
+    return True
+
+
+def patched_mode():
+    """'eventlet' ou 'gevent' se este processo passou pelo monkey patching; senão None."""
+    for mode in ('eventlet', 'gevent'):
+        if mode in sys.modules and is_monkey_patched(mode):
+            return mode
+    return None
+
+
+def run_blocking(func, *args):
+    """Executa `func` numa thread do sistema, sem segurar o hub, e devolve o resultado.
+
+    Depois do monkey patching as threads viram green threads: I/O que não
+    coopera com o hub (SQLite, por exemplo) pararia todos os sockets. Sem
+    patching a chamada é direta.
+    """
+    mode = patched_mode()
+    if mode == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(func, *args)
+    if mode == 'gevent':
+        import gevent
+        return gevent.get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+
+def native_lock():
+    """Lock do sistema (não green), para dados usados dentro de run_blocking."""
+    mode = patched_mode()
+    if mode == 'eventlet':
+        from eventlet import patcher
+        return patcher.original('threading').Lock()
+    if mode == 'gevent':
+        from gevent import monkey
+        return monkey.get_original('_thread', 'allocate_lock')()
+    import threading
+    return threading.Lock()
+
+
+def start_daemon_task(socketio, target, *args, **kwargs):
+    """Como socketio.start_background_task, mas a tarefa não segura a saída do processo.
+
+    Com threading e com eventlet o Engine.IO cria as tarefas como threads não
+    daemon, e os laços infinitos das tarefas de fundo impediriam o
+    interpretador de sair depois do servidor; por isso a classe da thread é
+    escolhida aqui pelo modo. Greenlets do gevent nunca seguram a saída.
+    """
+    if socketio.async_mode == 'threading':
+        import threading
+        thread_class = threading.Thread
+    elif socketio.async_mode == 'eventlet':
+        from eventlet.green.threading import Thread as thread_class
+    else:
+        return socketio.start_background_task(target, *args, **kwargs)
+    task = thread_class(target=target, args=args, kwargs=kwargs, daemon=True)
+    task.start()
+    return task
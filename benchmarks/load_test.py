@@ -0,0 +1,352 @@
+"""Benchmark de carga dos eventos Socket.IO do app.py.
+
+Simula pares de jogadores que entram em salas via `create_or_join_room` e
+jogam partidas completas de jogo da velha, pedra-papel-tesoura e forca,
+além de mensagens de chat. Mede a latência de ida e volta de cada evento
+(do emit até a chegada da resposta esperada) e a vazão total.
+
+Modos:
+  inprocess  usa o test client do Flask-SocketIO dentro deste processo; as
+             salas avançam intercaladas, uma jogada de cada vez, para manter
+             todas ativas ao mesmo tempo.
+  remote     conecta ao servidor em --url com o cliente do python-socketio
+             (requer `pip install "python-socketio[client]"`); cada sala roda
+             em sua própria thread.
+
+Os limites de taxa (RATE_LIMITS) ficam desligados no modo inprocess; no modo
+remote, suba o servidor com RATE_LIMITS=off para medir a capacidade bruta.
+Contra um servidor com SOCKETIO_SERIALIZER=msgpack use --serializer msgpack.
+
+Exemplos:
+  python benchmarks/load_test.py --rooms 200 --output resultados.json
+  python benchmarks/load_test.py --mode remote --url http://localhost:5000 --rooms 50
+  python benchmarks/load_test.py --mode remote --serializer msgpack --rooms 50
+  python benchmarks/load_test.py --rooms 200 --compare resultados.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAMES = ('tic-tac-toe', 'rock-paper-scissors', 'hangman')
+
+
+# --- Cenários ---
+# Cada cenário é um gerador de passos (índice do jogador, evento, payload,
+# evento esperado, predicado sobre o payload recebido). O predicado identifica
+# a resposta daquele passo, e não um broadcast antigo do mesmo evento.
+
+def join_steps(room_id, game_id):
+    yield (0, 'create_or_join_room', {'gameId': game_id, 'username': f'{room_id}-a', 'roomId': room_id},
+           'room_joined', lambda data: data.get('room_id') == room_id)
+    yield (1, 'create_or_join_room', {'gameId': game_id, 'username': f'{room_id}-b', 'roomId': room_id},
+           'game_start', lambda data: data.get('room_id') == room_id)
+
+
+def chat_steps(room_id, messages):
+    for i in range(messages):
+        text = f'msg-{room_id}-{i}'
+        yield (i % 2, 'chat_message', {'room_id': room_id, 'message': text},
+               'new_chat_message', lambda data, text=text: data.get('message') == text)
+
+
+def tic_tac_toe_steps(room_id, games, chat_messages):
+    yield from join_steps(room_id, 'tic-tac-toe')
+    for game in range(games):
+        # Quem começa alterna a cada reinício; X vence pela linha de cima.
+        first, second = (0, 1) if game % 2 == 0 else (1, 0)
+        for turn, cell in enumerate((0, 3, 1, 4, 2)):
+            player = first if turn % 2 == 0 else second
+            yield (player, 'tic_tac_toe_move', {'room_id': room_id, 'cell_index': cell},
+                   'tic_tac_toe_update', lambda data, cell=cell: data.get('cell_index') == cell)
+        yield from chat_steps(room_id, chat_messages)
+        if game < games - 1:
+            yield (0, 'reset_tic_tac_toe', {'room_id': room_id}, 'tic_tac_toe_reset', lambda data: True)
+
+
+def rps_steps(room_id, rounds, chat_messages, rng):
+    yield from join_steps(room_id, 'rock-paper-scissors')
+    for _ in range(rounds):
+        yield (0, 'rps_choice', {'room_id': room_id, 'choice': rng.choice(('pedra', 'papel', 'tesoura'))},
+               'rps_player_ready', lambda data: True)
+        yield (1, 'rps_choice', {'room_id': room_id, 'choice': rng.choice(('pedra', 'papel', 'tesoura'))},
+               'rps_round_result', lambda data: True)
+    yield from chat_steps(room_id, chat_messages)
+
+
+def hangman_steps(room_id, games, chat_messages):
+    yield from join_steps(room_id, 'hangman')
+    for game in range(games):
+        setter, guesser = (0, 1) if game % 2 == 0 else (1, 0)
+        yield (setter, 'hangman_set_word', {'room_id': room_id, 'word': 'REDES'},
+               'hangman_update_tcp', lambda data: True)
+        for letter in 'RXEDS':
+            yield (guesser, 'hangman_guess_udp', {'room_id': room_id, 'letter': letter},
+                   'hangman_update_udp', lambda data, letter=letter: data.get('last_guess_letter') == letter)
+        yield from chat_steps(room_id, chat_messages)
+        if game < games - 1:
+            yield (0, 'reset_hangman', {'room_id': room_id}, 'hangman_reset', lambda data: True)
+
+
+def build_scenario(game_id, room_id, args, rng):
+    if game_id == 'tic-tac-toe':
+        return tic_tac_toe_steps(room_id, args.games_per_room, args.chat_messages)
+    if game_id == 'rock-paper-scissors':
+        return rps_steps(room_id, args.rps_rounds, args.chat_messages, rng)
+    return hangman_steps(room_id, args.games_per_room, args.chat_messages)
+
+
+# --- Jogadores ---
+class InProcessPlayer:
+    def __init__(self, app_module):
+        self.client = app_module.socketio.test_client(app_module.app)
+
+    def emit(self, event, payload):
+        self.client.emit(event, payload)
+
+    def poll(self, expected_event, predicate):
+        """Verifica, sem bloquear, se a resposta esperada já chegou."""
+        return any(message['name'] == expected_event and predicate(message['args'][0])
+                   for message in self.client.get_received())
+
+    def drain(self):
+        self.client.get_received()
+
+    def close(self):
+        self.client.disconnect()
+
+
+class RemotePlayer:
+    def __init__(self, url, serializer='json'):
+        import socketio
+        self.inbox = queue.Queue()
+        self.client = socketio.Client(reconnection=False, serializer='default' if serializer == 'json' else serializer)
+        self.client.on('*', lambda event, data=None: self.inbox.put((event, data)))
+        self.client.connect(url, transports=['websocket'])
+
+    def send(self, event, payload, expected_event, predicate, timeout):
+        started = time.perf_counter()
+        self.client.emit(event, payload)
+        deadline = started + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return time.perf_counter() - started, False
+            try:
+                name, data = self.inbox.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if name == expected_event and predicate(data or {}):
+                return time.perf_counter() - started, True
+
+    def drain(self):
+        pass # A fila é consumida durante send()
+
+    def close(self):
+        self.client.disconnect()
+
+
+# --- Execução ---
+class Results:
+    def __init__(self):
+        self.latencies = {}
+        self.failures = {}
+        self.lock = threading.Lock()
+
+    def record(self, event, elapsed, ok):
+        with self.lock:
+            self.latencies.setdefault(event, []).append(elapsed)
+            if not ok:
+                self.failures[event] = self.failures.get(event, 0) + 1
+
+
+def run_inprocess(args, results):
+    os.environ.setdefault('LOG_LEVEL', 'warning')
+    # Os jogadores simulados jogam bem mais rápido que pessoas.
+    os.environ.setdefault('RATE_LIMITS', 'off')
+    os.environ.setdefault('MATCH_HISTORY_DB', ':memory:')
+    os.environ.setdefault('ASSET_PIPELINE', '0')
+    sys.path.insert(0, ROOT_DIR)
+    import app as app_module
+    # A roda de temporizadores entrega as rodadas do PPT.
+    app_module.init_runtime()
+
+    rng = random.Random(args.seed)
+    rooms = []
+    for index in range(args.rooms):
+        game_id = GAMES[index % len(GAMES)] if args.game == 'all' else args.game
+        room_id = f'bench-{game_id}-{index}'
+        players = (InProcessPlayer(app_module), InProcessPlayer(app_module))
+        rooms.append((players, build_scenario(game_id, room_id, args, rng)))
+
+    # Cada sala tem no máximo um passo em andamento. Respostas que saem só no
+    # tick do servidor (ex.: rodadas do PPT) deixam o passo pendente enquanto
+    # as outras salas avançam; entre as voltas o hub é cedido à roda de
+    # temporizadores do servidor.
+    started = time.perf_counter()
+    active = [[players, steps, None] for players, steps in rooms]
+    while active:
+        still_active = []
+        waiting = False
+        for room in active:
+            players, steps, pending = room
+            if pending is None:
+                step = next(steps, None)
+                if step is None:
+                    continue
+                player, event, payload, expected_event, predicate = step
+                pending = room[2] = (step, time.perf_counter())
+                players[player].emit(event, payload)
+            (player, event, payload, expected_event, predicate), sent_at = pending
+            ok = players[player].poll(expected_event, predicate)
+            elapsed = time.perf_counter() - sent_at
+            if ok or elapsed >= args.timeout:
+                players[1 - player].drain()
+                results.record(event, elapsed, ok)
+                room[2] = None
+            else:
+                waiting = True
+            still_active.append(room)
+        active = still_active
+        if waiting:
+            app_module.socketio.sleep(0.001)
+    duration = time.perf_counter() - started
+
+    for players, _ in rooms:
+        for player in players:
+            player.close()
+    return duration
+
+
+def run_remote(args, results):
+    if any(importlib.util.find_spec(name) is None for name in ('socketio', 'websocket')):
+        sys.exit('O modo remote requer: pip install "python-socketio[client]"')
+
+    def play_room(index, seed):
+        rng = random.Random(seed)
+        game_id = GAMES[index % len(GAMES)] if args.game == 'all' else args.game
+        room_id = f'bench-{game_id}-{index}-{os.getpid()}'
+        players = (RemotePlayer(args.url, args.serializer), RemotePlayer(args.url, args.serializer))
+        try:
+            for player, event, payload, expected_event, predicate in build_scenario(game_id, room_id, args, rng):
+                elapsed, ok = players[player].send(event, payload, expected_event, predicate, args.timeout)
+                results.record(event, elapsed, ok)
+                if args.think_time:
+                    time.sleep(args.think_time)
+        finally:
+            for player in players:
+                player.close()
+
+    threads = [threading.Thread(target=play_room, args=(index, args.seed + index)) for index in range(args.rooms)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(args, results, duration):
+    events = {}
+    total = 0
+    for event, values in sorted(results.latencies.items()):
+        values.sort()
+        total += len(values)
+        events[event] = {
+            'count': len(values),
+            'failures': results.failures.get(event, 0),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3)
+        }
+    return {
+        'commit': current_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'duration_s': round(duration, 3),
+        'total_events': total,
+        'throughput_eps': round(total / duration, 1) if duration else 0.0,
+        'events': events
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(summary, baseline=None):
+    print(f"Commit {summary['commit']} | {summary['total_events']} eventos em {summary['duration_s']}s "
+          f"({summary['throughput_eps']} eventos/s)")
+    header = f"{'evento':<22}{'n':>8}{'falhas':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    if baseline:
+        header += f"{'p95 vs base':>14}"
+    print(header)
+    for event, stats in summary['events'].items():
+        line = (f"{event:<22}{stats['count']:>8}{stats['failures']:>8}{stats['p50_ms']:>10}"
+                f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+        base_stats = baseline['events'].get(event) if baseline else None
+        if base_stats and base_stats['p95_ms']:
+            line += f"{(stats['p95_ms'] / base_stats['p95_ms'] - 1) * 100:>+13.1f}%"
+        print(line)
+    if baseline:
+        print(f"Vazão: {summary['throughput_eps']} eventos/s (base {baseline['throughput_eps']}, commit {baseline['commit']})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de carga dos eventos Socket.IO.')
+    parser.add_argument('--mode', choices=('inprocess', 'remote'), default='inprocess')
+    parser.add_argument('--url', default='http://localhost:5000', help='Servidor para o modo remote.')
+    parser.add_argument('--serializer', choices=('json', 'msgpack'), default='json',
+                        help='Serializador do cliente no modo remote (igual ao SOCKETIO_SERIALIZER do servidor).')
+    parser.add_argument('--rooms', type=int, default=100, help='Salas simultâneas (2 jogadores cada).')
+    parser.add_argument('--game', choices=GAMES + ('all',), default='all')
+    parser.add_argument('--games-per-room', type=int, default=3, help='Partidas de velha/forca por sala.')
+    parser.add_argument('--rps-rounds', type=int, default=10)
+    parser.add_argument('--chat-messages', type=int, default=4, help='Mensagens de chat por partida.')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Pausa entre jogadas no modo remote (s).')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Espera máxima por resposta (s).')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Grava o resultado em JSON neste arquivo.')
+    parser.add_argument('--compare', help='JSON de uma execução anterior para comparar.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = Results()
+    duration = run_inprocess(args, results) if args.mode == 'inprocess' else run_remote(args, results)
+    summary = summarize(args, results, duration)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(summary, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(summary, output_file, indent=2)
+    return 0 if not any(results.failures.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,371 @@
+"""Replay de eventos gravados (EVENT_RECORD_PATH) pelos handlers do app.py.
+
+Lê uma gravação do event_recorder.py e reenvia cada evento, na ordem
+gravada, pelo test client do Flask-SocketIO: cada conexão gravada vira um
+cliente, criado no 'connect' (ou no primeiro evento, se a gravação começou
+com a conexão já aberta) e desconectado no 'disconnect'. Os handlers rodam
+neste processo, com os limites de taxa desligados e o gerador aleatório
+semeado, para que duas execuções sobre a mesma gravação sigam o mesmo
+caminho.
+
+IDs gerados pelo servidor (salas do quick_play e dos bots, tokens de
+retomada) não se repetem no replay: um room_id desconhecido é traduzido para
+a sala em que a conexão está agora, e um token de resume_session
+desconhecido para o do único jogador desconectado da sala.
+
+Velocidade:
+  --speed 1    respeita os intervalos gravados (temporizadores do servidor,
+               como a rodada do PPT e os bots, disparam como em produção)
+  --speed 10   10x mais rápido
+  --speed 0    sem pausas (padrão; mede só o custo dos handlers). O que
+               depende de temporizador não chega a acontecer: jogadas
+               seguintes do PPT, por exemplo, falham com a rodada ainda aberta
+
+Perfis (--profile):
+  none      latência de cada handler (tempo do emit até o handler retornar)
+  cprofile  um cProfile por evento; lista as funções com mais tempo próprio
+            dentro de cada handler (--pstats-dir grava os .pstats)
+  sample    amostra a pilha da thread do replay a cada --sample-interval e
+            atribui cada amostra ao evento em andamento; --folded grava as
+            pilhas no formato de flame graph (evento;função;...;função n)
+
+Exemplos:
+  EVENT_RECORD_PATH=eventos-{pid}.jsonl.gz python app.py
+  python benchmarks/replay.py eventos-1234.jsonl.gz --profile cprofile --top 8
+  python benchmarks/replay.py eventos-1234.jsonl.gz --speed 1 --profile sample --folded pilhas.txt
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from event_recorder import read_recording # noqa: E402
+
+# Respostas que indicam que o evento não teve efeito no replay.
+FAILURE_EVENTS = ('error', 'game_error', 'resume_failed')
+
+
+def load_app():
+    os.environ.pop('EVENT_RECORD_PATH', None)
+    os.environ.setdefault('LOG_LEVEL', 'warning')
+    os.environ.setdefault('MATCH_HISTORY_DB', ':memory:')
+    os.environ['RATE_LIMITS'] = 'off'
+    # O test client só fala o serializador padrão.
+    os.environ['SOCKETIO_SERIALIZER'] = 'json'
+    os.environ.setdefault('ASSET_PIPELINE', '0')
+    import app as app_module
+    app_module.init_runtime()
+    return app_module
+
+
+# --- Conexões ---
+class ReplaySession:
+    def __init__(self, app_module):
+        self.app_module = app_module
+        self.clients = {} # nº da conexão gravada -> test client
+        self.room_aliases = {}
+
+    def client(self, number, auth=None):
+        client = self.clients.get(number)
+        if client is None:
+            client = self.clients[number] = self.app_module.socketio.test_client(self.app_module.app, auth=auth)
+        return client
+
+    def sid(self, client):
+        return self.app_module.socketio.server.manager.sid_from_eio_sid(client.eio_sid, '/')
+
+    def translate(self, client, event, args):
+        """Troca IDs gerados na gravação pelos equivalentes deste replay."""
+        if not args or not isinstance(args[0], dict) or not isinstance(args[0].get('room_id'), str):
+            return args
+        payload = dict(args[0])
+        store = self.app_module.store
+        recorded_room = payload['room_id']
+        room_id = self.room_aliases.get(recorded_room, recorded_room)
+        if not store.room_exists(room_id):
+            user_info = store.get_user(self.sid(client))
+            if user_info and user_info.get('room_id'):
+                room_id = self.room_aliases[recorded_room] = user_info['room_id']
+        payload['room_id'] = room_id
+        if event == 'resume_session':
+            room_data = store.get_room(room_id)
+            if room_data and payload.get('token') not in room_data.get('resume_tokens', {}):
+                waiting = [token for token, sid in room_data['resume_tokens'].items()
+                           if sid in room_data.get('disconnected', {})]
+                if len(waiting) == 1:
+                    payload['token'] = waiting[0]
+        return [payload] + list(args[1:])
+
+    def dispatch(self, number, event, args):
+        """Envia um evento gravado; retorna quantas respostas de falha ele gerou."""
+        if event == 'connect':
+            if number not in self.clients:
+                self.client(number, auth=args[0] if args else None)
+            return 0
+        client = self.clients.get(number) if event == 'disconnect' else self.client(number)
+        if event == 'disconnect':
+            if client is not None:
+                del self.clients[number]
+                client.disconnect()
+            return 0
+        client.emit(event, *self.translate(client, event, args))
+        return sum(1 for message in client.get_received() if message['name'] in FAILURE_EVENTS)
+
+    def drain(self):
+        # Os broadcasts se acumulam na fila de cada cliente.
+        for client in self.clients.values():
+            client.get_received()
+
+    def close(self):
+        for client in list(self.clients.values()):
+            client.disconnect()
+        self.clients.clear()
+
+
+# --- Perfis ---
+class NoProfiler:
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def enter(self, event):
+        pass
+
+    def leave(self, event):
+        pass
+
+    def report(self, top):
+        return {}
+
+
+class CProfileProfiler(NoProfiler):
+    def __init__(self):
+        self.profiles = defaultdict(cProfile.Profile)
+
+    def enter(self, event):
+        self.profiles[event].enable()
+
+    def leave(self, event):
+        self.profiles[event].disable()
+
+    def report(self, top):
+        hotspots = {}
+        for event, profile in self.profiles.items():
+            stats = pstats.Stats(profile).stats
+            rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+            hotspots[event] = [{
+                'function': format_function(*key),
+                'calls': calls,
+                'own_ms': round(own * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3)
+            } for key, (_, calls, own, cumulative, _) in rows]
+        return hotspots
+
+    def dump(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for event, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(directory, f'{event}.pstats'))
+
+
+class SamplingProfiler(NoProfiler):
+    """Amostra a pilha da thread do replay numa thread separada."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.current_event = None
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter() # (evento, pilha da raiz até a folha) -> amostras
+        self.running = False
+        self.sampler = None
+        self._switch_interval = None
+
+    def start(self):
+        # Sem isso a thread de amostragem só pega o GIL a cada 5 ms.
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self.running = True
+        self.sampler = threading.Thread(target=self._run, daemon=True)
+        self.sampler.start()
+
+    def stop(self):
+        self.running = False
+        self.sampler.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def enter(self, event):
+        self.current_event = event
+
+    def leave(self, event):
+        self.current_event = None
+
+    def _run(self):
+        while self.running:
+            time.sleep(self.interval)
+            event = self.current_event
+            frame = sys._current_frames().get(self.thread_id)
+            if event is None or frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(format_function(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self.stacks[event, tuple(reversed(stack))] += 1
+
+    def report(self, top):
+        leaves = defaultdict(Counter)
+        totals = Counter()
+        for (event, stack), samples in self.stacks.items():
+            # A pilha inclui o próprio replay; o que interessa é a folha.
+            leaves[event][stack[-1]] += samples
+            totals[event] += samples
+        return {event: [{'function': function, 'samples': samples,
+                         'percent': round(samples / totals[event] * 100, 1)}
+                        for function, samples in counter.most_common(top)]
+                for event, counter in leaves.items()}
+
+    def write_folded(self, path):
+        with open(path, 'w', encoding='utf-8') as folded:
+            for (event, stack), samples in sorted(self.stacks.items()):
+                folded.write(';'.join((event,) + stack) + f' {samples}\n')
+
+
+def format_function(filename, line, name):
+    if filename.startswith(ROOT_DIR):
+        filename = os.path.relpath(filename, ROOT_DIR)
+    elif os.sep in filename:
+        filename = os.path.basename(filename)
+    return f'{filename}:{line}({name})'
+
+
+# --- Execução ---
+def replay(args, session, profiler):
+    latencies = defaultdict(list)
+    failures = Counter()
+    started = time.perf_counter()
+    profiler.start()
+    try:
+        for index, (elapsed_ms, number, event, event_args) in enumerate(read_recording(args.recording)):
+            if args.limit and index >= args.limit:
+                break
+            if args.speed:
+                delay = started + elapsed_ms / 1000 / args.speed - time.perf_counter()
+                if delay > 0:
+                    session.app_module.socketio.sleep(delay)
+            profiler.enter(event)
+            sent_at = time.perf_counter()
+            failed = session.dispatch(number, event, event_args)
+            latencies[event].append(time.perf_counter() - sent_at)
+            profiler.leave(event)
+            if failed:
+                failures[event] += 1
+            if index % 1000 == 999:
+                session.drain()
+    finally:
+        profiler.stop()
+        session.close()
+    return latencies, failures, time.perf_counter() - started
+
+
+def percentile(sorted_values, fraction):
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(args, latencies, failures, duration, hotspots):
+    handlers = {}
+    for event, values in sorted(latencies.items(), key=lambda item: sum(item[1]), reverse=True):
+        values.sort()
+        handlers[event] = {
+            'count': len(values),
+            'failures': failures.get(event, 0),
+            'total_ms': round(sum(values) * 1000, 3),
+            'mean_us': round(sum(values) / len(values) * 1e6, 1),
+            'p95_us': round(percentile(values, 0.95) * 1e6, 1),
+            'max_us': round(values[-1] * 1e6, 1),
+            'hotspots': hotspots.get(event, [])
+        }
+    total = sum(stats['count'] for stats in handlers.values())
+    return {
+        'recording': args.recording,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {key: value for key, value in vars(args).items() if key not in ('recording', 'output')},
+        'duration_s': round(duration, 3),
+        'total_events': total,
+        'throughput_eps': round(total / duration, 1) if duration else 0.0,
+        'handlers': handlers
+    }
+
+
+def print_report(summary):
+    print(f"{summary['recording']} | {summary['total_events']} eventos em {summary['duration_s']}s "
+          f"({summary['throughput_eps']} eventos/s)")
+    print(f"{'evento':<22}{'n':>8}{'falhas':>8}{'total ms':>11}{'média µs':>10}{'p95 µs':>10}{'max µs':>10}")
+    for event, stats in summary['handlers'].items():
+        print(f"{event:<22}{stats['count']:>8}{stats['failures']:>8}{stats['total_ms']:>11}"
+              f"{stats['mean_us']:>10}{stats['p95_us']:>10}{stats['max_us']:>10}")
+    for event, stats in summary['handlers'].items():
+        if not stats['hotspots']:
+            continue
+        print(f'\n{event}')
+        for hotspot in stats['hotspots']:
+            if 'own_ms' in hotspot:
+                print(f"  {hotspot['own_ms']:>10.3f} ms próprio {hotspot['cumulative_ms']:>10.3f} ms acum. "
+                      f"{hotspot['calls']:>8}x  {hotspot['function']}")
+            else:
+                print(f"  {hotspot['percent']:>6.1f}% {hotspot['samples']:>8} amostras  {hotspot['function']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Reproduz eventos gravados e mede os handlers.')
+    parser.add_argument('recording', help='Arquivo gravado com EVENT_RECORD_PATH (.jsonl ou .jsonl.gz).')
+    parser.add_argument('--speed', type=float, default=0.0, help='Multiplicador da velocidade gravada (0 = sem pausas).')
+    parser.add_argument('--limit', type=int, default=0, help='Reproduz só os primeiros N eventos.')
+    parser.add_argument('--profile', choices=('none', 'cprofile', 'sample'), default='none')
+    parser.add_argument('--top', type=int, default=10, help='Funções listadas por handler.')
+    parser.add_argument('--sample-interval', type=float, default=0.001, help='Intervalo entre amostras (s).')
+    parser.add_argument('--pstats-dir', help='Com --profile cprofile, grava um .pstats por evento aqui.')
+    parser.add_argument('--folded', help='Com --profile sample, grava as pilhas para flame graph neste arquivo.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Grava o relatório em JSON neste arquivo.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    session = ReplaySession(load_app())
+    if args.profile == 'cprofile':
+        profiler = CProfileProfiler()
+    elif args.profile == 'sample':
+        profiler = SamplingProfiler(args.sample_interval)
+    else:
+        profiler = NoProfiler()
+
+    latencies, failures, duration = replay(args, session, profiler)
+    summary = summarize(args, latencies, failures, duration, profiler.report(args.top))
+    print_report(summary)
+
+    if args.pstats_dir and isinstance(profiler, CProfileProfiler):
+        profiler.dump(args.pstats_dir)
+    if args.folded and isinstance(profiler, SamplingProfiler):
+        profiler.write_folded(args.folded)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(summary, output_file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Benchmark dos serializadores do transporte Socket.IO (JSON x MessagePack).
+
+Roda as partidas simuladas do load_test.py (modo inprocess) e captura cada
+emit do servidor. Depois codifica os mesmos pacotes com o serializador
+padrão (JSON) e com o MessagePack, medindo por evento:
+
+  bytes      tamanho do pacote no fio (mensagem Engine.IO, sem o frame WebSocket)
+  deflate    tamanho com permessage-deflate; por padrão cada mensagem é
+             comprimida sozinha (no_context_takeover, o pior caso), com
+             --context-takeover o dicionário é mantido entre as mensagens,
+             como faz uma conexão que negociou a extensão sem restrições
+  µs         tempo médio de codificação de um pacote
+
+Requer `pip install msgpack`.
+
+Exemplos:
+  python benchmarks/serialization_bench.py
+  python benchmarks/serialization_bench.py --rooms 90 --context-takeover --output serializacao.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import zlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import load_test # noqa: E402
+
+SERIALIZERS = ('json', 'msgpack')
+
+
+def capture_emits(args):
+    """Executa o cenário do load_test e retorna [(evento, argumentos)] de cada emit."""
+    os.environ.setdefault('LOG_LEVEL', 'warning')
+    os.environ.setdefault('RATE_LIMITS', 'off')
+    os.environ.setdefault('MATCH_HISTORY_DB', ':memory:')
+    sys.path.insert(0, load_test.ROOT_DIR)
+    import app as app_module
+
+    captured = []
+    count_emit = app_module.socket_metrics.count_emit
+
+    def recording_count_emit(event, emit_args, source_event=None):
+        captured.append((event, list(emit_args)))
+        return count_emit(event, emit_args, source_event)
+
+    app_module.socket_metrics.count_emit = recording_count_emit
+    try:
+        load_test.run_inprocess(args, load_test.Results())
+    finally:
+        app_module.socket_metrics.count_emit = count_emit
+    return captured
+
+
+def packet_encoders():
+    from socketio import packet
+    from socketio.msgpack_packet import MsgPackPacket
+
+    def encode_json(event, emit_args):
+        # Mensagem Engine.IO de texto: prefixo '4' + pacote Socket.IO.
+        return ('4' + packet.Packet(packet.EVENT, data=[event] + emit_args).encode()).encode('utf-8')
+
+    def encode_msgpack(event, emit_args):
+        # Mensagens binárias do Engine.IO vão sem prefixo.
+        return MsgPackPacket(packet.EVENT, data=[event] + emit_args).encode()
+
+    return {'json': encode_json, 'msgpack': encode_msgpack}
+
+
+class Deflater:
+    def __init__(self, context_takeover):
+        self.context_takeover = context_takeover
+        self.compressor = None
+
+    def size(self, message):
+        if self.compressor is None or not self.context_takeover:
+            self.compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+        compressed = self.compressor.compress(message) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        # O permessage-deflate remove o 00 00 ff ff final do flush (RFC 7692).
+        return len(compressed) - 4
+
+
+def measure(captured, repeat, context_takeover):
+    encoders = packet_encoders()
+    events = {}
+    for serializer, encode in encoders.items():
+        deflater = Deflater(context_takeover)
+        for event, emit_args in captured:
+            stats = events.setdefault(event, {'count': 0})
+            if serializer == 'json':
+                stats['count'] += 1
+            started = time.perf_counter()
+            for _ in range(repeat):
+                message = encode(event, emit_args)
+            elapsed = (time.perf_counter() - started) / repeat
+            stats[f'{serializer}_bytes'] = stats.get(f'{serializer}_bytes', 0) + len(message)
+            stats[f'{serializer}_deflate_bytes'] = stats.get(f'{serializer}_deflate_bytes', 0) + deflater.size(message)
+            stats[f'{serializer}_encode_s'] = stats.get(f'{serializer}_encode_s', 0.0) + elapsed
+    return events
+
+
+def summarize(args, events):
+    total = {'count': 0}
+    for stats in events.values():
+        for key, value in stats.items():
+            total[key] = total.get(key, 0) + value
+    return {
+        'commit': load_test.current_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'events': dict(sorted(events.items())),
+        'total': total
+    }
+
+
+def print_report(summary):
+    print(f"Commit {summary['commit']} | {summary['total']['count']} pacotes capturados"
+          f" | deflate {'com' if summary['config']['context_takeover'] else 'sem'} contexto")
+    header = f"{'evento':<28}{'n':>7}"
+    for serializer in SERIALIZERS:
+        header += f"{serializer + ' B':>12}{'+deflate':>10}{'µs':>8}"
+    print(header)
+    rows = list(summary['events'].items()) + [('TOTAL', summary['total'])]
+    for event, stats in rows:
+        line = f"{event:<28}{stats['count']:>7}"
+        for serializer in SERIALIZERS:
+            line += (f"{stats[f'{serializer}_bytes']:>12}{stats[f'{serializer}_deflate_bytes']:>10}"
+                     f"{stats[f'{serializer}_encode_s'] / stats['count'] * 1e6:>8.1f}")
+        print(line)
+    total = summary['total']
+    print(f"msgpack vs json: bytes {(total['msgpack_bytes'] / total['json_bytes'] - 1) * 100:+.1f}%, "
+          f"com deflate {(total['msgpack_deflate_bytes'] / total['json_deflate_bytes'] - 1) * 100:+.1f}%, "
+          f"CPU de codificação {(total['msgpack_encode_s'] / total['json_encode_s'] - 1) * 100:+.1f}%")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Compara JSON e MessagePack nos pacotes reais do app.')
+    parser.add_argument('--rooms', type=int, default=30, help='Salas simuladas (2 jogadores cada).')
+    parser.add_argument('--repeat', type=int, default=20, help='Codificações de cada pacote na medição de CPU.')
+    parser.add_argument('--context-takeover', action='store_true',
+                        help='Mantém o dicionário do deflate entre as mensagens.')
+    parser.add_argument('--output', help='Grava o resultado em JSON neste arquivo.')
+    args = parser.parse_args(argv)
+    # Parâmetros do cenário do load_test.
+    args.mode, args.game, args.seed, args.timeout = 'inprocess', 'all', 1, 5.0
+    args.games_per_room, args.rps_rounds, args.chat_messages = 3, 10, 4
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if importlib.util.find_spec('msgpack') is None:
+        sys.exit('Este benchmark requer: pip install msgpack')
+    summary = summarize(args, measure(capture_emits(args), args.repeat, args.context_takeover))
+    print_report(summary)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(summary, output_file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import random
+from collections import Counter
+
+from games import TIC_TAC_TOE_FULL_BOARD, check_tic_tac_toe_winner, letter_bit
+
+
+# --- Oponentes Automáticos (Bots) ---
+# Jogo da Velha: todas as posições alcançáveis (poucos milhares) são resolvidas
+# por minimax uma única vez, ao carregar o módulo; a jogada do bot é uma busca
+# num dicionário indexado pelos dois bitboards.
+# Forca: a lista de palavras é indexada por (tamanho, letra, posições da letra),
+# então cada chute reduz os candidatos com uma interseção de conjuntos; o
+# próximo chute é a letra presente no maior número de candidatos.
+
+# Ordem de preferência entre jogadas de mesmo valor: centro, cantos, bordas.
+TIC_TAC_TOE_PREFERENCE = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+
+class TicTacToeBook:
+    def __init__(self):
+        # (x_bits | o_bits << 9) -> melhor célula para quem joga (o X sempre começa)
+        self.moves = {}
+        self._scores = {}
+        self._solve(0, 0)
+        self._scores = None
+
+    def _solve(self, x_bits, o_bits):
+        """Valor da posição para quem joga: >0 vence, <0 perde, 0 empata (vitórias mais rápidas valem mais)."""
+        key = x_bits | o_bits << 9
+        score = self._scores.get(key)
+        if score is not None:
+            return score
+        x_to_move = x_bits.bit_count() == o_bits.bit_count()
+        occupied = x_bits | o_bits
+        best_score, best_cell = None, None
+        for cell in TIC_TAC_TOE_PREFERENCE:
+            bit = 1 << cell
+            if occupied & bit:
+                continue
+            if x_to_move:
+                mine, theirs = x_bits | bit, o_bits
+            else:
+                mine, theirs = o_bits | bit, x_bits
+            if check_tic_tac_toe_winner(mine):
+                score = 10 - occupied.bit_count()
+            elif occupied | bit == TIC_TAC_TOE_FULL_BOARD:
+                score = 0
+            else:
+                score = -self._solve(*((mine, theirs) if x_to_move else (theirs, mine)))
+            if best_score is None or score > best_score:
+                best_score, best_cell = score, cell
+        self._scores[key] = best_score
+        self.moves[key] = best_cell
+        return best_score
+
+    def best_move(self, x_bits, o_bits):
+        return self.moves.get(x_bits | o_bits << 9)
+
+    def __len__(self):
+        return len(self.moves)
+
+
+class HangmanWordIndex:
+    def __init__(self, words):
+        self.words = sorted({word.strip().upper() for word in words if len(word.strip()) >= 3 and all(letter_bit(char) for char in word.strip().upper())})
+        # Máscara das letras de cada palavra, para contar frequências rapidamente.
+        self.letter_masks = [sum(set(map(letter_bit, word))) for word in self.words]
+        # (tamanho, letra, máscara das posições) -> ids das palavras; máscara 0 = não contém a letra.
+        self.index = {}
+        self.by_length = {}
+        for word_id, word in enumerate(self.words):
+            self.by_length.setdefault(len(word), set()).add(word_id)
+            for letter in map(chr, range(65, 91)):
+                mask = sum(1 << position for position, char in enumerate(word) if char == letter)
+                self.index.setdefault((len(word), letter, mask), set()).add(word_id)
+        # Frequência geral das letras: usada quando nenhuma palavra conhecida se encaixa.
+        counts = Counter(letter for word in self.words for letter in set(word))
+        self.fallback_order = [letter for letter, _ in counts.most_common()] + \
+            [letter for letter in map(chr, range(65, 91)) if letter not in counts]
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as wordlist:
+            return cls(line for line in wordlist if line.strip() and not line.startswith('#'))
+
+    def random_word(self, rng=random):
+        return rng.choice(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+
+def segment_shape(pattern):
+    """[(início, tamanho)] de cada palavra do padrão da Forca."""
+    shape, start = [], 0
+    for word in pattern.split(' '):
+        if word:
+            shape.append((start, len(word)))
+        start += len(word) + 1
+    return shape
+
+
+class HangmanGuesser:
+    """Candidatos de cada palavra do padrão, reduzidos a cada letra já chutada."""
+
+    def __init__(self, index, pattern):
+        self.index = index
+        self.shape = segment_shape(pattern)
+        # [(início no padrão, tamanho, ids candidatos)]
+        self.segments = [(start, length, set(index.by_length.get(length, ()))) for start, length in self.shape]
+        self.applied = set()
+
+    def matches(self, pattern, guessed_letters):
+        """False se a palavra mudou (nova rodada) desde que este adivinhador foi criado."""
+        return self.applied.issubset(guessed_letters) and self.shape == segment_shape(pattern)
+
+    def sync(self, pattern, guessed_letters):
+        """Aplica os chutes ainda não vistos (a ordem não importa: é só interseção)."""
+        for letter in guessed_letters:
+            if letter in self.applied:
+                continue
+            self.applied.add(letter)
+            for start, length, candidates in self.segments:
+                mask = sum(1 << offset for offset in range(length) if pattern[start + offset] == letter)
+                candidates &= self.index.index.get((length, letter, mask), set())
+
+    def next_guess(self, guessed_mask):
+        scores = Counter()
+        for _, _, candidates in self.segments:
+            if not candidates:
+                continue
+            weight = 1 / len(candidates)
+            for word_id in candidates:
+                letters = self.index.letter_masks[word_id] & ~guessed_mask
+                while letters:
+                    low = letters & -letters
+                    scores[low.bit_length() - 1] += weight
+                    letters ^= low
+        if scores:
+            return chr(65 + max(scores, key=lambda position: (scores[position], -position)))
+        for letter in self.index.fallback_order:
+            if not guessed_mask & letter_bit(letter):
+                return letter
+        return None
+
+
+# --- Políticas dos Bots ---
+# Cada política devolve a jogada como um cliente a enviaria, (evento, dados);
+# o app.py a valida e aplica pelo mesmo motor que trata as jogadas humanas.
+
+class TicTacToeBot:
+    def __init__(self, book):
+        self.book = book
+
+    def next_move(self, room_id, state):
+        return 'tic_tac_toe_move', {'cell_index': self.book.best_move(state.x_bits, state.o_bits)}
+
+    def forget(self, room_id):
+        pass
+
+
+class HangmanBot:
+    def __init__(self, index):
+        self.index = index
+        # Adivinhador de cada sala: os candidatos são reduzidos a cada chute.
+        self.guessers = {}
+
+    def next_move(self, room_id, state):
+        if not state.secret_word:
+            return 'hangman_set_word', {'word': self.index.random_word()}
+        guesser = self.guessers.get(room_id)
+        if guesser is None or not guesser.matches(state.word_pattern, state.guessed_letters):
+            guesser = self.guessers[room_id] = HangmanGuesser(self.index, state.word_pattern)
+        guesser.sync(state.word_pattern, state.guessed_letters)
+        return 'hangman_guess_udp', {'letter': guesser.next_guess(state.guessed_mask)}
+
+    def forget(self, room_id):
+        self.guessers.pop(room_id, None)
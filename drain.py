@@ -0,0 +1,40 @@
+import signal
+import time
+
+
+# --- Drenagem para Deploys ---
+# Ao receber SIGTERM o worker para de aceitar partidas novas, deixa as que
+# estão em andamento terminarem (até `timeout` segundos) e então sai. Um
+# segundo sinal durante a drenagem encerra na hora.
+
+class DrainController:
+    def __init__(self, timeout=300, clock=time.monotonic):
+        self.timeout = timeout
+        self.clock = clock
+        self.started_at = None
+
+    @property
+    def draining(self):
+        return self.started_at is not None
+
+    def begin(self):
+        """Inicia a drenagem; retorna False se ela já estava em andamento."""
+        if self.draining:
+            return False
+        self.started_at = self.clock()
+        return True
+
+    def elapsed(self):
+        return self.clock() - self.started_at if self.draining else 0.0
+
+    def should_exit(self, active_rooms):
+        return self.draining and (active_rooms == 0 or self.elapsed() >= self.timeout)
+
+    def install_signal_handlers(self, on_drain, on_force, signals=(signal.SIGTERM,)):
+        def handle(signum, frame):
+            if self.draining:
+                on_force()
+            else:
+                on_drain()
+        for signum in signals:
+            signal.signal(signum, handle)
@@ -0,0 +1,463 @@
+from games import HANGMAN_MAX_PHRASE_LENGTH, RPS_CHOICES, HangmanState, RPSState, TicTacToeState, choice_name, letter_bit
+
+
+# --- Registro de Motores de Jogo ---
+# Cada jogo registra um motor com o que o app.py precisa saber dele sem
+# comparar o game_id em cada ponto: página e tipo de conexão, quantos
+# jogadores a sala aceita, como o estado nasce e é reiniciado, como os papéis
+# se reorganizam quando alguém sai, o que cada participante pode ver do estado
+# e as jogadas: quais eventos do cliente são jogadas, como validá-las e como
+# aplicá-las. O app.py registra os handlers a partir daqui e cuida, igual para
+# todos os jogos, do lock, do seq, da gravação, do broadcast e do histórico.
+
+class InvalidMove(ValueError):
+    """Jogada recusada; a mensagem vai para o jogador no game_error."""
+
+
+class MoveResult:
+    """O que uma jogada aplicada produziu, para o app.py anunciar à sala.
+
+    `update` vai no evento `event` (o app acrescenta o seq) junto com `delta`
+    ou `full`, conforme o modo de atualizações; sem `event` nada é enviado.
+    `winner` (sid ou 'draw') encerra a partida e vai ao histórico com `details`.
+    """
+
+    def __init__(self, event=None, update=None, delta=None, full=None, messages=(), winner=None, details=None,
+                 log=None, opens_round=False, round_over=False):
+        self.event = event
+        self.update = update or {}
+        self.delta = delta or {}
+        self.full = full or {}
+        self.messages = messages # game_info_message para a sala, depois da atualização
+        self.winner = winner
+        self.details = details
+        self.log = log # (evento, campos) para o log estruturado
+        # Jogos de escolhas simultâneas: a jogada abriu a rodada / a rodada terminou.
+        self.opens_round = opens_round
+        self.round_over = round_over
+
+
+class GameEngine:
+    game_id = None
+    template = None
+    connection_type = None
+    state_class = None
+    min_players = 2
+    max_players = 2
+    # Eventos do cliente que são jogadas; o pedido de reinício e o aviso de reinício à sala.
+    move_events = ()
+    reset_event = None
+    reset_broadcast = None
+    # Com prazo, as escolhas são simultâneas: o app anuncia a rodada no tick
+    # seguinte (reveal_round) e, vencido o prazo, chama expire_round.
+    round_timeout = None
+
+    def __init__(self, max_players=None):
+        if max_players is not None:
+            self.max_players = max(self.min_players, max_players)
+
+    def init(self, players):
+        """Estado inicial com os papéis distribuídos entre `players` (ordem de entrada)."""
+        raise NotImplementedError
+
+    def reset(self, players, old_state):
+        """Estado de uma nova partida na mesma sala."""
+        return self.init(players)
+
+    def reset_fields(self, state):
+        """Campos extras do aviso de reinício (e do log)."""
+        return {}
+
+    def player_joined(self, state, players, joined_sid):
+        """Encaixa `joined_sid` numa partida já começada (salas com mais de dois lugares)."""
+        return state
+
+    def player_left(self, state, players, left_sid):
+        """Reorganiza os papéis quando a sala continua sem `left_sid`; retorna o estado a usar."""
+        return state
+
+    def serialize(self, state, viewer_sid=None):
+        """Estado completo como visto por `viewer_sid` (None = espectador)."""
+        return state.to_dict()
+
+    def in_progress(self, state):
+        """Há uma partida começada e ainda não terminada? (a drenagem espera por ela)"""
+        return state is not None and not state.is_over()
+
+    def turn_of(self, state):
+        """Sid de quem precisa agir agora, ou None se não há uma vez (escolhas simultâneas)."""
+        return None
+
+    def validate_move(self, state, sid, event, data):
+        """Confere a jogada recebida em `event` e retorna-a normalizada; levanta InvalidMove."""
+        raise NotImplementedError
+
+    def apply_move(self, state, sid, event, move, players):
+        """Aplica a jogada já validada ao estado e retorna o MoveResult a anunciar."""
+        raise NotImplementedError
+
+    def reveal_round(self, state):
+        """MoveResult da rodada com escolhas ainda não anunciadas, ou None."""
+        return None
+
+    def expire_round(self, state):
+        """MoveResult da rodada cujo prazo venceu, ou None se ela já terminou."""
+        return None
+
+    def series_result(self, state):
+        """(vencedor, detalhes) de uma série sem fim de partida, quando ela acaba; senão None."""
+        return None
+
+
+class TicTacToeEngine(GameEngine):
+    game_id = 'tic-tac-toe'
+    template = 'game1.html'
+    connection_type = 'TCP'
+    state_class = TicTacToeState
+    move_events = ('tic_tac_toe_move',)
+    reset_event = 'reset_tic_tac_toe'
+    reset_broadcast = 'tic_tac_toe_reset'
+
+    def init(self, players, first_sid=None):
+        first_sid = first_sid or players[0]
+        state = self.state_class()
+        state.current_turn = first_sid
+        state.assign_players(first_sid, players[1] if players[0] == first_sid else players[0])
+        return state
+
+    def reset(self, players, old_state):
+        # Quem começa alterna a cada partida.
+        current_first = old_state.current_turn if old_state and old_state.current_turn else players[0]
+        return self.init(players, players[1] if current_first == players[0] else players[0])
+
+    def turn_of(self, state):
+        return state.current_turn
+
+    def validate_move(self, state, sid, event, data):
+        cell_index = data.get('cell_index')
+        if state.winner or state.is_full():
+            raise InvalidMove('O jogo já acabou!')
+        if sid != state.current_turn:
+            raise InvalidMove('Não é a sua vez de jogar!')
+        # bool é subclasse de int: True/False não podem virar as células 1 e 0.
+        if type(cell_index) is not int or not 0 <= cell_index < 9:
+            raise InvalidMove('Célula inválida!')
+        if state.is_occupied(cell_index):
+            raise InvalidMove('Essa célula já está ocupada!')
+        return cell_index
+
+    def apply_move(self, state, sid, event, cell_index, players):
+        player_mark = state.mark_of(sid)
+        if state.place(cell_index, player_mark):
+            state.winner = sid
+        elif state.is_full():
+            state.winner = 'draw'
+        else:
+            state.current_turn = next(player for player in players if player != sid)
+        over = state.winner is not None
+        return MoveResult('tic_tac_toe_update', {
+            'current_turn': None if over else state.current_turn,
+            'player_mark': player_mark,
+            'cell_index': cell_index,
+            'winner': state.winner
+        }, full={'board': state.board}, winner=state.winner, details={'moves': state.moves_count} if over else None)
+
+
+class RPSEngine(GameEngine):
+    """Série de rodadas entre dois jogadores; com mais lugares, um torneio todos contra todos.
+
+    No torneio cada duelo é decidido na primeira rodada sem empate (o prazo
+    vencido também decide), vale um ponto e dá lugar ao próximo da tabela;
+    quem entra com o torneio em andamento ganha duelos contra todos no fim
+    da tabela. Acabada a tabela, quem fez mais pontos vence a partida.
+    """
+
+    game_id = 'rock-paper-scissors'
+    template = 'game2.html'
+    connection_type = 'UDP'
+    state_class = RPSState
+    move_events = ('rps_choice',)
+    reset_event = 'reset_rps'
+    reset_broadcast = 'rps_reset'
+    round_timeout = 15.0
+
+    def __init__(self, max_players=None, round_timeout=None):
+        super().__init__(max_players)
+        if round_timeout is not None:
+            self.round_timeout = round_timeout
+
+    def init(self, players):
+        state = self.state_class()
+        if self.max_players > 2:
+            state.start_tournament(players)
+        else:
+            state.assign_players(players[0], players[1])
+        return state
+
+    def player_joined(self, state, players, joined_sid):
+        if state.tournament and not state.is_over():
+            state.add_player(joined_sid)
+        return state
+
+    def player_left(self, state, players, left_sid):
+        # Sai da tabela; se estava no duelo atual, começa o próximo. Um torneio
+        # que acaba assim não tem campeão anunciado nem vai ao histórico.
+        if state.tournament:
+            state.remove_player(left_sid)
+        return state
+
+    def serialize(self, state, viewer_sid=None):
+        game_state = state.to_dict()
+        # A escolha do oponente só é revelada no resultado da rodada.
+        for slot in ('player1', 'player2'):
+            if game_state.get(f'{slot}_choice') and game_state.get(f'{slot}_sid') != viewer_sid:
+                game_state[f'{slot}_choice'] = 'oculta'
+        return game_state
+
+    def in_progress(self, state):
+        if state is None or state.is_over():
+            return False
+        # A série não tem fim: só a rodada com alguma escolha feita está em
+        # andamento. O torneio está desde o primeiro ponto.
+        return state.round_ready > 0 or (state.tournament and any(state.standings.values()))
+
+    def validate_move(self, state, sid, event, data):
+        choice = data.get('choice')
+        slot = state.slot_of(sid)
+        if slot is None:
+            if state.is_over():
+                raise InvalidMove('O torneio acabou! Reinicie para jogar de novo.')
+            if state.tournament and sid in state.standings:
+                raise InvalidMove('Aguarde o seu duelo no torneio.')
+            raise InvalidMove('Você não é um jogador válido nesta sala.')
+        choice_code = RPS_CHOICES.get(choice) if isinstance(choice, str) else None
+        if choice_code is None:
+            raise InvalidMove('Escolha inválida!')
+        if state.choice_of(slot) is not None:
+            raise InvalidMove('Você já fez sua escolha para esta rodada!')
+        return slot, choice_code
+
+    def apply_move(self, state, sid, event, move, players):
+        slot, choice_code = move
+        state.set_choice(slot, choice_code)
+        # Nada é anunciado agora: o aviso de pronto ou o resultado sai em reveal_round.
+        return MoveResult(log=('rps_choice', {'sid': sid, 'slot': slot}), opens_round=state.round_ready == 1)
+
+    def reveal_round(self, state):
+        if state.round_ready == 2:
+            outcome = state.resolve_round()
+            return self.round_result(state, 'draw' if outcome == 0 else state.sid_of(outcome))
+        if state.round_ready == 1:
+            ready_slot = 1 if state.player1_choice is not None else 2
+            return MoveResult('rps_player_ready', {'player_sid': state.sid_of(ready_slot), 'choice_made': True})
+        return None
+
+    def expire_round(self, state):
+        if state.round_ready != 1:
+            return None
+        # Quem não escolheu a tempo perde a rodada.
+        missing_slot = 1 if state.player1_choice is None else 2
+        winner_sid = state.sid_of(state.forfeit(missing_slot))
+        return self.round_result(state, winner_sid, forfeit_sid=state.sid_of(missing_slot))
+
+    def round_result(self, state, winner_sid, forfeit_sid=None):
+        update = {
+            'player1_choice': choice_name(state.player1_choice),
+            'player2_choice': choice_name(state.player2_choice),
+            'winner_sid': winner_sid
+        }
+        if forfeit_sid:
+            update['forfeit_sid'] = forfeit_sid
+        round_sids = {'player1_sid': state.player1_sid, 'player2_sid': state.player2_sid}
+        log_fields = {'winner': winner_sid, 'forfeit': forfeit_sid, 'scores': [state.player1_score, state.player2_score]}
+        state.clear_round()
+        champion = details = None
+        if state.tournament:
+            if winner_sid != 'draw':
+                state.standings[winner_sid] += 1
+                state.next_duel()
+            # O duelo seguinte (o mesmo, depois de um empate) ou None no fim do torneio.
+            update['next_duel'] = None if state.is_over() else [state.player1_sid, state.player2_sid]
+            if state.is_over():
+                champion = update['champion'] = state.champion()
+                details = {'standings': state.scores}
+        return MoveResult(
+            'rps_round_result', update,
+            # Só o placar de quem venceu a rodada mudou (+1); nomes e SIDs o cliente já tem.
+            delta={'score_delta': {} if winner_sid == 'draw' else {winner_sid: 1}},
+            full={'scores': state.scores, **round_sids},
+            winner=champion, details=details,
+            log=('rps_round_finished', log_fields),
+            round_over=True
+        )
+
+    def series_result(self, state):
+        # No PPT as rodadas seguem sem fim: a série conta como partida quando é
+        # reiniciada ou quando a sala acaba. O torneio vai ao histórico ao
+        # terminar a tabela (o round_result traz o campeão).
+        if state.tournament:
+            return None
+        score1, score2 = state.player1_score, state.player2_score
+        if score1 + score2 == 0:
+            return None
+        winner_sid = 'draw' if score1 == score2 else state.sid_of(1 if score1 > score2 else 2)
+        return winner_sid, {'scores': [score1, score2]}
+
+
+class HangmanEngine(GameEngine):
+    """Um definidor e um ou mais adivinhadores, que chutam em turnos."""
+
+    game_id = 'hangman'
+    template = 'game3.html'
+    connection_type = 'Híbrido'
+    state_class = HangmanState
+    move_events = ('hangman_set_word', 'hangman_guess_udp')
+    reset_event = 'reset_hangman'
+    reset_broadcast = 'hangman_reset'
+
+    def init(self, players, setter_index=0):
+        state = self.state_class()
+        state.setter_sid = players[setter_index % len(players)]
+        state.guesser_sid = players[(setter_index + 1) % len(players)]
+        return state
+
+    def reset(self, players, old_state):
+        # O papel de definidor passa para o próximo jogador da sala.
+        setter = old_state.setter_sid if old_state else None
+        next_index = players.index(setter) + 1 if setter in players else 0
+        return self.init(players, next_index)
+
+    def reset_fields(self, state):
+        return {'setter_sid': state.setter_sid, 'guesser_sid': state.guesser_sid}
+
+    def next_guesser(self, state, players):
+        """Passa a vez para o próximo adivinhador (só muda algo com 3+ jogadores)."""
+        guessers = [sid for sid in players if sid != state.setter_sid]
+        if len(guessers) > 1 and state.guesser_sid in guessers:
+            state.guesser_sid = guessers[(guessers.index(state.guesser_sid) + 1) % len(guessers)]
+        return state.guesser_sid
+
+    def player_left(self, state, players, left_sid):
+        if left_sid == state.setter_sid:
+            # Sem o definidor a rodada não continua: o próximo jogador define uma palavra nova.
+            return self.init(players)
+        if left_sid == state.guesser_sid:
+            state.guesser_sid = next(sid for sid in players if sid != state.setter_sid)
+        return state
+
+    def in_progress(self, state):
+        # Antes da palavra definida a rodada ainda não começou.
+        return state is not None and bool(state.secret_word) and not state.game_over
+
+    def serialize(self, state, viewer_sid=None):
+        game_state = state.to_dict()
+        # O adivinhador não pode receber a palavra secreta antes do fim do jogo.
+        if game_state['secret_word'] and not game_state['game_over'] and viewer_sid != game_state['setter_sid']:
+            game_state['secret_word'] = ''
+        return game_state
+
+    def turn_of(self, state):
+        return state.guesser_sid if state.secret_word else state.setter_sid
+
+    def validate_move(self, state, sid, event, data):
+        if event == 'hangman_set_word':
+            return self.validate_word(state, sid, data.get('word'), bool(data.get('phrase')))
+        return self.validate_guess(state, sid, data.get('letter'))
+
+    def validate_word(self, state, sid, secret_word, allow_phrase):
+        if sid != state.setter_sid:
+            raise InvalidMove('Apenas o definidor da palavra pode fazer isso!')
+        if state.secret_word:
+            raise InvalidMove('A palavra secreta já foi definida.')
+        if not isinstance(secret_word, str):
+            raise InvalidMove('Envie a palavra secreta como texto.')
+        secret_word = secret_word.strip().upper()
+        if allow_phrase:
+            # Frases: várias palavras separadas por um único espaço.
+            secret_word = ' '.join(secret_word.split())
+            letters = secret_word.replace(' ', '')
+            if len(letters) < 3 or len(secret_word) > HANGMAN_MAX_PHRASE_LENGTH or not all(letter_bit(char) for char in letters):
+                raise InvalidMove(f'A frase deve conter apenas letras (A-Z) e espaços, com no mínimo 3 letras e no máximo {HANGMAN_MAX_PHRASE_LENGTH} caracteres.')
+        elif len(secret_word) < 3 or not all(letter_bit(char) for char in secret_word):
+            raise InvalidMove('A palavra deve conter apenas letras (A-Z) e ter no mínimo 3 caracteres.')
+        return secret_word, allow_phrase
+
+    def validate_guess(self, state, sid, guess):
+        if sid != state.guesser_sid:
+            raise InvalidMove('Apenas o adivinhador pode chutar letras!')
+        if not state.secret_word:
+            raise InvalidMove('Aguardando a palavra secreta ser definida!')
+        if state.game_over:
+            raise InvalidMove('O jogo já acabou!')
+        guess = guess.strip().upper() if isinstance(guess, str) else ''
+        if not letter_bit(guess):
+            raise InvalidMove('Por favor, chute apenas uma letra!')
+        if state.is_guessed(guess):
+            raise InvalidMove(f'Você já tentou a letra {guess}!')
+        return guess
+
+    def apply_move(self, state, sid, event, move, players):
+        if event == 'hangman_set_word':
+            return self.apply_word(state, *move)
+        return self.apply_guess(state, move, players)
+
+    def apply_word(self, state, secret_word, allow_phrase):
+        state.set_word(secret_word)
+        return MoveResult('hangman_update_tcp', {
+            'word_pattern': state.word_pattern,
+            'word_display': state.word_display,
+            'guessed_letters': state.guessed_letters,
+            'wrong_guesses': state.wrong_guesses,
+            'game_over': state.game_over,
+            'game_winner': state.game_winner,
+            'setter_sid': state.setter_sid,
+            'guesser_sid': state.guesser_sid
+        }, messages=['A palavra secreta foi definida! Agora é a vez do adivinhador.'],
+            log=('hangman_word_set', {'length': len(secret_word), 'phrase': allow_phrase}))
+
+    def apply_guess(self, state, guess, players):
+        revealed_positions = state.guess(guess)
+        found_letter = bool(revealed_positions)
+        messages = []
+        if state.is_solved():
+            state.game_over = True
+            state.game_winner = state.guesser_sid
+            messages.append(f'Parabéns! O adivinhador venceu! A palavra era "{state.secret_word}"')
+        elif state.wrong_guesses >= state.max_wrong_guesses:
+            state.game_over = True
+            state.game_winner = state.setter_sid
+            messages.append(f'Fim de jogo! A forca foi completa. A palavra era "{state.secret_word}"')
+
+        update = {
+            'wrong_guesses': state.wrong_guesses,
+            'game_over': state.game_over,
+            'game_winner': state.game_winner,
+            'last_guess_letter': guess,
+            'last_guess_correct': found_letter
+        }
+        # Com vários adivinhadores a vez passa adiante; só então o campo vai no update.
+        if not state.game_over and len(players) > 2:
+            update['guesser_sid'] = self.next_guesser(state, players)
+        # O cliente aplica a letra nas posições reveladas; a palavra só vai no fim.
+        delta = {'positions': revealed_positions}
+        if state.game_over:
+            delta['secret_word'] = state.secret_word
+        full = {
+            'word_display': state.word_display,
+            'guessed_letters': state.guessed_letters,
+            # A palavra não pode chegar ao adivinhador (nem aos espectadores) antes do fim.
+            'secret_word': state.secret_word if state.game_over else ''
+        }
+        details = {'word_length': len(state.secret_word), 'wrong_guesses': state.wrong_guesses} if state.game_over else None
+        return MoveResult('hangman_update_udp', update, delta=delta, full=full, messages=messages,
+                          winner=state.game_winner if state.game_over else None, details=details,
+                          log=('hangman_guess', {'letter': guess, 'correct': found_letter, 'game_over': state.game_over}))
+
+
+def create_engines(options=None):
+    """Motores registrados por game_id; `options` ajusta cada jogo (ex.: max_players, round_timeout)."""
+    options = options or {}
+    return {
+        engine_class.game_id: engine_class(**options.get(engine_class.game_id, {}))
+        for engine_class in (TicTacToeEngine, RPSEngine, HangmanEngine)
+    }
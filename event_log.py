@@ -0,0 +1,97 @@
+import atexit
+import json
+import random
+import sys
+import time
+from collections import deque
+
+from async_mode import start_daemon_task
+
+
+# --- Log Estruturado Assíncrono ---
+# Os handlers só enfileiram o evento (sem formatar nem escrever nada); uma
+# green thread em segundo plano serializa os eventos em JSON lines e escreve
+# em lotes. Com a fila cheia o evento é descartado e contado, para que o log
+# nunca segure o hub do eventlet.
+
+LOG_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+
+class EventLog:
+    def __init__(self, stream=None, level='info', max_queue=10000, batch_size=500,
+                 flush_interval=0.5, sample_rates=None):
+        self.stream = stream or sys.stdout
+        self.level = LOG_LEVELS[level]
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Evento -> fração registrada (ex.: {'chat_message': 0.1} guarda 10%).
+        self.sample_rates = sample_rates or {}
+        self.queue = deque()
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._started = False
+        self._stopped = False
+        atexit.register(self.flush_all)
+
+    def log(self, level, event, **fields):
+        if LOG_LEVELS[level] < self.level:
+            return
+        rate = self.sample_rates.get(event)
+        if rate is not None and rate < 1 and random.random() >= rate:
+            return
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self.queue.append((time.time(), level, event, fields))
+
+    def debug(self, event, **fields):
+        self.log('debug', event, **fields)
+
+    def info(self, event, **fields):
+        self.log('info', event, **fields)
+
+    def warning(self, event, **fields):
+        self.log('warning', event, **fields)
+
+    def error(self, event, **fields):
+        self.log('error', event, **fields)
+
+    def flush(self):
+        """Escreve até `batch_size` eventos da fila; retorna quantos saíram."""
+        lines = []
+        while self.queue and len(lines) < self.batch_size:
+            timestamp, level, event, fields = self.queue.popleft()
+            record = {'ts': round(timestamp, 3), 'level': level, 'event': event}
+            record.update(fields)
+            lines.append(json.dumps(record, ensure_ascii=False, default=str))
+        if self.dropped != self._reported_dropped:
+            lines.append(json.dumps({'ts': round(time.time(), 3), 'level': 'warning', 'event': 'log_dropped',
+                                     'dropped_total': self.dropped}))
+            self._reported_dropped = self.dropped
+        if lines:
+            self.stream.write('\n'.join(lines) + '\n')
+            self.stream.flush()
+        return len(lines)
+
+    def flush_all(self):
+        while self.flush():
+            pass
+
+    def start(self, socketio):
+        """Inicia a green thread que esvazia a fila periodicamente."""
+        if self._started:
+            return
+        self._started = True
+
+        def run():
+            while not self._stopped:
+                socketio.sleep(self.flush_interval)
+                while self.flush() == self.batch_size:
+                    socketio.sleep(0) # Fila longa: cede o hub entre os lotes
+        start_daemon_task(socketio, run)
+
+    def stop(self):
+        """Encerra a green thread e escreve o que ainda está na fila."""
+        self._stopped = True
+        self.flush_all()
@@ -0,0 +1,125 @@
+import atexit
+import gzip
+import json
+import time
+from collections import deque
+from functools import wraps
+
+from async_mode import start_daemon_task
+
+
+# --- Gravação de Eventos para Replay ---
+# Opcional (EVENT_RECORD_PATH): cada evento Socket.IO recebido é anexado a um
+# log para ser reproduzido depois pelo benchmarks/replay.py. Como no EventLog,
+# o handler só enfileira a tupla; uma green thread serializa e escreve em
+# lotes. Formato (JSON lines, .gz comprime): uma linha de cabeçalho e depois
+# uma linha por evento, [ms desde o início, nº da conexão, evento, argumentos].
+# Os sids viram números pequenos na ordem em que aparecem no arquivo.
+# O log contém os payloads como chegaram (chat e palavras da Forca incluídos).
+
+RECORDING_FORMAT = 'socketio-events'
+RECORDING_VERSION = 1
+
+
+class EventRecorder:
+    def __init__(self, path, max_queue=100000, batch_size=1000, flush_interval=0.5, clock=time.time):
+        self.path = path
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.started_at = clock()
+        self.queue = deque()
+        self.dropped = 0
+        self.recorded = 0
+        self._sid_numbers = {}
+        self._next_number = 0
+        self._header_written = False
+        self._started = False
+        atexit.register(self.flush_all)
+
+    def record(self, sid, event, args):
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self.queue.append((self.clock(), sid, event, args))
+
+    def wrap(self, event, handler, sid_getter):
+        """Decora um handler para gravar cada chamada antes de executá-la."""
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            self.record(sid_getter(), event, args)
+            return handler(*args, **kwargs)
+        return wrapper
+
+    def _sid_number(self, sid, forget=False):
+        number = self._sid_numbers.pop(sid, None) if forget else self._sid_numbers.get(sid)
+        if number is None:
+            number = self._next_number
+            self._next_number += 1
+            if not forget:
+                self._sid_numbers[sid] = number
+        return number
+
+    def flush(self):
+        """Escreve até `batch_size` eventos da fila; retorna quantos saíram."""
+        lines = []
+        while self.queue and len(lines) < self.batch_size:
+            timestamp, sid, event, args = self.queue.popleft()
+            # Depois do disconnect o número do sid não é mais necessário.
+            number = self._sid_number(sid, forget=event == 'disconnect')
+            lines.append(json.dumps([round((timestamp - self.started_at) * 1000), number, event, list(args)],
+                                    ensure_ascii=False, separators=(',', ':'), default=str))
+        if not lines:
+            return 0
+        header = [] if self._header_written else [json.dumps(
+            {'format': RECORDING_FORMAT, 'version': RECORDING_VERSION, 'started_at': round(self.started_at, 3)})]
+        opener = gzip.open if self.path.endswith('.gz') else open
+        with opener(self.path, 'at', encoding='utf-8') as recording:
+            recording.write('\n'.join(header + lines) + '\n')
+        self._header_written = True
+        self.recorded += len(lines)
+        return len(lines)
+
+    def flush_all(self):
+        while self.flush():
+            pass
+
+    def start(self, socketio):
+        """Inicia a green thread que esvazia a fila periodicamente."""
+        if self._started:
+            return
+        self._started = True
+
+        def run():
+            while True:
+                socketio.sleep(self.flush_interval)
+                while self.flush() == self.batch_size:
+                    socketio.sleep(0)
+        start_daemon_task(socketio, run)
+
+
+def read_recording(path):
+    """Gera (ms desde o início, nº da conexão, evento, argumentos) de um log gravado.
+
+    Um arquivo pode ter vários cabeçalhos (o processo foi reiniciado e voltou a
+    anexar); cada trecho tem os próprios números de conexão, então os números
+    são deslocados para não colidirem e o tempo continua do trecho anterior.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    number_offset, time_offset, next_number, last_ms = 0, 0, 0, 0
+    with opener(path, 'rt', encoding='utf-8') as recording:
+        for line in recording:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict):
+                if record.get('format') != RECORDING_FORMAT:
+                    raise ValueError(f'{path} não é uma gravação de eventos.')
+                number_offset, time_offset = next_number, last_ms
+                continue
+            elapsed_ms, number, event, args = record
+            last_ms = time_offset + elapsed_ms
+            next_number = max(next_number, number_offset + number + 1)
+            yield last_ms, number_offset + number, event, args
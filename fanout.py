@@ -0,0 +1,56 @@
+from socketio import packet
+from socketio.pubsub_manager import PubSubManager
+
+
+# --- Fan-out para Muitos Destinatários ---
+# O emit padrão do python-socketio codifica o pacote de novo para cada sid da
+# sala. Para canais grandes (espectadores) o pacote é codificado uma vez e a
+# mesma string é entregue a todas as conexões deste worker. Isso usa o
+# Server._send_packet e a classe de pacote do python-socketio, que não são API
+# pública: as versões estão fixadas no requirements.txt e, se o gancho sumir,
+# fanout_emit volta ao emit normal.
+
+class PreEncodedPacket(packet.Packet):
+    """Pacote Socket.IO que guarda a codificação feita na primeira chamada."""
+
+    def encode(self):
+        encoded = getattr(self, '_encoded', None)
+        if encoded is None:
+            encoded = self._encoded = super().encode()
+        return encoded
+
+
+_pre_encoded_classes = {packet.Packet: PreEncodedPacket}
+
+def pre_encoded_class(packet_class):
+    # O servidor pode usar outra classe de pacote (outro serializador).
+    cls = _pre_encoded_classes.get(packet_class)
+    if cls is None:
+        cls = _pre_encoded_classes[packet_class] = type(
+            'PreEncoded' + packet_class.__name__, (PreEncodedPacket, packet_class), {})
+    return cls
+
+
+def fanout_emit(server, event, data, room, namespace='/'):
+    """Emite `data` para todos os sids de `room` codificando o pacote uma única vez.
+
+    Retorna quantas conexões receberam o pacote. Com fila de mensagens os
+    outros workers também precisam do evento, então o emit normal é usado.
+    """
+    if isinstance(server.manager, PubSubManager):
+        server.emit(event, data, to=room, namespace=namespace)
+        return None
+    recipients = list(server.manager.get_participants(namespace, room)) if namespace in server.manager.rooms else []
+    if not recipients:
+        return 0
+    send_packet = getattr(server, '_send_packet', None)
+    if send_packet is None:
+        # Sem o gancho interno (outra versão do python-socketio; veja o
+        # requirements.txt) o emit normal ainda entrega, um encode por sid.
+        server.emit(event, data, to=room, namespace=namespace)
+        return len(recipients)
+    pkt = pre_encoded_class(server.packet_class)(packet.EVENT, namespace=namespace, data=[event, data])
+    pkt.encode()
+    for _, eio_sid in recipients:
+        send_packet(eio_sid, pkt)
+    return len(recipients)
@@ -0,0 +1,395 @@
+from enum import IntEnum
+
+
+# --- Estado Compacto dos Jogos ---
+# Cada sala guarda um destes objetos em vez de um dicionário. Os campos usam
+# __slots__ e inteiros (bitboards/máscaras), o que reduz a memória por sala e
+# deixa a validação das jogadas em operações de bits O(1). `to_dict()` produz
+# o mesmo formato que os clientes já recebiam; `dump()`/`load()` produzem a
+# forma compacta usada pelo RoomStore em Redis.
+
+class CompactState:
+    __slots__ = ()
+    # Campos que guardam o sid de um jogador (reescritos quando ele reconecta).
+    SID_FIELDS = ()
+
+    def dump(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def load(cls, values):
+        state = cls()
+        for name, value in zip(cls.__slots__, values):
+            setattr(state, name, value)
+        return state
+
+    def is_over(self):
+        # Partida encerrada (a sala fica aguardando um reinício ou expira).
+        return False
+
+    def replace_sid(self, old_sid, new_sid):
+        for name in self.SID_FIELDS:
+            if getattr(self, name) == old_sid:
+                setattr(self, name, new_sid)
+
+
+# --- Jogo da Velha: bitboards de 9 bits (bit i = célula i) ---
+TIC_TAC_TOE_WIN_MASKS = tuple(
+    sum(1 << cell for cell in combo) for combo in (
+        (0, 1, 2), (3, 4, 5), (6, 7, 8), # Linhas
+        (0, 3, 6), (1, 4, 7), (2, 5, 8), # Colunas
+        (0, 4, 8), (2, 4, 6)             # Diagonais
+    )
+)
+TIC_TAC_TOE_FULL_BOARD = (1 << 9) - 1
+# Tabela com as 512 configurações possíveis de um jogador: 1 se contém uma linha vencedora.
+TIC_TAC_TOE_WINNING = bytes(
+    any(bits & mask == mask for mask in TIC_TAC_TOE_WIN_MASKS) for bits in range(1 << 9)
+)
+
+def check_tic_tac_toe_winner(bits):
+    return TIC_TAC_TOE_WINNING[bits] == 1
+
+
+class TicTacToeState(CompactState):
+    __slots__ = ('x_bits', 'o_bits', 'x_sid', 'o_sid', 'current_turn', 'winner')
+    SID_FIELDS = ('x_sid', 'o_sid', 'current_turn', 'winner')
+
+    def __init__(self):
+        self.x_bits = 0
+        self.o_bits = 0
+        self.x_sid = None
+        self.o_sid = None
+        self.current_turn = None
+        self.winner = None
+
+    def assign_players(self, x_sid, o_sid):
+        self.x_sid = x_sid
+        self.o_sid = o_sid
+
+    def mark_of(self, sid):
+        if sid == self.x_sid:
+            return 'X'
+        if sid == self.o_sid:
+            return 'O'
+        return None
+
+    def is_occupied(self, cell_index):
+        return (self.x_bits | self.o_bits) >> cell_index & 1 == 1
+
+    def place(self, cell_index, mark):
+        """Marca a célula e retorna True se a jogada venceu o jogo."""
+        if mark == 'X':
+            self.x_bits |= 1 << cell_index
+            return check_tic_tac_toe_winner(self.x_bits)
+        self.o_bits |= 1 << cell_index
+        return check_tic_tac_toe_winner(self.o_bits)
+
+    def is_full(self):
+        return self.x_bits | self.o_bits == TIC_TAC_TOE_FULL_BOARD
+
+    def is_over(self):
+        return self.winner is not None
+
+    @property
+    def moves_count(self):
+        return (self.x_bits | self.o_bits).bit_count()
+
+    @property
+    def board(self):
+        return ['X' if self.x_bits >> i & 1 else 'O' if self.o_bits >> i & 1 else '' for i in range(9)]
+
+    @property
+    def players_map(self):
+        return {sid: mark for sid, mark in ((self.x_sid, 'X'), (self.o_sid, 'O')) if sid is not None}
+
+    def to_dict(self):
+        return {
+            'board': self.board,
+            'current_turn': self.current_turn,
+            'players_map': self.players_map,
+            'winner': self.winner,
+            'moves_count': self.moves_count
+        }
+
+
+# --- Pedra, Papel e Tesoura: escolhas codificadas ---
+class RPSChoice(IntEnum):
+    PEDRA = 0
+    PAPEL = 1
+    TESOURA = 2
+
+RPS_CHOICES = {choice.name.lower(): choice for choice in RPSChoice}
+# RPS_OUTCOME[escolha do jogador 1][escolha do jogador 2]: 0 empate, 1 ou 2 vencedor.
+RPS_OUTCOME = (
+    (0, 2, 1), # pedra x pedra/papel/tesoura
+    (1, 0, 2), # papel
+    (2, 1, 0)  # tesoura
+)
+
+
+def round_robin_pairs(players):
+    """Todos os confrontos entre `players`, em rodadas pelo método do círculo (os duelos de cada um ficam espalhados)."""
+    players = list(players)
+    if len(players) % 2:
+        players.append(None) # Folga de quem enfrentaria o lugar vazio
+    pairs = []
+    for _ in range(len(players) - 1):
+        half = len(players) // 2
+        pairs.extend([a, b] for a, b in zip(players[:half], reversed(players[half:])) if a is not None and b is not None)
+        players = [players[0], players[-1]] + players[1:-1]
+    return pairs
+
+
+class RPSState(CompactState):
+    # Com torneio (salas com mais de dois lugares) player1/player2 são o duelo
+    # atual; `schedule` guarda os próximos duelos e `standings` os pontos de
+    # cada jogador. Sem torneio os dois ficam None.
+    __slots__ = ('player1_sid', 'player2_sid', 'player1_choice', 'player2_choice', 'player1_score', 'player2_score',
+                 'schedule', 'standings')
+    SID_FIELDS = ('player1_sid', 'player2_sid')
+
+    def __init__(self):
+        self.player1_sid = None
+        self.player2_sid = None
+        self.player1_choice = None
+        self.player2_choice = None
+        self.player1_score = 0
+        self.player2_score = 0
+        self.schedule = None
+        self.standings = None
+
+    @classmethod
+    def load(cls, values):
+        state = super().load(values)
+        # O JSON devolve as escolhas como inteiros simples.
+        if state.player1_choice is not None:
+            state.player1_choice = RPSChoice(state.player1_choice)
+        if state.player2_choice is not None:
+            state.player2_choice = RPSChoice(state.player2_choice)
+        return state
+
+    def assign_players(self, player1_sid, player2_sid):
+        self.player1_sid = player1_sid
+        self.player2_sid = player2_sid
+
+    def slot_of(self, sid):
+        if sid == self.player1_sid:
+            return 1
+        if sid == self.player2_sid:
+            return 2
+        return None
+
+    def sid_of(self, slot):
+        return self.player1_sid if slot == 1 else self.player2_sid
+
+    def choice_of(self, slot):
+        return self.player1_choice if slot == 1 else self.player2_choice
+
+    def set_choice(self, slot, choice):
+        if slot == 1:
+            self.player1_choice = choice
+        else:
+            self.player2_choice = choice
+
+    @property
+    def round_ready(self):
+        return (self.player1_choice is not None) + (self.player2_choice is not None)
+
+    def resolve_round(self):
+        """Aplica o resultado da rodada ao placar e retorna 0 (empate), 1 ou 2."""
+        outcome = RPS_OUTCOME[self.player1_choice][self.player2_choice]
+        if outcome == 1:
+            self.player1_score += 1
+        elif outcome == 2:
+            self.player2_score += 1
+        return outcome
+
+    def forfeit(self, slot):
+        """Encerra a rodada dando a vitória ao oponente de `slot`; retorna o vencedor (1 ou 2)."""
+        winner = 2 if slot == 1 else 1
+        if winner == 1:
+            self.player1_score += 1
+        else:
+            self.player2_score += 1
+        return winner
+
+    def clear_round(self):
+        self.player1_choice = None
+        self.player2_choice = None
+
+    # --- Torneio (todos contra todos, um duelo por vez) ---
+    @property
+    def tournament(self):
+        return self.standings is not None
+
+    def start_tournament(self, players):
+        self.standings = {sid: 0 for sid in players}
+        self.schedule = round_robin_pairs(players)
+        self.next_duel()
+
+    def next_duel(self):
+        """Passa para o próximo duelo da tabela; retorna False se ela acabou."""
+        self.clear_round()
+        self.player1_score = self.player2_score = 0
+        if not self.schedule:
+            self.assign_players(None, None)
+            return False
+        self.assign_players(*self.schedule.pop(0))
+        return True
+
+    def add_player(self, sid):
+        # Quem chega enfrenta todos os que já estão no torneio, depois dos duelos já marcados.
+        self.schedule.extend([other, sid] for other in self.standings)
+        self.standings[sid] = 0
+
+    def remove_player(self, sid):
+        self.standings.pop(sid, None)
+        self.schedule = [pair for pair in self.schedule if sid not in pair]
+        if self.slot_of(sid) is not None:
+            self.next_duel()
+
+    def champion(self):
+        """Sid de quem fez mais pontos, ou 'draw' se houver empate no topo."""
+        best = max(self.standings.values(), default=0)
+        leaders = [sid for sid, points in self.standings.items() if points == best]
+        return leaders[0] if len(leaders) == 1 else 'draw'
+
+    def is_over(self):
+        return self.tournament and self.player1_sid is None
+
+    def replace_sid(self, old_sid, new_sid):
+        super().replace_sid(old_sid, new_sid)
+        if self.tournament:
+            self.standings = {new_sid if sid == old_sid else sid: points for sid, points in self.standings.items()}
+            self.schedule = [[new_sid if sid == old_sid else sid for sid in pair] for pair in self.schedule]
+
+    @property
+    def scores(self):
+        if self.tournament:
+            return dict(self.standings)
+        return {self.player1_sid: self.player1_score, self.player2_sid: self.player2_score}
+
+    def to_dict(self):
+        return {
+            'player1_choice': choice_name(self.player1_choice),
+            'player2_choice': choice_name(self.player2_choice),
+            'player1_sid': self.player1_sid,
+            'player2_sid': self.player2_sid,
+            'scores': self.scores,
+            'round_ready': self.round_ready,
+            'tournament': self.tournament
+        }
+
+def choice_name(choice):
+    return None if choice is None else choice.name.lower()
+
+
+# --- Forca: letras como máscara de 26 bits (bit 0 = 'A') ---
+HANGMAN_MAX_PHRASE_LENGTH = 100
+
+def letter_bit(letter):
+    """Retorna o bit da letra (A-Z) ou 0 se não for uma letra válida."""
+    if len(letter) != 1 or not 'A' <= letter <= 'Z':
+        return 0
+    return 1 << (ord(letter) - 65)
+
+
+class HangmanState(CompactState):
+    # letter_positions (letra -> posições), revealed e hidden_count são montados
+    # uma vez em set_word; cada chute só toca as posições da letra chutada.
+    __slots__ = ('secret_word', 'letter_positions', 'revealed', 'hidden_count', 'guessed_mask',
+                 'wrong_guesses', 'max_wrong_guesses', 'game_over', 'game_winner', 'setter_sid', 'guesser_sid')
+    SID_FIELDS = ('setter_sid', 'guesser_sid', 'game_winner')
+
+    def __init__(self):
+        self.secret_word = ''
+        self.letter_positions = {}
+        self.revealed = []
+        self.hidden_count = 0
+        self.guessed_mask = 0
+        self.wrong_guesses = 0
+        self.max_wrong_guesses = 6
+        self.game_over = False
+        self.game_winner = None
+        self.setter_sid = None
+        self.guesser_sid = None
+
+    def set_word(self, secret_word):
+        """Define a palavra (ou frase, com espaços já revelados) e monta o índice."""
+        self.secret_word = secret_word
+        self.letter_positions = {}
+        self.revealed = []
+        for position, char in enumerate(secret_word):
+            if char == ' ':
+                self.revealed.append(' ')
+            else:
+                self.letter_positions.setdefault(char, []).append(position)
+                self.revealed.append('_')
+        self.hidden_count = len(secret_word) - secret_word.count(' ')
+        self.guessed_mask = 0
+        self.wrong_guesses = 0
+        self.game_over = False
+        self.game_winner = None
+
+    def is_guessed(self, letter):
+        return self.guessed_mask & letter_bit(letter) != 0
+
+    def guess(self, letter):
+        """Registra o chute e retorna as posições reveladas (vazio se errou)."""
+        self.guessed_mask |= letter_bit(letter)
+        positions = self.letter_positions.get(letter, [])
+        for position in positions:
+            self.revealed[position] = letter
+        self.hidden_count -= len(positions)
+        if not positions:
+            self.wrong_guesses += 1
+        return positions
+
+    def is_solved(self):
+        return self.hidden_count == 0
+
+    def is_over(self):
+        return self.game_over
+
+    @property
+    def word_pattern(self):
+        # Um caractere por posição: letra revelada, '_' escondida ou ' ' entre palavras.
+        return ''.join(self.revealed)
+
+    @property
+    def word_display(self):
+        return ' '.join(self.revealed)
+
+    @property
+    def guessed_letters(self):
+        return [chr(65 + i) for i in range(26) if self.guessed_mask >> i & 1]
+
+    def to_dict(self):
+        return {
+            'secret_word': self.secret_word,
+            'guessed_letters': self.guessed_letters,
+            'wrong_guesses': self.wrong_guesses,
+            'max_wrong_guesses': self.max_wrong_guesses,
+            'word_display': self.word_display,
+            'word_pattern': self.word_pattern,
+            'game_over': self.game_over,
+            'game_winner': self.game_winner,
+            'setter_sid': self.setter_sid,
+            'guesser_sid': self.guesser_sid
+        }
+
+
+GAME_STATE_CLASSES = {
+    'tic-tac-toe': TicTacToeState,
+    'rock-paper-scissors': RPSState,
+    'hangman': HangmanState
+}
+
+def dump_state(game_state):
+    return None if game_state is None else game_state.dump()
+
+def load_state(game_type, values):
+    if values is None:
+        return None
+    return GAME_STATE_CLASSES[game_type].load(values)
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+
+# --- Diretório de Salas (Lobby) ---
+# Índice das salas abertas por jogo, mantido a cada gravação e remoção de sala
+# em vez de varrer o store a cada consulta. Só as salas com lugar livre ficam no
+# índice: a entrada de uma sala cheia vale como remoção. Só entra uma mudança
+# quando algo visível no lobby muda (jogadores ou status); as mudanças ficam acumuladas, uma por
+# sala, até serem enviadas aos inscritos como um único diff por jogo.
+
+class LobbyIndex:
+    def __init__(self, update_interval=1.0):
+        self.update_interval = update_interval
+        self.last_drain = 0.0
+        self.rooms = {}      # jogo -> OrderedDict room_id -> entrada (ordem de criação)
+        self.room_games = {} # room_id -> jogo
+        self.changes = {}    # room_id -> (jogo, entrada ou None se removida)
+        self._lock = threading.Lock()
+
+    def update(self, room_id, game_type, entry):
+        if entry['players'] >= entry['max_players']:
+            return self.remove(room_id)
+        with self._lock:
+            game_rooms = self.rooms.get(game_type)
+            if game_rooms is None:
+                game_rooms = self.rooms[game_type] = OrderedDict()
+            if game_rooms.get(room_id) == entry:
+                return False
+            game_rooms[room_id] = entry
+            self.room_games[room_id] = game_type
+            self.changes[room_id] = (game_type, entry)
+            return True
+
+    def remove(self, room_id):
+        with self._lock:
+            game_type = self.room_games.pop(room_id, None)
+            if game_type is None:
+                return False
+            del self.rooms[game_type][room_id]
+            self.changes[room_id] = (game_type, None)
+            return True
+
+    def page(self, game_type, offset=0, limit=50):
+        """Retorna (salas da página, total de salas do jogo)."""
+        with self._lock:
+            game_rooms = self.rooms.get(game_type, {})
+            return list(islice(game_rooms.values(), offset, offset + limit)), len(game_rooms)
+
+    def drain_changes(self, now=None):
+        """Retorna {jogo: {'updated': [...], 'removed': [...], 'total': n}} desde a última chamada.
+
+        Antes de `update_interval` segundos da última entrega retorna {} e as
+        mudanças continuam acumulando.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self.changes or now - self.last_drain < self.update_interval:
+                return {}
+            self.last_drain = now
+            changes, self.changes = self.changes, {}
+            totals = {game_type: len(game_rooms) for game_type, game_rooms in self.rooms.items()}
+        diffs = {}
+        for room_id, (game_type, entry) in changes.items():
+            diff = diffs.get(game_type)
+            if diff is None:
+                # O total deixa o cliente saber se ainda há salas fora da página que ele mostra.
+                diff = diffs[game_type] = {'updated': [], 'removed': [], 'total': totals.get(game_type, 0)}
+            if entry is None:
+                diff['removed'].append(room_id)
+            else:
+                diff['updated'].append(entry)
+        return diffs
+
+    def room_count(self):
+        return len(self.room_games)
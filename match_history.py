@@ -0,0 +1,180 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from async_mode import native_lock, run_blocking
+
+
+# --- Histórico de Partidas e Ranking ---
+# Os handlers só enfileiram a partida terminada e atualizam o ranking em
+# memória; uma thread de fundo grava a fila no SQLite em lotes, uma transação
+# por lote (write-behind). Com eventlet/gevent essa thread é uma green thread,
+# então cada lote é gravado por run_blocking numa thread do sistema e o hub
+# segue atendendo os sockets durante o executemany/commit. As estatísticas
+# ficam indexadas por (jogo, nome de usuário); o jogo None acumula todos os jogos.
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    game_type TEXT NOT NULL,
+    room_id TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    details TEXT
+);
+CREATE TABLE IF NOT EXISTS match_players (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    username TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_stats (
+    game_type TEXT NOT NULL,
+    username TEXT NOT NULL,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (game_type, username)
+);
+'''
+
+RESULT_COLUMNS = {'win': 0, 'loss': 1, 'draw': 2}
+
+
+class MatchHistory:
+    def __init__(self, path=None, batch_size=200, flush_interval=1.0, max_queue=10000, ranking_ttl=1.0, on_error=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.queue = deque()
+        self.dropped = 0
+        self.on_error = on_error
+        # (jogo, usuário) -> [vitórias, derrotas, empates]
+        self.stats = {}
+        # Jogo -> (montado em, ranking ordenado). Só é refeito quando alguma
+        # estatística daquele jogo mudou e o atual tem mais de `ranking_ttl` segundos.
+        self.ranking_ttl = ranking_ttl
+        self._rankings = {}
+        self._stale_rankings = set()
+        self._stats_lock = threading.Lock()
+        # Tomado dentro da thread do sistema de run_blocking: não pode ser um lock green.
+        self._db_lock = native_lock()
+        self._started = False
+        self.connection = None
+        if path is not None:
+            self.open(path)
+        atexit.register(self.flush_all)
+
+    def open(self, path):
+        """Abre (ou cria) o banco e soma ao ranking em memória o que já estava gravado.
+
+        Até lá as partidas só ficam na fila e no ranking em memória.
+        """
+        self.path = path
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.executescript(SCHEMA)
+        if path != ':memory:':
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection = connection
+        with self._stats_lock:
+            self._load_stats()
+            self._rankings.clear()
+
+    def _load_stats(self):
+        rows = self.connection.execute('SELECT game_type, username, wins, losses, draws FROM player_stats')
+        for game_type, username, wins, losses, draws in rows:
+            for key in ((game_type, username), (None, username)):
+                entry = self.stats.setdefault(key, [0, 0, 0])
+                entry[0] += wins
+                entry[1] += losses
+                entry[2] += draws
+
+    def record_match(self, game_type, room_id, results, details=None):
+        """Registra uma partida terminada; `results` é [(usuário, 'win'|'loss'|'draw')]."""
+        with self._stats_lock:
+            for username, result in results:
+                column = RESULT_COLUMNS[result]
+                for key in ((game_type, username), (None, username)):
+                    self.stats.setdefault(key, [0, 0, 0])[column] += 1
+            self._stale_rankings.update((game_type, None))
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self.queue.append((game_type, room_id, time.time(), results, details))
+
+    def leaderboard(self, game_type=None, limit=20):
+        now = time.monotonic()
+        with self._stats_lock:
+            built_at, ranking = self._rankings.get(game_type, (None, None))
+            if ranking is None or (game_type in self._stale_rankings and now - built_at >= self.ranking_ttl):
+                ranking = sorted(
+                    ((username, wins, losses, draws) for (stats_game, username), (wins, losses, draws)
+                     in self.stats.items() if stats_game == game_type),
+                    key=lambda row: (-row[1], row[2], row[0])
+                )
+                self._rankings[game_type] = (now, ranking)
+                self._stale_rankings.discard(game_type)
+        return [
+            {'username': username, 'wins': wins, 'losses': losses, 'draws': draws, 'played': wins + losses + draws}
+            for username, wins, losses, draws in ranking[:limit]
+        ]
+
+    def flush(self):
+        """Grava até `batch_size` partidas numa única transação; retorna quantas saíram."""
+        if self.connection is None:
+            return 0
+        batch = []
+        while self.queue and len(batch) < self.batch_size:
+            batch.append(self.queue.popleft())
+        if not batch:
+            return 0
+        # O placar do lote é somado antes: um UPSERT por jogador, não por partida.
+        deltas = {}
+        for game_type, _, _, results, _ in batch:
+            for username, result in results:
+                deltas.setdefault((game_type, username), [0, 0, 0])[RESULT_COLUMNS[result]] += 1
+        with self._db_lock, self.connection:
+            for game_type, room_id, finished_at, results, details in batch:
+                cursor = self.connection.execute(
+                    'INSERT INTO matches (game_type, room_id, finished_at, details) VALUES (?, ?, ?, ?)',
+                    (game_type, room_id, finished_at, json.dumps(details, separators=(',', ':')) if details else None)
+                )
+                self.connection.executemany(
+                    'INSERT INTO match_players (match_id, username, result) VALUES (?, ?, ?)',
+                    [(cursor.lastrowid, username, result) for username, result in results]
+                )
+            self.connection.executemany(
+                'INSERT INTO player_stats (game_type, username, wins, losses, draws) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (game_type, username) DO UPDATE SET wins = wins + excluded.wins, '
+                'losses = losses + excluded.losses, draws = draws + excluded.draws',
+                [(game_type, username, wins, losses, draws) for (game_type, username), (wins, losses, draws) in deltas.items()]
+            )
+        return len(batch)
+
+    def flush_all(self):
+        while self.flush():
+            pass
+
+    def pending_count(self):
+        return len(self.queue)
+
+    def start(self):
+        """Inicia a thread que grava a fila periodicamente."""
+        if self._started:
+            return
+        self._started = True
+
+        def run():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    while run_blocking(self.flush) == self.batch_size:
+                        pass
+                except sqlite3.Error as exc:
+                    # O lote que falhou é perdido; o ranking em memória segue correto.
+                    if self.on_error is not None:
+                        self.on_error(exc)
+        threading.Thread(target=run, name='match-history-writer', daemon=True).start()
@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+
+
+# --- Matchmaking ---
+# Uma fila FIFO por (jogo, bucket). O bucket é opcional e separa jogadores por
+# nível ou região/latência. Cada fila é um OrderedDict sid -> nome de usuário,
+# então entrar, sair do início e cancelar no meio são O(1). O pareamento
+# acontece dentro de uma única chamada sob um lock interno, e por isso é
+# atômico neste worker mesmo com handlers em threads.
+
+class MatchmakingQueue:
+    def __init__(self):
+        self.queues = {}
+        self.sid_to_key = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, sid, game_id, username, bucket=None):
+        """Coloca o jogador na fila ou o pareia com quem já estava esperando.
+
+        Retorna (sid, username) do oponente quando houver pareamento; caso
+        contrário retorna None e o jogador fica aguardando.
+        """
+        with self._lock:
+            if sid in self.sid_to_key:
+                return None
+            key = (game_id, bucket)
+            queue = self.queues.get(key)
+            if queue:
+                opponent_sid, opponent_username = queue.popitem(last=False)
+                del self.sid_to_key[opponent_sid]
+                if not queue:
+                    del self.queues[key]
+                return opponent_sid, opponent_username
+            self.queues.setdefault(key, OrderedDict())[sid] = username
+            self.sid_to_key[sid] = key
+            return None
+
+    def cancel(self, sid):
+        with self._lock:
+            key = self.sid_to_key.pop(sid, None)
+            if key is None:
+                return False
+            queue = self.queues[key]
+            del queue[sid]
+            if not queue:
+                del self.queues[key]
+            return True
+
+    def is_waiting(self, sid):
+        return sid in self.sid_to_key
+
+    def waiting_count(self, game_id=None):
+        with self._lock:
+            return sum(len(queue) for (queue_game_id, _), queue in self.queues.items()
+                       if game_id is None or queue_game_id == game_id)
@@ -0,0 +1,179 @@
+import bisect
+import json
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+
+# --- Métricas no Formato do Prometheus ---
+# Contadores e histogramas simples em memória, com um único rótulo
+# (normalmente o nome do evento), expostos em texto pela rota /metrics.
+# Registrar uma amostra é só uma soma em dicionário, sob o lock da métrica (no
+# modo threading os handlers rodam em paralelo e um += sem lock perderia
+# incrementos); a formatação acontece apenas quando /metrics é lido, sobre uma
+# cópia feita sob o mesmo lock.
+
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _labels(label_name, label):
+    if label_name is None:
+        return ''
+    return '{%s="%s"}' % (label_name, str(label).replace('\\', '\\\\').replace('"', '\\"'))
+
+
+class Counter:
+    def __init__(self, name, help_text, label_name=None):
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self.values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, label=None, amount=1):
+        with self._lock:
+            self.values[label] += amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = list(self.values.items())
+        for label, value in sorted(values, key=lambda item: str(item[0])):
+            lines.append(f'{self.name}{_labels(self.label_name, label)} {value:g}')
+        return lines
+
+
+class Gauge:
+    """Valor lido na hora da coleta, através de uma função."""
+
+    def __init__(self, name, help_text, read):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self):
+        return [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} gauge', f'{self.name} {self.read():g}']
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_name=None, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self.buckets = tuple(buckets)
+        # Rótulo -> [contagem por bucket (+Inf no fim), soma, total]
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(label)
+            if series is None:
+                series = self.series[label] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bucket] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(label, (list(counts), total, count)) for label, (counts, total, count) in self.series.items()]
+        for label, (counts, total, count) in sorted(series, key=lambda item: str(item[0])):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                label_pairs = f'le="{le}"' if self.label_name is None else \
+                    _labels(self.label_name, label)[1:-1] + f',le="{le}"'
+                lines.append(f'{self.name}_bucket{{{label_pairs}}} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_name, label)} {total:g}')
+            lines.append(f'{self.name}_count{_labels(self.label_name, label)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, label_name=None):
+        return self._register(Counter(name, help_text, label_name))
+
+    def gauge(self, name, help_text, read):
+        return self._register(Gauge(name, help_text, read))
+
+    def histogram(self, name, help_text, label_name=None, buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, label_name, buckets))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class SocketIOMetrics:
+    """Métricas dos handlers e emits do Socket.IO.
+
+    `instrument(event)` decora um handler registrando latência, chamadas e
+    exceções. `count_emit` conta cada emit; o tamanho dos payloads é medido
+    por amostragem (1 a cada `bytes_sample_every` emits de cada evento) para
+    não serializar tudo duas vezes no caminho quente. As métricas de bytes
+    somam só os emits amostrados, com o tamanho real de cada um: o tamanho
+    médio é bytes/amostras e o volume estimado, esse médio vezes
+    socketio_emits_total. `payload_size` mede um payload no serializador do
+    transporte (padrão: JSON compacto).
+    """
+
+    def __init__(self, registry, bytes_sample_every=10, payload_size=None):
+        self.registry = registry
+        self.bytes_sample_every = max(1, bytes_sample_every)
+        self.payload_size = payload_size or (
+            lambda payload: len(json.dumps(payload, separators=(',', ':'), default=str)))
+        self.handler_latency = registry.histogram(
+            'socketio_handler_latency_seconds', 'Tempo de execução dos handlers Socket.IO.', 'event')
+        self.handler_calls = registry.counter(
+            'socketio_handler_calls_total', 'Eventos Socket.IO recebidos.', 'event')
+        self.handler_exceptions = registry.counter(
+            'socketio_handler_exceptions_total', 'Exceções não tratadas nos handlers.', 'event')
+        self.game_errors = registry.counter(
+            'socketio_game_errors_total', 'Emits de game_error/error por evento de origem.', 'event')
+        self.emits = registry.counter(
+            'socketio_emits_total', 'Emits enviados pelo servidor.', 'event')
+        self.emit_bytes_sampled = registry.counter(
+            'socketio_emit_payload_bytes_sampled_total', 'Bytes de payload dos emits amostrados, no serializador em uso.', 'event')
+        self.emit_bytes_samples = registry.counter(
+            'socketio_emit_payload_samples_total', 'Emits cujo payload foi medido.', 'event')
+        self._emit_counts = defaultdict(int)
+        self._emit_counts_lock = threading.Lock()
+
+    def instrument(self, event):
+        def decorator(handler):
+            @wraps(handler)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return handler(*args, **kwargs)
+                except Exception:
+                    self.handler_exceptions.inc(event)
+                    raise
+                finally:
+                    self.handler_calls.inc(event)
+                    self.handler_latency.observe(event, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def count_emit(self, event, args, source_event=None):
+        self.emits.inc(event)
+        if event in ('game_error', 'error'):
+            self.game_errors.inc(source_event)
+        with self._emit_counts_lock:
+            count = self._emit_counts[event] = self._emit_counts[event] + 1
+        if (count - 1) % self.bytes_sample_every == 0 and args:
+            self.emit_bytes_sampled.inc(event, self.payload_size(args[0] if len(args) == 1 else list(args)))
+            self.emit_bytes_samples.inc(event)
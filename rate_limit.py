@@ -0,0 +1,107 @@
+import threading
+import time
+
+
+# --- Limite de Taxa por Conexão ---
+# Um token bucket por (sid, evento): cada evento consome um token e os tokens
+# voltam a `rate` por segundo até o máximo de `burst`. A verificação é só
+# aritmética sobre uma lista, feita antes de qualquer leitura do store, para
+# que um cliente inundando o servidor custe o mínimo possível ao hub. Com
+# threading os handlers de um mesmo sid podem rodar em paralelo, então o
+# reabastecimento e o consumo acontecem sob um lock interno.
+
+DEFAULT_RATE_LIMITS = {
+    # evento: (tokens por segundo, rajada máxima)
+    'create_or_join_room': (1, 5),
+    'quick_play': (1, 5),
+    'cancel_matchmaking': (1, 5),
+    'chat_message': (2, 5),
+    'tic_tac_toe_move': (5, 10),
+    'rps_choice': (5, 10),
+    'hangman_set_word': (1, 3),
+    'hangman_guess_udp': (5, 10),
+    'reset_tic_tac_toe': (1, 3),
+    'reset_rps': (1, 3),
+    'reset_hangman': (1, 3),
+    'resync': (1, 5),
+    'resume_session': (1, 5),
+    'spectate_room': (1, 5),
+    'lobby_subscribe': (1, 5),
+    'lobby_unsubscribe': (1, 5),
+    'add_bot': (1, 3)
+}
+
+
+def parse_rate_limits(spec, defaults=DEFAULT_RATE_LIMITS):
+    """Aplica sobre `defaults` uma configuração como "chat_message=2/5,rps_choice=10/20".
+
+    "off" desativa todos os limites; "evento=off" desativa só aquele evento.
+    """
+    limits = dict(defaults)
+    if not spec:
+        return limits
+    if spec.strip() == 'off':
+        return {}
+    for item in spec.split(','):
+        event, _, value = item.strip().partition('=')
+        if value == 'off':
+            limits.pop(event, None)
+            continue
+        rate, _, burst = value.partition('/')
+        limits[event] = (float(rate), float(burst or rate))
+    return limits
+
+
+class RateLimiter:
+    def __init__(self, limits):
+        self.limits = limits
+        # sid -> evento -> [tokens, último reabastecimento, já avisado]
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def allow(self, sid, event, now=None):
+        limit = self.limits.get(event)
+        if limit is None:
+            return True
+        rate, burst = limit
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            sid_buckets = self.buckets.get(sid)
+            if sid_buckets is None:
+                sid_buckets = self.buckets[sid] = {}
+            bucket = sid_buckets.get(event)
+            if bucket is None:
+                sid_buckets[event] = [burst - 1, now, False]
+                return True
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                bucket[2] = False
+                return True
+            bucket[0] = tokens
+            return False
+
+    def should_notify(self, sid, event):
+        """True apenas na primeira rejeição de uma sequência, para avisar o cliente uma vez."""
+        with self._lock:
+            bucket = self.buckets.get(sid, {}).get(event)
+            if bucket is None or bucket[2]:
+                return False
+            bucket[2] = True
+            return True
+
+    def retry_after(self, sid, event):
+        rate, _ = self.limits[event]
+        if rate <= 0:
+            return None
+        with self._lock:
+            bucket = self.buckets.get(sid, {}).get(event)
+            return max(0.0, (1 - bucket[0]) / rate) if bucket else 0.0
+
+    def forget(self, sid):
+        with self._lock:
+            self.buckets.pop(sid, None)
+
+    def tracked_sids(self):
+        return len(self.buckets)
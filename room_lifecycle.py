@@ -0,0 +1,89 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+
+
+# --- Ciclo de Vida das Salas ---
+# Cada sala tem um horário de última atividade e um status ('waiting' enquanto
+# falta oponente, 'playing' ou 'finished'); o status define o tempo ocioso
+# permitido. Os prazos ficam num heap com no máximo uma entrada válida por
+# sala: registrar atividade só atualiza o dicionário (O(1)), e a entrada é
+# reagendada quando vence com a sala ainda ativa (O(log n)). As salas à espera
+# de oponente também ficam num OrderedDict em ordem de uso, para escolher qual
+# remover quando o limite de salas é atingido. Um lock interno protege as
+# estruturas quando os handlers rodam em threads.
+
+ROOM_STATUSES = ('waiting', 'playing', 'finished')
+
+
+class RoomLifecycle:
+    def __init__(self, idle_timeout=900, waiting_timeout=600, finished_timeout=300, max_rooms=None):
+        self.timeouts = {'waiting': waiting_timeout, 'playing': idle_timeout, 'finished': finished_timeout}
+        self.max_rooms = max_rooms
+        self.rooms = {} # room_id -> (última atividade, status)
+        self.waiting = OrderedDict()
+        self.heap = []
+        self.scheduled = {} # room_id -> prazo da entrada válida no heap
+        self._lock = threading.Lock()
+
+    def touch(self, room_id, status, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self.rooms[room_id] = (now, status)
+            if status == 'waiting':
+                self.waiting[room_id] = None
+                self.waiting.move_to_end(room_id)
+            else:
+                self.waiting.pop(room_id, None)
+            deadline = now + self.timeouts[status]
+            scheduled = self.scheduled.get(room_id)
+            # Um prazo mais curto (ex.: o jogo acabou) precisa de uma entrada nova;
+            # um prazo mais longo é tratado quando a entrada atual vencer.
+            if scheduled is None or deadline < scheduled:
+                self.scheduled[room_id] = deadline
+                heapq.heappush(self.heap, (deadline, room_id))
+
+    def forget(self, room_id):
+        with self._lock:
+            self.rooms.pop(room_id, None)
+            self.waiting.pop(room_id, None)
+            self.scheduled.pop(room_id, None) # A entrada no heap fica obsoleta e é ignorada
+
+    def last_activity(self, room_id):
+        entry = self.rooms.get(room_id)
+        return entry[0] if entry else None
+
+    def pop_expired(self, now=None):
+        """Retorna [(room_id, status)] das salas cujo tempo ocioso venceu."""
+        now = time.time() if now is None else now
+        expired = []
+        with self._lock:
+            while self.heap and self.heap[0][0] <= now:
+                deadline, room_id = heapq.heappop(self.heap)
+                if self.scheduled.get(room_id) != deadline:
+                    continue
+                del self.scheduled[room_id]
+                last_activity, status = self.rooms[room_id]
+                actual_deadline = last_activity + self.timeouts[status]
+                if actual_deadline > now:
+                    self.scheduled[room_id] = actual_deadline
+                    heapq.heappush(self.heap, (actual_deadline, room_id))
+                else:
+                    expired.append((room_id, status))
+        return expired
+
+    def is_full(self, room_count):
+        return self.max_rooms is not None and room_count >= self.max_rooms
+
+    def oldest_waiting(self):
+        """Sala à espera de oponente usada há mais tempo (candidata a remoção)."""
+        with self._lock:
+            return next(iter(self.waiting), None)
+
+    def tracked_count(self):
+        return len(self.rooms)
+
+    def room_ids(self):
+        with self._lock:
+            return list(self.rooms)
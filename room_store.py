@@ -0,0 +1,249 @@
+import json
+import threading
+
+from games import dump_state, load_state
+
+
+# --- Armazenamento do Estado das Salas ---
+# Todos os handlers do app.py leem e gravam salas e usuários através de um
+# RoomStore. O backend em memória mantém o comportamento original (um único
+# processo); o backend Redis permite rodar vários workers atrás de um
+# balanceador, combinado com o `message_queue` do Flask-SocketIO.
+
+class RoomStore:
+    def __init__(self, lock_stripes=64):
+        # Travas locais para rodar com threads ou vários greenlets: um número
+        # fixo de locks indexado pelo hash do ID da sala (lock striping), em vez
+        # de um lock por sala, e um lock à parte para o mapa de usuários.
+        self._room_locks = [threading.RLock() for _ in range(lock_stripes)]
+        self._user_lock = threading.RLock()
+
+    def get_room(self, room_id):
+        raise NotImplementedError
+
+    def save_room(self, room_id, room_data):
+        raise NotImplementedError
+
+    def delete_room(self, room_id):
+        raise NotImplementedError
+
+    def room_exists(self, room_id):
+        return self.get_room(room_id) is not None
+
+    def room_count(self):
+        raise NotImplementedError
+
+    def get_user(self, sid):
+        raise NotImplementedError
+
+    def set_user(self, sid, user_info):
+        raise NotImplementedError
+
+    def delete_user(self, sid):
+        raise NotImplementedError
+
+    def user_count(self):
+        raise NotImplementedError
+
+    def ping(self):
+        # Usado pela verificação de prontidão (/readyz).
+        return True
+
+    @property
+    def shared(self):
+        # O estado sobrevive ao worker e pode ser retomado por outro?
+        return False
+
+    def lock(self, room_id):
+        # Exclusão mútua por sala para toda leitura-alteração-gravação do estado.
+        return self._room_locks[hash(room_id) % len(self._room_locks)]
+
+    def user_lock(self):
+        # Para verificações seguidas de gravação em usuários (ex.: já está numa sala?).
+        return self._user_lock
+
+
+class InMemoryRoomStore(RoomStore):
+    def __init__(self, lock_stripes=64):
+        super().__init__(lock_stripes)
+        self.rooms = {}
+        self.users = {}
+
+    def get_room(self, room_id):
+        return self.rooms.get(room_id)
+
+    def save_room(self, room_id, room_data):
+        # Os handlers alteram o próprio dicionário devolvido por get_room,
+        # então aqui basta garantir que ele esteja registrado.
+        self.rooms[room_id] = room_data
+
+    def delete_room(self, room_id):
+        self.rooms.pop(room_id, None)
+
+    def room_exists(self, room_id):
+        return room_id in self.rooms
+
+    def room_count(self):
+        return len(self.rooms)
+
+    def get_user(self, sid):
+        return self.users.get(sid)
+
+    def set_user(self, sid, user_info):
+        self.users[sid] = user_info
+
+    def delete_user(self, sid):
+        self.users.pop(sid, None)
+
+    def user_count(self):
+        return len(self.users)
+
+
+class RedisRoomStore(RoomStore):
+    """Backend compatível com o protocolo Redis (também funciona com fakeredis).
+
+    Cada sala é gravada como JSON em sua própria chave, o que permite travar
+    e gravar salas independentemente; os usuários ficam em um único hash.
+    O estado do jogo vai na forma compacta de `dump()` (lista de campos).
+    """
+
+    def __init__(self, client, prefix='netplay:', lock_timeout=5, lock_stripes=64, on_lock_lost=None):
+        super().__init__(lock_stripes)
+        self.client = client
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+        self.on_lock_lost = on_lock_lost
+        # Locks de sala que esta thread (ou greenlet) segura: nome -> [lock do Redis, profundidade].
+        self._local = threading.local()
+        self._room_ids_key = f'{prefix}room_ids'
+        self._users_key = f'{prefix}users'
+
+    def _room_key(self, room_id):
+        return f'{self.prefix}room:{room_id}'
+
+    def get_room(self, room_id):
+        raw = self.client.get(self._room_key(room_id))
+        if raw is None:
+            return None
+        room_data = json.loads(raw)
+        room_data['game_state'] = load_state(room_data['game_type'], room_data['game_state'])
+        return room_data
+
+    def save_room(self, room_id, room_data):
+        encoded = dict(room_data, game_state=dump_state(room_data['game_state']))
+        pipe = self.client.pipeline()
+        pipe.set(self._room_key(room_id), json.dumps(encoded, separators=(',', ':')))
+        pipe.sadd(self._room_ids_key, room_id)
+        pipe.execute()
+
+    def delete_room(self, room_id):
+        pipe = self.client.pipeline()
+        pipe.delete(self._room_key(room_id))
+        pipe.srem(self._room_ids_key, room_id)
+        pipe.execute()
+
+    def room_exists(self, room_id):
+        return bool(self.client.exists(self._room_key(room_id)))
+
+    def room_count(self):
+        return self.client.scard(self._room_ids_key)
+
+    def get_user(self, sid):
+        raw = self.client.hget(self._users_key, sid)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set_user(self, sid, user_info):
+        self.client.hset(self._users_key, sid, json.dumps(user_info, separators=(',', ':')))
+
+    def delete_user(self, sid):
+        self.client.hdel(self._users_key, sid)
+
+    def user_count(self):
+        return self.client.hlen(self._users_key)
+
+    def ping(self):
+        return bool(self.client.ping())
+
+    @property
+    def shared(self):
+        return True
+
+    def lock(self, room_id):
+        # Vale entre workers e também entre threads do mesmo worker. Os usuários
+        # ficam com o lock local: um sid só recebe eventos no próprio worker.
+        return RedisRoomLock(self, room_id)
+
+    def held_locks(self):
+        locks = getattr(self._local, 'locks', None)
+        if locks is None:
+            locks = self._local.locks = {}
+        return locks
+
+
+class RedisRoomLock:
+    """Lock de sala no Redis com a mesma semântica do RLock do store em memória.
+
+    É reentrante na mesma thread (ou greenlet): só a primeira entrada e a
+    última saída falam com o Redis. O lock expira sozinho depois de
+    `lock_timeout` segundos, para não prender a sala se o worker morrer; se um
+    handler passar desse prazo, outro worker pode ter entrado na sala e a
+    liberação avisa `on_lock_lost(room_id)` em vez de levantar uma exceção.
+    """
+
+    def __init__(self, store, room_id):
+        self.store = store
+        self.room_id = room_id
+        self.name = f'{store.prefix}lock:{room_id}'
+
+    def acquire(self, blocking=True):
+        held = self.store.held_locks()
+        entry = held.get(self.name)
+        if entry is not None:
+            entry[1] += 1
+            return True
+        lock = self.store.client.lock(self.name, timeout=self.store.lock_timeout)
+        if not lock.acquire(blocking=blocking):
+            return False
+        held[self.name] = [lock, 1]
+        return True
+
+    def release(self):
+        from redis.exceptions import LockNotOwnedError
+        held = self.store.held_locks()
+        entry = held.get(self.name)
+        if entry is None:
+            raise RuntimeError(f'O lock da sala {self.room_id} não pertence a esta thread.')
+        entry[1] -= 1
+        if entry[1]:
+            return
+        del held[self.name]
+        try:
+            entry[0].release()
+        except LockNotOwnedError:
+            if self.store.on_lock_lost is not None:
+                self.store.on_lock_lost(self.room_id)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def create_room_store(url=None, lock_stripes=64, lock_timeout=5, on_lock_lost=None):
+    """Cria o store a partir de uma URL (ex.: redis://localhost:6379/0).
+
+    Sem URL, usa o armazenamento em memória do próprio processo;
+    `lock_timeout` e `on_lock_lost` só valem para o Redis.
+    """
+    if not url:
+        return InMemoryRoomStore(lock_stripes)
+    try:
+        import redis
+    except ImportError as exc:
+        raise RuntimeError('O pacote "redis" é necessário para usar ROOM_STORE_URL.') from exc
+    return RedisRoomStore(redis.Redis.from_url(url), lock_timeout=lock_timeout, lock_stripes=lock_stripes,
+                          on_lock_lost=on_lock_lost)
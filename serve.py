@@ -0,0 +1,48 @@
+"""Ponto de entrada de produção.
+
+Sobe o mesmo app do `python app.py`, mas sem debug nem reloader, e instala
+o handler de SIGTERM que drena o worker antes de sair (veja a seção "Saúde e
+Drenagem" do app.py). Um segundo SIGTERM encerra na hora.
+
+    HOST=0.0.0.0 PORT=5000 python serve.py
+
+Para o orquestrador: liveness em /healthz, readiness em /readyz, e um prazo
+de encerramento (ex.: terminationGracePeriodSeconds) maior que DRAIN_TIMEOUT.
+
+SOCKETIO_ASYNC_MODE=threading usa o servidor de desenvolvimento do Werkzeug
+e só sobe com ALLOW_UNSAFE_WERKZEUG=1.
+"""
+from async_mode import monkey_patch
+monkey_patch() # Antes de qualquer outro import (veja async_mode.py).
+
+import os
+import signal
+import sys
+
+from app import app, begin_drain, drain, init_runtime, log, shutdown, socketio
+
+
+def main():
+    drain.install_signal_handlers(begin_drain, lambda: os._exit(1))
+    # O fim da drenagem no modo threading é um SIGINT (veja stop_server), mas
+    # processos iniciados em segundo plano pelo shell herdam o SIGINT ignorado.
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    host = os.environ.get('HOST', '0.0.0.0')
+    port = int(os.environ.get('PORT', '5000'))
+    async_mode = socketio.server.eio.async_mode
+    options = {}
+    if async_mode == 'threading':
+        if os.environ.get('ALLOW_UNSAFE_WERKZEUG') != '1':
+            sys.exit('SOCKETIO_ASYNC_MODE=threading usa o servidor de desenvolvimento do Werkzeug; '
+                     'defina ALLOW_UNSAFE_WERKZEUG=1 para usá-lo mesmo assim.')
+        options['allow_unsafe_werkzeug'] = True
+    init_runtime()
+    log.info('server_starting', host=host, port=port, async_mode=async_mode)
+    socketio.run(app, host=host, port=port, debug=False, use_reloader=False,
+                 log_output=os.environ.get('ACCESS_LOG', '0') == '1', **options)
+    shutdown()
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
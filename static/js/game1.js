@@ -104,7 +104,14 @@ document.addEventListener('DOMContentLoaded', () => {
 
     socket.on('tic_tac_toe_update', (data) => {
         console.log('[TicTacToe] tic_tac_toe_update event received.');
-        currentBoard = data.board;
+        if (!window.acceptSeq(data.seq)) {
+            return; // Fora de ordem: o estado virá pelo state_snapshot
+        }
+        if (data.board) {
+            currentBoard = data.board;
+        } else {
+            currentBoard[data.cell_index] = data.player_mark; // Modo delta: só a célula jogada
+        }
         currentTurnSID = data.current_turn; 
         updateBoardDisplay();
         updateGameInfo(data.winner, data.player_mark, data.cell_index);
@@ -118,6 +125,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     socket.on('tic_tac_toe_reset', (data) => {
         console.log('[TicTacToe] tic_tac_toe_reset event received.');
+        window.resetSeq(data.seq);
         currentBoard = data.initial_state.board;
         currentTurnSID = data.initial_state.current_turn;
         playersMapSIDToUsername = data.usernames; 
@@ -130,6 +138,20 @@ document.addEventListener('DOMContentLoaded', () => {
         resetBtn.style.display = 'none';
     });
 
+    socket.on('state_snapshot', (data) => {
+        console.log('[TicTacToe] state_snapshot event received.');
+        const state = data.state;
+        currentBoard = state.board;
+        currentTurnSID = state.current_turn;
+        playersMapSIDToUsername = data.usernames;
+        myPlayerMark = state.players_map[window.getMySocketId()];
+        gameEnded = !!state.winner;
+        gameStarted = true;
+        updateBoardDisplay();
+        updateGameInfo(state.winner);
+        resetBtn.style.display = gameEnded ? 'block' : 'none';
+    });
+
     socket.on('game_error', (data) => {
         alert(`Erro no jogo: ${data.message}`);
         console.error(`[TicTacToe] Game Error: ${data.message}`);
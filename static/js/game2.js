@@ -25,6 +25,18 @@ document.addEventListener('DOMContentLoaded', () => {
     let gameActive = false; 
     let player1Sid = null; // Para manter a ordem dos jogadores e seus SIDs
     let player2Sid = null;
+    // Torneio (salas com mais de dois lugares): player1Sid/player2Sid são o duelo
+    // atual e scores guarda os pontos de todos os jogadores.
+    let tournament = false;
+
+    function playerName(sid) {
+        return playersMapSIDToUsername[sid] || 'Jogador';
+    }
+
+    function inCurrentDuel() {
+        const myCurrentSID = window.getMySocketId();
+        return !tournament || myCurrentSID === player1Sid || myCurrentSID === player2Sid;
+    }
 
     function enableChoices(enable) {
         rockBtn.disabled = !enable;
@@ -55,12 +67,18 @@ document.addEventListener('DOMContentLoaded', () => {
         opponentChoiceDisplay.textContent = 'Escolha do oponente: Nenhuma';
         resultsDisplay.textContent = '';
         roundStatusDisplay.textContent = 'Faça sua escolha!';
-        if (gameActive) { 
+        if (gameActive && inCurrentDuel()) { 
             enableChoices(true);
         } else {
             enableChoices(false);
         }
         resetBtn.style.display = 'none'; // Esconde o botão de reset ao iniciar a rodada
+        if (tournament && gameActive && !inCurrentDuel()) {
+            roundStatusDisplay.textContent = `Aguarde o seu duelo. Agora: ${playerName(player1Sid)} x ${playerName(player2Sid)}.`;
+        } else if (tournament && !gameActive && player1Sid === null && Object.keys(scores).length) {
+            roundStatusDisplay.textContent = 'Torneio encerrado! Reinicie para jogar de novo.';
+            resetBtn.style.display = 'block';
+        }
     }
 
     // Event Listeners para os botões de escolha
@@ -106,6 +124,11 @@ document.addEventListener('DOMContentLoaded', () => {
         scores = data.initial_state.scores;
         player1Sid = data.players_sids[0]; // Guarda os SIDs dos jogadores na ordem
         player2Sid = data.players_sids[1];
+        tournament = Boolean(data.initial_state.tournament);
+        if (tournament) {
+            player1Sid = data.initial_state.player1_sid;
+            player2Sid = data.initial_state.player2_sid;
+        }
         gameActive = true;
         updateScoresDisplay(); // Atualiza o placar
         resetRoundDisplay(); // Prepara para a primeira rodada
@@ -114,9 +137,16 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Recebe feedback de que um jogador fez a escolha (UDP)
     socket.on('rps_player_ready', (data) => {
+        if (!window.acceptSeq(data.seq)) {
+            return;
+        }
         const myCurrentSID = window.getMySocketId();
-        if (data.player_sid !== myCurrentSID) {
-            roundStatusDisplay.textContent = `Oponente fez sua escolha!`;
+        if (!inCurrentDuel()) {
+            roundStatusDisplay.textContent = `${playerName(data.player_sid)} fez sua escolha!`;
+        } else if (data.player_sid !== myCurrentSID) {
+            roundStatusDisplay.textContent = myChoice
+                ? 'Oponente fez sua escolha!'
+                : `Oponente fez sua escolha! Você tem ${Math.ceil(data.time_left)} segundos para escolher.`;
             console.log(`[RPS] Opponent (${playersMapSIDToUsername[data.player_sid]}) ready.`);
         }
     });
@@ -124,23 +154,35 @@ document.addEventListener('DOMContentLoaded', () => {
     // Recebe o resultado da rodada (UDP)
     socket.on('rps_round_result', (data) => {
         console.log('[RPS] rps_round_result event received.');
+        if (!window.acceptSeq(data.seq)) {
+            return;
+        }
         const myCurrentSID = window.getMySocketId();
+        // Em modo delta o servidor não reenvia os SIDs: usamos os do game_start.
+        const round1Sid = data.player1_sid || player1Sid;
+        const round2Sid = data.player2_sid || player2Sid;
 
-        const p1Username = playersMapSIDToUsername[data.player1_sid] || 'Jogador 1';
-        const p2Username = playersMapSIDToUsername[data.player2_sid] || 'Jogador 2';
+        const p1Username = playersMapSIDToUsername[round1Sid] || 'Jogador 1';
+        const p2Username = playersMapSIDToUsername[round2Sid] || 'Jogador 2';
 
         const p1Choice = data.player1_choice;
         const p2Choice = data.player2_choice;
 
+        const inRound = round1Sid === myCurrentSID || round2Sid === myCurrentSID;
+
         // Atualiza a exibição da escolha do oponente
-        if (data.player1_sid === myCurrentSID) {
+        if (round1Sid === myCurrentSID) {
             opponentChoiceDisplay.textContent = `Escolha do oponente: ${p2Choice ? p2Choice.toUpperCase() : 'N/A'}`;
-        } else {
+        } else if (inRound) {
             opponentChoiceDisplay.textContent = `Escolha do oponente: ${p1Choice ? p1Choice.toUpperCase() : 'N/A'}`;
         }
         
         let resultText = '';
-        if (data.winner_sid === 'draw') {
+        if (data.forfeit_sid === myCurrentSID) {
+            resultText = 'Seu tempo acabou: o oponente VENCEU a rodada!';
+        } else if (data.forfeit_sid && inRound) {
+            resultText = 'O oponente não escolheu a tempo: você VENCEU a rodada!';
+        } else if (data.winner_sid === 'draw') {
             resultText = 'Empate!';
         } else if (data.winner_sid === myCurrentSID) {
             resultText = 'Você VENCEU a rodada!';
@@ -149,13 +191,32 @@ document.addEventListener('DOMContentLoaded', () => {
         }
         
         // Mensagem de resultado mais bonita e concisa
-        let messageLine1 = `Rodada: ${p1Username} escolheu ${p1Choice.toUpperCase()}, ${p2Username} escolheu ${p2Choice.toUpperCase()}.`;
+        const choiceText = (choice) => choice ? choice.toUpperCase() : 'NADA (tempo esgotado)';
+        let messageLine1 = `Rodada: ${p1Username} escolheu ${choiceText(p1Choice)}, ${p2Username} escolheu ${choiceText(p2Choice)}.`;
         let messageLine2 = `Resultado: ${resultText}`;
         
         resultsDisplay.innerHTML = `${messageLine1}<br>${messageLine2}`; // Usa innerHTML para quebrar linha
         roundStatusDisplay.textContent = 'Rodada encerrada!';
 
-        scores = data.scores; // Atualiza o objeto de scores com o novo placar
+        if (data.scores) {
+            scores = data.scores; // Atualiza o objeto de scores com o novo placar
+        } else {
+            Object.entries(data.score_delta || {}).forEach(([sid, delta]) => {
+                scores[sid] = (scores[sid] || 0) + delta;
+            });
+        }
+        if (tournament && data.champion) {
+            // Fim da tabela: o torneio acabou.
+            player1Sid = null;
+            player2Sid = null;
+            gameActive = false;
+            const championText = data.champion === 'draw'
+                ? 'O torneio terminou empatado!'
+                : `Campeão do torneio: ${playerName(data.champion)}!`;
+            resultsDisplay.append(document.createElement('br'), championText);
+        } else if (tournament && data.next_duel) {
+            [player1Sid, player2Sid] = data.next_duel;
+        }
         updateScoresDisplay(); // Chama para atualizar o placar exibido
 
         resetBtn.style.display = 'block'; // Mostra o botão de reset após a rodada
@@ -169,17 +230,63 @@ document.addEventListener('DOMContentLoaded', () => {
     // Recebe o evento de reset do jogo
     socket.on('rps_reset', (data) => {
         console.log('[RPS] rps_reset event received.');
+        window.resetSeq(data.seq);
         playersMapSIDToUsername = data.usernames;
         scores = data.initial_state.scores;
         player1Sid = data.initial_state.player1_sid; // Garante que SIDs estejam atualizados
         player2Sid = data.initial_state.player2_sid;
+        tournament = Boolean(data.initial_state.tournament);
         gameActive = true; // Reinicia como ativo
         updateScoresDisplay();
         resetRoundDisplay();
         console.log('[RPS] Game reset. Ready for new rounds.');
     });
 
+    socket.on('state_snapshot', (data) => {
+        console.log('[RPS] state_snapshot event received.');
+        const state = data.state;
+        const myCurrentSID = window.getMySocketId();
+        playersMapSIDToUsername = data.usernames;
+        scores = state.scores;
+        player1Sid = state.player1_sid;
+        player2Sid = state.player2_sid;
+        tournament = Boolean(state.tournament);
+        // Um torneio sem duelo atual já terminou.
+        gameActive = !tournament || player1Sid !== null;
+        updateScoresDisplay();
+        resetRoundDisplay();
+        const mySavedChoice = !inCurrentDuel() ? null
+            : myCurrentSID === player1Sid ? state.player1_choice : state.player2_choice;
+        if (mySavedChoice) {
+            myChoice = mySavedChoice;
+            myChoiceDisplay.textContent = `Sua escolha: ${mySavedChoice.toUpperCase()}`;
+            roundStatusDisplay.textContent = 'Escolha enviada! Aguardando oponente...';
+            enableChoices(false);
+        }
+    });
+
+    // Quem entra no meio do torneio ganha duelos contra todos, no fim da tabela.
+    socket.on('player_joined', (data) => {
+        if (!tournament || !gameActive) {
+            return;
+        }
+        playersMapSIDToUsername[data.player_sid] = data.username;
+        if (scores[data.player_sid] === undefined) {
+            scores[data.player_sid] = 0;
+        }
+        updateScoresDisplay();
+    });
+
     function updateScoresDisplay() {
+        if (tournament) {
+            const standings = Object.entries(scores)
+                .sort((a, b) => b[1] - a[1])
+                .map(([sid, points]) => `${playerName(sid)}: ${points}`)
+                .join(' | ');
+            const duel = player1Sid ? ` — Duelo: ${playerName(player1Sid)} x ${playerName(player2Sid)}` : '';
+            gameInfo.textContent = `Torneio: ${standings}${duel}`;
+            return;
+        }
         // Usa player1Sid e player2Sid que foram armazenados na inicialização/reset do jogo
         const p1Username = playersMapSIDToUsername[player1Sid] || 'Jogador 1';
         const p2Username = playersMapSIDToUsername[player2Sid] || 'Jogador 2';
@@ -194,7 +301,7 @@ document.addEventListener('DOMContentLoaded', () => {
     socket.on('game_error', (data) => {
         alert(`Erro no jogo: ${data.message}`);
         console.error(`[RPS] Game Error: ${data.message}`);
-        if (gameActive) { // Só habilita se o jogo estiver supostamente ativo
+        if (gameActive && inCurrentDuel()) { // Só habilita se o jogo estiver supostamente ativo
             enableChoices(true); 
         }
     });
@@ -208,6 +315,7 @@ document.addEventListener('DOMContentLoaded', () => {
         gameActive = false;
         player1Sid = null;
         player2Sid = null;
+        tournament = false;
         resetRoundDisplay();
         gameInfo.textContent = 'Aguardando oponentes para começar o jogo...';
     };
@@ -10,6 +10,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const myRoleDisplay = document.getElementById('my-role');
     const wordSetterArea = document.getElementById('word-setter-area');
     const secretWordInput = document.getElementById('secret-word-input');
+    const phraseModeInput = document.getElementById('phrase-mode-input');
     const setWordBtn = document.getElementById('set-word-btn');
     const gamePlayArea = document.getElementById('game-play-area');
     const wordDisplay = document.getElementById('word-display');
@@ -29,6 +30,7 @@ document.addEventListener('DOMContentLoaded', () => {
     let playersMapSIDToUsername = {};
 
     let currentWordDisplay = '';
+    let revealedLetters = []; // Uma posição por caractere da palavra (modo delta)
     let guessedLetters = [];
     let wrongGuesses = 0;
     let maxWrongGuesses = 6;
@@ -96,7 +98,10 @@ document.addEventListener('DOMContentLoaded', () => {
 
     setWordBtn.addEventListener('click', () => {
         const currentRoomId = window.getCurrentRoomId();
-        const word = secretWordInput.value.trim().toUpperCase(); 
+        const phraseMode = phraseModeInput.checked;
+        const word = phraseMode
+            ? secretWordInput.value.trim().toUpperCase().split(/\s+/).join(' ')
+            : secretWordInput.value.trim().toUpperCase(); 
         const myCurrentSID = window.getMySocketId(); // Obtém mySID no momento do clique
 
         console.log('setWordBtn clicked. Word:', word, 'My current SID:', myCurrentSID);
@@ -125,14 +130,20 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
-        if (!word || !/^[A-Z]+$/.test(word) || word.length < 3) {
+        if (phraseMode) {
+            if (!/^[A-Z ]+$/.test(word) || word.replace(/ /g, '').length < 3) {
+                alert('A frase deve conter apenas letras (A-Z) e espaços, com no mínimo 3 letras.');
+                console.log('setWordBtn: Invalid phrase format.');
+                return;
+            }
+        } else if (!word || !/^[A-Z]+$/.test(word) || word.length < 3) {
             alert('A palavra deve conter apenas letras (A-Z) e ter no mínimo 3 caracteres.');
             console.log('setWordBtn: Invalid word format.');
             return;
         }
         
-        console.log('Emitting hangman_set_word:', { room_id: currentRoomId, word: word });
-        socket.emit('hangman_set_word', { room_id: currentRoomId, word: word });
+        console.log('Emitting hangman_set_word:', { room_id: currentRoomId, word: word, phrase: phraseMode });
+        socket.emit('hangman_set_word', { room_id: currentRoomId, word: word, phrase: phraseMode });
     });
 
     guessBtn.addEventListener('click', () => {
@@ -216,6 +227,10 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     socket.on('hangman_update_tcp', (data) => {
+        if (!window.acceptSeq(data.seq)) {
+            return;
+        }
+        revealedLetters = data.word_pattern.split('');
         currentWordDisplay = data.word_display;
         guessedLetters = data.guessed_letters;
         wrongGuesses = data.wrong_guesses;
@@ -227,10 +242,27 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     socket.on('hangman_update_udp', (data) => {
-        currentWordDisplay = data.word_display;
-        guessedLetters = data.guessed_letters;
+        if (!window.acceptSeq(data.seq)) {
+            return;
+        }
+        if (data.word_display !== undefined) {
+            currentWordDisplay = data.word_display;
+            guessedLetters = data.guessed_letters;
+        } else {
+            // Modo delta: revela a letra só nas posições informadas pelo servidor
+            data.positions.forEach((position) => {
+                revealedLetters[position] = data.last_guess_letter;
+            });
+            currentWordDisplay = revealedLetters.join(' ');
+            if (!guessedLetters.includes(data.last_guess_letter)) {
+                guessedLetters.push(data.last_guess_letter);
+            }
+        }
         wrongGuesses = data.wrong_guesses;
         gameOver = data.game_over;
+        if (data.guesser_sid) {
+            guesserSID = data.guesser_sid; // Salas com vários adivinhadores: a vez passou adiante
+        }
 
         if (data.last_guess_letter) {
             gameFeedback.textContent = `Chute de "${data.last_guess_letter}" foi ${data.last_guess_correct ? 'correto!' : 'errado!'}`;
@@ -243,7 +275,13 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    socket.on('player_joined', (data) => {
+        playersMapSIDToUsername[data.player_sid] = data.username;
+        updateDisplay();
+    });
+
     socket.on('hangman_reset', (data) => {
+        window.resetSeq(data.seq);
         setterSID = data.setter_sid;
         guesserSID = data.guesser_sid;
         playersMapSIDToUsername = data.usernames;
@@ -254,6 +292,22 @@ document.addEventListener('DOMContentLoaded', () => {
         gameFeedback.textContent = 'Jogo reiniciado! Papéis trocados.';
     });
 
+    socket.on('state_snapshot', (data) => {
+        const state = data.state;
+        setterSID = state.setter_sid;
+        guesserSID = state.guesser_sid;
+        playersMapSIDToUsername = data.usernames;
+        revealedLetters = state.word_pattern.split('');
+        currentWordDisplay = revealedLetters.join(' ');
+        guessedLetters = state.guessed_letters;
+        wrongGuesses = state.wrong_guesses;
+        gameOver = state.game_over;
+        wordIsSet = revealedLetters.length > 0;
+        updateDisplay();
+        resetGameBtn.style.display = gameOver ? 'block' : 'none';
+        console.log(`[state_snapshot] Event Received: Palavra: ${currentWordDisplay}, Erros: ${wrongGuesses}`);
+    });
+
     socket.on('game_error', (data) => {
         alert(`Erro no jogo: ${data.message}`);
         console.error(`[game_error] ${data.message}`);
@@ -268,6 +322,7 @@ document.addEventListener('DOMContentLoaded', () => {
         console.log('[resetGameUI] Resetting UI...');
         gameOver = false;
         currentWordDisplay = '_ _ _ _ _';
+        revealedLetters = [];
         guessedLetters = [];
         wrongGuesses = 0;
         secretWordInput.value = '';
@@ -294,6 +349,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
             setWordBtn.disabled = wordIsSet || gameOver; 
             secretWordInput.disabled = wordIsSet || gameOver;
+            phraseModeInput.disabled = wordIsSet || gameOver;
 
             if (!wordIsSet && !gameOver) {
                 gameInfo.textContent = 'Defina a palavra secreta para o jogo da Forca.';
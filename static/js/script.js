@@ -4,6 +4,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const usernameInput = document.getElementById('username-input');
     const roomIdInput = document.getElementById('room-id-input');
     const joinRoomBtn = document.getElementById('join-room-btn');
+    const cancelMatchmakingBtn = document.getElementById('cancel-matchmaking-btn');
+    const spectateBtn = document.getElementById('spectate-btn');
     const connectionStatus = document.getElementById('connection-status');
     const playersInRoomDisplay = document.getElementById('players-in-room');
     const mySidDisplay = document.getElementById('my-sid');
@@ -12,10 +14,20 @@ document.addEventListener('DOMContentLoaded', () => {
     const chatMessages = document.getElementById('chat-messages');
     const chatInput = document.getElementById('chat-input');
     const sendChatBtn = document.getElementById('send-chat-btn');
+    const roomList = document.getElementById('room-list');
+    const lobbyEmpty = document.getElementById('lobby-empty');
+    // Só existe nas páginas dos jogos em que o computador joga
+    const botOffer = document.getElementById('bot-offer');
+    const showBotOffer = (visible) => {
+        if (botOffer) {
+            botOffer.style.display = visible ? 'block' : 'none';
+        }
+    };
 
     let currentRoomId = null;
     let currentPlayersUsernames = []; 
     let playersSidsInOrder = []; 
+    let spectating = false;
 
     // Obter o gameId da URL
     const pathSegments = window.location.pathname.split('/');
@@ -29,6 +41,92 @@ document.addEventListener('DOMContentLoaded', () => {
     window.getMySocketId = () => socket.id; 
     window.getCurrentPlayersUsernames = () => currentPlayersUsernames;
     window.getPlayersSidsInOrder = () => playersSidsInOrder;
+    window.isSpectator = () => spectating;
+
+    // Sessão da sala guardada na aba: se a conexão cair (ou a página for
+    // recarregada), o token permite voltar ao mesmo lugar na partida.
+    const sessionKey = `netplay-session-${gameId}`;
+    const saveSession = (roomId, token) => {
+        sessionStorage.setItem(sessionKey, JSON.stringify({ room_id: roomId, token: token }));
+    };
+    const clearSession = () => sessionStorage.removeItem(sessionKey);
+
+    // Controle da sequência de atualizações da sala. Em modo delta o servidor
+    // só manda o que mudou; se faltar alguma atualização pedimos o estado completo.
+    let lastSeq = 0;
+    let resyncPending = false;
+    window.resetSeq = (seq) => {
+        lastSeq = seq || 0;
+        resyncPending = false;
+    };
+    window.acceptSeq = (seq) => {
+        if (typeof seq !== 'number') {
+            return true;
+        }
+        if (resyncPending || seq <= lastSeq) {
+            return false; // Aguardando snapshot ou atualização repetida
+        }
+        if (seq !== lastSeq + 1) {
+            console.warn(`[script.js] Gap in updates (expected ${lastSeq + 1}, got ${seq}). Requesting resync.`);
+            resyncPending = true;
+            socket.emit('resync', { room_id: currentRoomId });
+            return false;
+        }
+        lastSeq = seq;
+        return true;
+    };
+
+    // Lobby: primeira página das salas abertas deste jogo, atualizada pelos diffs do servidor
+    const lobbyRooms = new Map();
+    let lobbyPageSize = 0;
+    let lobbyTotal = 0;
+    const statusLabels = { waiting: 'aguardando oponente', playing: 'em jogo', finished: 'partida encerrada' };
+    const renderLobby = () => {
+        roomList.innerHTML = '';
+        lobbyRooms.forEach((room) => {
+            const item = document.createElement('li');
+            item.textContent = `${room.room_id} · ${room.players}/${room.max_players} (${room.usernames.join(', ') || '—'}) · ${statusLabels[room.status] || room.status}`;
+            // Clicar preenche o ID da sala para entrar
+            item.addEventListener('click', () => {
+                roomIdInput.value = room.room_id;
+            });
+            roomList.appendChild(item);
+        });
+        lobbyEmpty.style.display = lobbyRooms.size ? 'none' : 'block';
+    };
+    const subscribeLobby = () => socket.emit('lobby_subscribe', { gameId: gameId });
+    const unsubscribeLobby = () => {
+        socket.emit('lobby_unsubscribe', { gameId: gameId });
+        lobbyRooms.clear();
+    };
+
+    socket.on('lobby_snapshot', (data) => {
+        lobbyRooms.clear();
+        lobbyPageSize = data.limit;
+        lobbyTotal = data.total;
+        data.rooms.forEach((room) => lobbyRooms.set(room.room_id, room));
+        renderLobby();
+    });
+
+    socket.on('lobby_update', (data) => {
+        if (currentRoomId) {
+            return;
+        }
+        lobbyTotal = data.total;
+        data.removed.forEach((roomId) => lobbyRooms.delete(roomId));
+        // Salas novas só entram enquanto houver espaço na página
+        data.updated.forEach((room) => {
+            if (lobbyRooms.has(room.room_id) || lobbyRooms.size < lobbyPageSize) {
+                lobbyRooms.set(room.room_id, room);
+            }
+        });
+        // Saíram salas da página e o servidor tem outras: pede a página de novo
+        if (lobbyRooms.size < Math.min(lobbyPageSize, lobbyTotal)) {
+            subscribeLobby();
+            return;
+        }
+        renderLobby();
+    });
 
     joinRoomBtn.addEventListener('click', () => {
         const username = usernameInput.value.trim();
@@ -41,6 +139,32 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    // Assistir exige o ID de uma sala existente; o espectador não joga nem conversa
+    spectateBtn.addEventListener('click', () => {
+        const username = usernameInput.value.trim();
+        const roomId = roomIdInput.value.trim();
+
+        if (username && roomId) {
+            socket.emit('spectate_room', { gameId: gameId, username: username, room_id: roomId });
+        } else {
+            alert('Informe seu nome de usuário e o ID da sala que deseja assistir.');
+        }
+    });
+
+    if (botOffer) {
+        document.getElementById('add-bot-btn').addEventListener('click', () => {
+            if (currentRoomId) {
+                socket.emit('add_bot', { room_id: currentRoomId });
+                showBotOffer(false);
+            }
+        });
+    }
+
+    // Sem ID de sala o servidor coloca o jogador na fila de matchmaking
+    cancelMatchmakingBtn.addEventListener('click', () => {
+        socket.emit('cancel_matchmaking', {});
+    });
+
     sendChatBtn.addEventListener('click', () => {
         const message = chatInput.value.trim();
         if (message && currentRoomId) {
@@ -63,6 +187,40 @@ document.addEventListener('DOMContentLoaded', () => {
         if (typeof window.resetGameSpecific === 'function') {
             window.resetGameSpecific(); 
         }
+
+        const savedSession = sessionStorage.getItem(sessionKey);
+        if (savedSession) {
+            connectionStatus.textContent = 'Status: Reconectando à partida...';
+            socket.emit('resume_session', JSON.parse(savedSession));
+        } else if (!currentRoomId) {
+            subscribeLobby();
+        }
+    });
+
+    socket.on('session_resumed', (data) => {
+        unsubscribeLobby();
+        saveSession(data.room_id, data.resume_token);
+        currentRoomId = data.room_id;
+        currentPlayersUsernames = data.current_players;
+        playersSidsInOrder = data.players_sids || [];
+        mySidDisplay.textContent = `Seu ID de Conexão (SID): ${socket.id}`;
+        connectionStatus.textContent = `Status: Reconectado à sala ${currentRoomId} como ${data.username}.`;
+        playersInRoomDisplay.textContent = `Jogadores na sala: ${data.players_in_room} (${data.current_players.join(', ')})`;
+        document.getElementById('connection-setup').style.display = 'none';
+        chatArea.style.display = 'block';
+        gameArea.style.display = 'block';
+        console.log(`[script.js] Session resumed in room ${currentRoomId}.`);
+    });
+
+    socket.on('resume_failed', (data) => {
+        clearSession();
+        if (currentRoomId) {
+            returnToSetup(data.message);
+        } else {
+            connectionStatus.textContent = 'Status: Conectado ao servidor.';
+            subscribeLobby();
+        }
+        console.log(`[script.js] Session resume failed: ${data.message}`);
     });
 
     socket.on('error', (data) => {
@@ -71,8 +229,27 @@ document.addEventListener('DOMContentLoaded', () => {
         console.error(`[script.js] Server error: ${data.message}`);
     });
 
+    socket.on('matchmaking_queued', (data) => {
+        connectionStatus.textContent = 'Status: Procurando um oponente...';
+        joinRoomBtn.disabled = true;
+        cancelMatchmakingBtn.style.display = 'inline-block';
+        console.log(`[script.js] Queued for matchmaking (${data.game_id}). Waiting: ${data.waiting}`);
+    });
+
+    socket.on('matchmaking_cancelled', () => {
+        connectionStatus.textContent = 'Status: Busca por oponente cancelada.';
+        joinRoomBtn.disabled = false;
+        cancelMatchmakingBtn.style.display = 'none';
+        console.log('[script.js] Matchmaking cancelled.');
+    });
+
     socket.on('room_joined', (data) => {
+        joinRoomBtn.disabled = false;
+        cancelMatchmakingBtn.style.display = 'none';
+        unsubscribeLobby();
         currentRoomId = data.room_id;
+        saveSession(data.room_id, data.resume_token);
+        window.resetSeq(0);
         currentPlayersUsernames = data.current_players;
         playersSidsInOrder = data.players_sids || []; 
         connectionStatus.textContent = `Status: Conectado à sala ${currentRoomId} como ${data.username}.`;
@@ -86,10 +263,11 @@ document.addEventListener('DOMContentLoaded', () => {
         chatMessages.appendChild(messageElement);
         chatMessages.scrollTop = chatMessages.scrollHeight;
 
-        if (data.players_in_room === 2) {
+        if (data.players_in_room >= (data.min_players || 2)) {
              gameArea.style.display = 'block';
         } else {
              gameArea.style.display = 'none'; 
+             showBotOffer(true);
              const waitingMessageElement = document.createElement('p');
              waitingMessageElement.className = 'chat-message system-message';
              waitingMessageElement.innerHTML = '<em>Aguardando outro jogador para iniciar o jogo...</em>';
@@ -99,7 +277,28 @@ document.addEventListener('DOMContentLoaded', () => {
         console.log(`[script.js] Room joined: ${currentRoomId}, Players: ${data.players_in_room}`);
     });
 
+    socket.on('spectate_joined', (data) => {
+        unsubscribeLobby();
+        spectating = true;
+        document.body.classList.add('spectating');
+        currentRoomId = data.room_id;
+        currentPlayersUsernames = data.current_players;
+        connectionStatus.textContent = `Status: Assistindo à sala ${currentRoomId} como ${data.username}.`;
+        playersInRoomDisplay.textContent = `Jogadores na sala: ${data.players_in_room} (${data.current_players.join(', ')}) · Espectadores: ${data.spectators}`;
+        document.getElementById('connection-setup').style.display = 'none';
+        chatArea.style.display = 'block';
+        gameArea.style.display = 'block';
+
+        const messageElement = document.createElement('p');
+        messageElement.className = 'chat-message system-message';
+        messageElement.innerHTML = '<em>Você está assistindo a esta sala.</em>';
+        chatMessages.appendChild(messageElement);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+        console.log(`[script.js] Spectating room ${currentRoomId}.`);
+    });
+
     socket.on('player_joined', (data) => {
+        showBotOffer(false);
         currentPlayersUsernames = data.current_players; 
         playersSidsInOrder = data.players_sids || []; 
         playersInRoomDisplay.textContent = `Jogadores na sala: ${data.players_in_room} (${currentPlayersUsernames.join(', ')})`;
@@ -118,12 +317,35 @@ document.addEventListener('DOMContentLoaded', () => {
         
         const messageElement = document.createElement('p');
         messageElement.className = 'chat-message system-message';
-        messageElement.innerHTML = `<em>${data.username} (${data.sid.substring(0, 5)}...) saiu da sala.</em>`;
+        if (data.reconnecting) {
+            messageElement.innerHTML = `<em>${data.username} perdeu a conexão. Aguardando a reconexão por até ${data.grace_period} segundos...</em>`;
+        } else {
+            messageElement.innerHTML = `<em>${data.username} (${data.sid.substring(0, 5)}...) saiu da sala.</em>`;
+        }
         chatMessages.appendChild(messageElement);
         chatMessages.scrollTop = chatMessages.scrollHeight;
         console.log(`[script.js] Player disconnected: ${data.username}`);
     });
 
+    socket.on('player_reconnected', (data) => {
+        playersSidsInOrder = playersSidsInOrder.map(sid => sid === data.old_sid ? data.sid : sid);
+        const messageElement = document.createElement('p');
+        messageElement.className = 'chat-message system-message';
+        messageElement.innerHTML = `<em>${data.username} reconectou.</em>`;
+        chatMessages.appendChild(messageElement);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+        console.log(`[script.js] Player reconnected: ${data.username}`);
+    });
+
+    socket.on('rate_limited', (data) => {
+        const messageElement = document.createElement('p');
+        messageElement.className = 'chat-message system-message';
+        messageElement.innerHTML = `<em>${data.message}</em>`;
+        chatMessages.appendChild(messageElement);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+        console.warn(`[script.js] Rate limited on ${data.event}, retry after ${data.retry_after}s.`);
+    });
+
     socket.on('new_chat_message', (data) => {
         const messageElement = document.createElement('p');
         messageElement.className = 'chat-message';
@@ -132,15 +354,27 @@ document.addEventListener('DOMContentLoaded', () => {
         chatMessages.scrollTop = chatMessages.scrollHeight;
     });
 
+    socket.on('state_snapshot', (data) => {
+        window.resetSeq(data.seq);
+        console.log(`[script.js] State snapshot received for room ${data.room_id} (seq ${data.seq}).`);
+    });
+
     socket.on('game_start', (data) => {
+        window.resetSeq(data.seq);
         gameArea.style.display = 'block'; 
+        if (spectating) {
+            connectionStatus.textContent = `Status: Assistindo à sala ${currentRoomId}. O jogo começou!`;
+            return;
+        }
         connectionStatus.textContent = `Status: Conectado à sala ${currentRoomId} como ${usernameInput.value}. O jogo começou!`;
         alert('O jogo vai começar!');
         console.log(`[script.js] Game started in room ${currentRoomId}.`);
     });
 
-    socket.on('game_ended_player_left', (data) => {
-        alert(data.message);
+    // Volta para a tela de entrada quando a sala deixa de existir no servidor.
+    const returnToSetup = (message) => {
+        alert(message);
+        clearSession();
         currentRoomId = null;
         gameArea.style.display = 'none';
         chatArea.style.display = 'none';
@@ -153,11 +387,39 @@ document.addEventListener('DOMContentLoaded', () => {
         chatMessages.innerHTML = ''; 
         currentPlayersUsernames = [];
         playersSidsInOrder = [];
-        console.log(`[script.js] Game ended due to player left in room ${data.room_id}.`);
+        spectating = false;
+        document.body.classList.remove('spectating');
+        showBotOffer(false);
+        subscribeLobby();
         
         if (typeof window.resetGameSpecific === 'function') {
             window.resetGameSpecific(); 
         }
+    };
+
+    socket.on('game_ended_player_left', (data) => {
+        returnToSetup(data.message);
+        console.log(`[script.js] Game ended due to player left in room ${data.room_id}.`);
+    });
+
+    socket.on('server_draining', (data) => {
+        // O servidor vai reiniciar: a reconexão é espalhada pela janela indicada
+        // para que os clientes não voltem todos ao mesmo tempo.
+        socket.io.reconnectionDelay(1000 + Math.random() * (data.reconnect_window_ms || 0));
+        connectionStatus.textContent = `Status: ${data.message}`;
+        if (currentRoomId) {
+            const messageElement = document.createElement('p');
+            messageElement.className = 'chat-message system-message';
+            messageElement.textContent = data.message;
+            chatMessages.appendChild(messageElement);
+            chatMessages.scrollTop = chatMessages.scrollHeight;
+        }
+        console.log('[script.js] Server is draining for a restart.');
+    });
+
+    socket.on('room_closed', (data) => {
+        returnToSetup(data.message);
+        console.log(`[script.js] Room ${data.room_id} closed by the server (${data.reason}).`);
     });
 
     console.log('[script.js] Script loaded. Waiting for socket connection.');
@@ -0,0 +1,192 @@
+import os
+
+import pytest
+
+# Antes do import: o app lê a configuração do ambiente ao carregar.
+os.environ.setdefault('LOG_LEVEL', 'warning')
+os.environ['RATE_LIMITS'] = 'off'
+os.environ['SOCKETIO_SERIALIZER'] = 'json'
+
+import app as game_app  # noqa: E402
+from engines import RPSEngine  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Liga a roda de temporizadores do app a um relógio falso; `clock.advance(s)` roda os ticks vencidos."""
+    clock = FakeClock()
+    timers = game_app.timers
+    monkeypatch.setattr(timers, 'clock', clock)
+    monkeypatch.setattr(timers, 'next_tick', None)
+    timers.catch_up()
+
+    def advance(seconds):
+        clock.now += seconds
+        timers.catch_up()
+    clock.advance = advance
+    return clock
+
+
+def connect():
+    return game_app.socketio.test_client(game_app.app)
+
+
+def received(client, name=None):
+    events = [(event['name'], event['args'][0] if event['args'] else None) for event in client.get_received()]
+    return events if name is None else [data for event, data in events if event == name]
+
+
+def join(client, game_id, room_id, username):
+    client.emit('create_or_join_room', {'gameId': game_id, 'username': username, 'roomId': room_id})
+    return received(client, 'room_joined')[0]
+
+
+def start_game(game_id, room_id):
+    first, second = connect(), connect()
+    joined = [join(first, game_id, room_id, 'ana'), join(second, game_id, room_id, 'bia')]
+    first.get_received()
+    return first, second, joined
+
+
+# --- Temporizadores do PPT e da reconexão ---
+
+def test_rps_round_times_out_in_favour_of_the_player_who_chose(clock):
+    first, second, joined = start_game('rock-paper-scissors', 'rps-timeout')
+    first.emit('rps_choice', {'room_id': 'rps-timeout', 'choice': 'pedra'})
+    clock.advance(0.05)
+    assert received(second, 'rps_player_ready')
+    assert game_app.timers.is_scheduled(('round', 'rps-timeout'))
+
+    clock.advance(game_app.GAME_ENGINES['rock-paper-scissors'].round_timeout - 1)
+    assert received(second, 'rps_round_result') == []
+
+    clock.advance(1.1)
+    result, = received(second, 'rps_round_result')
+    assert result['forfeit_sid'] == joined[1]['player_sid']
+    state = game_app.store.get_room('rps-timeout')['game_state']
+    assert (state.player1_score, state.player2_score, state.round_ready) == (1, 0, 0)
+    assert not game_app.timers.is_scheduled(('round', 'rps-timeout'))
+
+
+def test_rps_round_answered_in_time_cancels_the_deadline(clock):
+    first, second, _ = start_game('rock-paper-scissors', 'rps-in-time')
+    first.emit('rps_choice', {'room_id': 'rps-in-time', 'choice': 'pedra'})
+    clock.advance(1)
+    second.emit('rps_choice', {'room_id': 'rps-in-time', 'choice': 'papel'})
+    clock.advance(0.05)
+    result, = received(first, 'rps_round_result')
+    assert result.get('forfeit_sid') is None
+    assert not game_app.timers.is_scheduled(('round', 'rps-in-time'))
+    clock.advance(60)
+    assert received(first, 'rps_round_result') == []
+
+
+def test_held_seat_is_released_after_the_grace_period(clock):
+    first, second, joined = start_game('tic-tac-toe', 'seat-expires')
+    second_sid = joined[1]['player_sid']
+    second.disconnect()
+    assert game_app.timers.is_scheduled(('seat', 'seat-expires', second_sid))
+    assert second_sid in game_app.store.get_room('seat-expires')['players']
+
+    clock.advance(game_app.RECONNECT_GRACE_PERIOD - 1)
+    assert second_sid in game_app.store.get_room('seat-expires')['players']
+
+    clock.advance(1.1)
+    # Sem o mínimo de jogadores a partida acaba e a sala é apagada.
+    assert not game_app.store.room_exists('seat-expires')
+    assert received(first, 'game_ended_player_left')[0]['room_id'] == 'seat-expires'
+    assert not game_app.timers.is_scheduled(('seat', 'seat-expires', second_sid))
+
+
+def test_resume_cancels_the_seat_timer(clock):
+    first, second, joined = start_game('tic-tac-toe', 'seat-resumed')
+    second.disconnect()
+    returning = connect()
+    returning.emit('resume_session', {'room_id': 'seat-resumed', 'token': joined[1]['resume_token']})
+    assert received(returning, 'session_resumed')
+    assert not game_app.timers.is_scheduled(('seat', 'seat-resumed', joined[1]['player_sid']))
+
+    clock.advance(game_app.RECONNECT_GRACE_PERIOD + 1)
+    assert len(game_app.store.get_room('seat-resumed')['players']) == 2
+
+
+# --- Validação das mensagens dos clientes ---
+
+@pytest.mark.parametrize('event, payload', [
+    ('create_or_join_room', {'gameId': 'tic-tac-toe', 'roomId': 'name-check'}),
+    ('quick_play', {'gameId': 'tic-tac-toe'}),
+])
+@pytest.mark.parametrize('username', [None, '', '   ', 123, True, ['ana'], {'nome': 'ana'}])
+def test_invalid_usernames_are_rejected(event, payload, username):
+    client = connect()
+    client.emit(event, dict(payload, username=username))
+    assert received(client) == [('error', {'message': 'Por favor, insira um nome de usuário.'})]
+    assert game_app.store.get_user(game_app.socketio.server.manager.sid_from_eio_sid(client.eio_sid, '/')) is None
+
+
+@pytest.mark.parametrize('cell_index', [True, False, '4', 4.0, -1, 9, None])
+def test_invalid_cells_are_refused_without_touching_the_board(cell_index):
+    room_id = f'cell-check-{cell_index!r}'
+    first, second, joined = start_game('tic-tac-toe', room_id)
+    state = game_app.store.get_room(room_id)['game_state']
+    mover = first if state.current_turn == joined[0]['player_sid'] else second
+    mover.get_received()
+    mover.emit('tic_tac_toe_move', {'room_id': room_id, 'cell_index': cell_index})
+    assert received(mover) == [('game_error', {'message': 'Célula inválida!'})]
+    assert game_app.store.get_room(room_id)['game_state'].moves_count == 0
+
+
+# --- Entrada nas salas ---
+
+def test_join_by_code_and_quick_play_send_the_same_room_joined_payload():
+    by_code = start_game('hangman', 'payload-check')[2]
+    paired = []
+    for username in ('caio', 'duda'):
+        client = connect()
+        client.emit('quick_play', {'gameId': 'hangman', 'username': username, 'bucket': 'payload-check'})
+        paired.append(client)
+    paired = [received(client, 'room_joined')[0] for client in paired]
+
+    engine = game_app.GAME_ENGINES['hangman']
+    for payload in by_code + paired:
+        assert set(payload) == {'room_id', 'players_in_room', 'player_sid', 'username', 'current_players',
+                                'resume_token', 'min_players', 'max_players'}
+        assert (payload['min_players'], payload['max_players']) == (engine.min_players, engine.max_players)
+    assert paired[0]['room_id'] == paired[1]['room_id'] and paired[1]['current_players'] == ['caio', 'duda']
+
+
+def test_rps_tournament_room(clock, monkeypatch):
+    monkeypatch.setitem(game_app.GAME_ENGINES, 'rock-paper-scissors', RPSEngine(max_players=3, round_timeout=15))
+    first, second, joined = start_game('rock-paper-scissors', 'rps-cup')
+    third = connect()
+    third.emit('create_or_join_room', {'gameId': 'rock-paper-scissors', 'username': 'caio', 'roomId': 'rps-cup'})
+    events = dict(received(third))
+    sids = [payload['player_sid'] for payload in joined] + [events['room_joined']['player_sid']]
+    clients = dict(zip(sids, (first, second, third)))
+    # Quem chega no meio entra na tabela.
+    assert events['state_snapshot']['state']['tournament'] and set(events['state_snapshot']['state']['scores']) == set(sids)
+
+    third.emit('rps_choice', {'room_id': 'rps-cup', 'choice': 'pedra'})
+    assert received(third, 'game_error') == [{'message': 'Aguarde o seu duelo no torneio.'}]
+
+    queued = len(game_app.match_history.queue)
+    duel, results = sids[:2], []
+    while duel:
+        clients[duel[0]].emit('rps_choice', {'room_id': 'rps-cup', 'choice': 'papel'})
+        clients[duel[1]].emit('rps_choice', {'room_id': 'rps-cup', 'choice': 'pedra'})
+        clock.advance(0.05)
+        result = received(third, 'rps_round_result')[-1]
+        results.append(result['winner_sid'])
+        duel = result['next_duel']
+    # Três duelos, e o campeão vai ao histórico como uma partida da sala inteira.
+    assert results == [sids[0], sids[0], sids[1]] and result['champion'] == sids[0]
+    assert len(game_app.match_history.queue) == queued + 1
+    assert sorted(result for _, result in game_app.match_history.queue[-1][3]) == ['loss', 'loss', 'win']
@@ -0,0 +1,152 @@
+import random
+
+import pytest
+
+from bots import HangmanBot, HangmanGuesser, HangmanWordIndex, TicTacToeBook, TicTacToeBot, segment_shape
+from games import TIC_TAC_TOE_FULL_BOARD, HangmanState, TicTacToeState, check_tic_tac_toe_winner
+
+
+@pytest.fixture(scope='module')
+def book():
+    return TicTacToeBook()
+
+
+def bot_results(book, x_bits, o_bits, bot_is_x):
+    """Resultados de todas as partidas a partir da posição: o bot joga pelo livro, o oponente tenta tudo."""
+    if check_tic_tac_toe_winner(x_bits):
+        return {'X'}
+    if check_tic_tac_toe_winner(o_bits):
+        return {'O'}
+    occupied = x_bits | o_bits
+    if occupied == TIC_TAC_TOE_FULL_BOARD:
+        return {'draw'}
+    x_to_move = x_bits.bit_count() == o_bits.bit_count()
+    if x_to_move == bot_is_x:
+        cell = book.best_move(x_bits, o_bits)
+        assert cell is not None and not occupied & (1 << cell)
+        cells = [cell]
+    else:
+        cells = [cell for cell in range(9) if not occupied & (1 << cell)]
+    results = set()
+    for cell in cells:
+        bit = 1 << cell
+        results |= bot_results(book, x_bits | bit, o_bits, bot_is_x) if x_to_move else \
+            bot_results(book, x_bits, o_bits | bit, bot_is_x)
+    return results
+
+
+@pytest.mark.parametrize('bot_is_x, bot_mark, opponent_mark', [(True, 'X', 'O'), (False, 'O', 'X')])
+def test_tic_tac_toe_book_never_loses(book, bot_is_x, bot_mark, opponent_mark):
+    results = bot_results(book, 0, 0, bot_is_x)
+    assert opponent_mark not in results
+    # Contra todos os oponentes possíveis o bot às vezes vence.
+    assert bot_mark in results and 'draw' in results
+
+
+def test_tic_tac_toe_book_takes_wins_and_blocks(book):
+    # X em 0 e 1, O em 3 e 4, vez do X: fecha a linha em 2.
+    assert book.best_move(0b11, 0b11000) == 2
+    # X em 0 e 1, O em 4, vez do O: bloqueia em 2.
+    assert book.best_move(0b11, 1 << 4) == 2
+    assert book.best_move(0, 0) == 4
+    assert len(book) > 4000
+
+
+def test_tic_tac_toe_bot_plays_itself_to_a_draw(book):
+    bot = TicTacToeBot(book)
+    state = TicTacToeState()
+    for turn in range(9):
+        event, data = bot.next_move('r', state)
+        assert event == 'tic_tac_toe_move'
+        assert not state.place(data['cell_index'], 'X' if turn % 2 == 0 else 'O')
+    assert state.is_full()
+
+
+WORDS = ['casa', 'CASO', 'cama', 'mala', 'rato', 'gato', 'pato', 'sol', 'AZUL', 'ab', 'são', 'x1z', 'arara']
+
+
+@pytest.fixture
+def index():
+    return HangmanWordIndex(WORDS)
+
+
+def test_word_index_filters_and_indexes(index):
+    # Menos de 3 letras, acentos e dígitos ficam de fora.
+    assert index.words == ['ARARA', 'AZUL', 'CAMA', 'CASA', 'CASO', 'GATO', 'MALA', 'PATO', 'RATO', 'SOL']
+    assert len(index) == 10
+    ids = {word: word_id for word_id, word in enumerate(index.words)}
+    assert index.by_length[4] == {ids[word] for word in ('AZUL', 'CAMA', 'CASA', 'CASO', 'GATO', 'MALA', 'PATO', 'RATO')}
+    # A em 1 e 3 (0b1010) só em CAMA, CASA e MALA; máscara 0 = palavras sem a letra.
+    assert index.index[(4, 'A', 0b1010)] == {ids['CAMA'], ids['CASA'], ids['MALA']}
+    assert index.index[(4, 'O', 0)] == {ids[word] for word in ('AZUL', 'CAMA', 'CASA', 'MALA')}
+    assert index.index[(5, 'R', 0b1010)] == {ids['ARARA']}
+    assert index.fallback_order[0] == 'A' and sorted(index.fallback_order) == [chr(code) for code in range(65, 91)]
+    assert index.random_word(random.Random(1)) in index.words
+
+
+def test_word_index_from_file_skips_comments(tmp_path):
+    wordlist = tmp_path / 'palavras.txt'
+    wordlist.write_text('# comentário\ncasa\n\n  gato  \n', encoding='utf-8')
+    assert HangmanWordIndex.from_file(wordlist).words == ['CASA', 'GATO']
+
+
+@pytest.mark.parametrize('pattern, shape', [
+    ('____', [(0, 4)]),
+    ('_A__ ___', [(0, 4), (5, 3)]),
+    ('__ _ ___', [(0, 2), (3, 1), (5, 3)]),
+])
+def test_segment_shape(pattern, shape):
+    assert segment_shape(pattern) == shape
+
+
+def test_guesser_narrows_candidates(index):
+    state = HangmanState()
+    state.set_word('GATO SOL')
+    guesser = HangmanGuesser(index, state.word_pattern)
+    assert [len(candidates) for _, _, candidates in guesser.segments] == [8, 1]
+
+    state.guess('A')
+    state.guess('T')
+    guesser.sync(state.word_pattern, state.guessed_letters)
+    first = {index.words[word_id] for word_id in guesser.segments[0][2]}
+    assert first == {'GATO', 'PATO', 'RATO'}
+    # Só resta decidir a primeira letra; O e S/L valem mais por aparecerem em todos os candidatos.
+    guess = guesser.next_guess(state.guessed_mask)
+    assert guess in ('L', 'O', 'S')
+    assert guesser.matches(state.word_pattern, state.guessed_letters)
+    assert not guesser.matches('____', state.guessed_letters)
+
+
+def test_guesser_falls_back_to_letter_frequency(index):
+    state = HangmanState()
+    state.set_word('QUIZ')
+    state.guess('Q')
+    guesser = HangmanGuesser(index, state.word_pattern)
+    guesser.sync(state.word_pattern, state.guessed_letters)
+    # Nenhuma palavra conhecida começa com Q: chuta a letra mais comum ainda não tentada.
+    assert not guesser.segments[0][2]
+    assert guesser.next_guess(state.guessed_mask) == 'A'
+
+
+def test_hangman_bot_sets_words_and_solves(index):
+    bot = HangmanBot(index)
+    state = HangmanState()
+    event, data = bot.next_move('r', state)
+    assert event == 'hangman_set_word' and data['word'] in index.words
+
+    state.set_word('CASO')
+    for _ in range(26):
+        event, data = bot.next_move('r', state)
+        assert event == 'hangman_guess_udp' and not state.is_guessed(data['letter'])
+        state.guess(data['letter'])
+        if state.is_solved():
+            break
+    assert state.is_solved() and state.wrong_guesses <= 2
+    assert 'r' in bot.guessers
+
+    # Nova palavra na mesma sala: o adivinhador antigo é descartado.
+    state.set_word('AZUL')
+    bot.next_move('r', state)
+    assert bot.guessers['r'].shape == [(0, 4)] and not bot.guessers['r'].applied - set(state.guessed_letters)
+    bot.forget('r')
+    assert 'r' not in bot.guessers
@@ -0,0 +1,217 @@
+import pytest
+
+from engines import GameEngine, HangmanEngine, InvalidMove, RPSEngine, TicTacToeEngine, create_engines
+from games import RPSChoice, RPSState, load_state, round_robin_pairs
+
+
+def test_registry_by_game_id_with_options():
+    engines = create_engines({'hangman': {'max_players': 4}, 'rock-paper-scissors': {'round_timeout': 3}})
+    assert {game_id: type(engine) for game_id, engine in engines.items()} == {
+        'tic-tac-toe': TicTacToeEngine, 'rock-paper-scissors': RPSEngine, 'hangman': HangmanEngine}
+    assert engines['hangman'].max_players == 4 and engines['tic-tac-toe'].max_players == 2
+    assert engines['rock-paper-scissors'].round_timeout == 3 and engines['tic-tac-toe'].round_timeout is None
+    # Menos lugares que o mínimo não fazem sentido: vale o mínimo.
+    assert create_engines({'hangman': {'max_players': 1}})['hangman'].max_players == 2
+    for engine in engines.values():
+        assert engine.move_events and engine.reset_event and engine.reset_broadcast and engine.template
+
+
+def test_base_engine_hooks_default_to_no_rounds():
+    engine = GameEngine()
+    with pytest.raises(NotImplementedError):
+        engine.validate_move(None, 'a', 'move', {})
+    assert engine.reveal_round(None) is None and engine.expire_round(None) is None
+    assert engine.series_result(None) is None and engine.turn_of(None) is None
+    assert engine.player_joined('state', ['a'], 'a') == 'state' and engine.player_left('state', ['a'], 'b') == 'state'
+
+
+# --- Jogo da Velha ---
+
+def test_tic_tac_toe_moves_turns_and_win():
+    engine = TicTacToeEngine()
+    state = engine.init(['a', 'b'])
+    assert engine.turn_of(state) == 'a'
+    with pytest.raises(InvalidMove, match='sua vez'):
+        engine.validate_move(state, 'b', 'tic_tac_toe_move', {'cell_index': 0})
+    for sid, cell in (('a', 0), ('b', 3), ('a', 1), ('b', 4)):
+        result = engine.apply_move(state, sid, 'tic_tac_toe_move',
+                                   engine.validate_move(state, sid, 'tic_tac_toe_move', {'cell_index': cell}), ['a', 'b'])
+        assert result.winner is None and result.update['current_turn'] == ('b' if sid == 'a' else 'a')
+    with pytest.raises(InvalidMove, match='ocupada'):
+        engine.validate_move(state, 'a', 'tic_tac_toe_move', {'cell_index': 4})
+    result = engine.apply_move(state, 'a', 'tic_tac_toe_move', 2, ['a', 'b'])
+    assert (result.event, result.winner, result.update['current_turn']) == ('tic_tac_toe_update', 'a', None)
+    assert result.full['board'][:3] == ['X', 'X', 'X'] and result.details == {'moves': 5}
+    with pytest.raises(InvalidMove, match='acabou'):
+        engine.validate_move(state, 'b', 'tic_tac_toe_move', {'cell_index': 8})
+    # A nova partida começa com o outro jogador.
+    assert engine.reset(['a', 'b'], state).current_turn == 'b'
+
+
+# --- Pedra, Papel e Tesoura: dois jogadores ---
+
+def choose(engine, state, sid, choice, players):
+    move = engine.validate_move(state, sid, 'rps_choice', {'choice': choice})
+    return engine.apply_move(state, sid, 'rps_choice', move, players)
+
+
+def test_rps_round_is_revealed_on_the_tick():
+    engine = RPSEngine()
+    state = engine.init(['a', 'b'])
+    assert engine.reveal_round(state) is None
+    assert choose(engine, state, 'a', 'pedra', ['a', 'b']).opens_round
+    with pytest.raises(InvalidMove, match='já fez'):
+        engine.validate_move(state, 'a', 'rps_choice', {'choice': 'papel'})
+    assert engine.serialize(state, 'b')['player1_choice'] == 'oculta'
+    assert engine.serialize(state, 'a')['player1_choice'] == 'pedra'
+    ready = engine.reveal_round(state)
+    assert (ready.event, ready.update) == ('rps_player_ready', {'player_sid': 'a', 'choice_made': True})
+    assert engine.in_progress(state)
+
+    assert not choose(engine, state, 'b', 'papel', ['a', 'b']).opens_round
+    result = engine.reveal_round(state)
+    assert result.round_over and result.update['winner_sid'] == 'b'
+    assert result.delta == {'score_delta': {'b': 1}} and result.full['scores'] == {'a': 0, 'b': 1}
+    assert result.winner is None and 'next_duel' not in result.update
+    assert not engine.in_progress(state) and engine.reveal_round(state) is None
+    assert engine.series_result(state) == ('b', {'scores': [0, 1]})
+
+
+def test_rps_expired_round_goes_to_who_chose():
+    engine = RPSEngine(round_timeout=5)
+    state = engine.init(['a', 'b'])
+    assert engine.expire_round(state) is None
+    choose(engine, state, 'b', 'tesoura', ['a', 'b'])
+    result = engine.expire_round(state)
+    assert result.update['winner_sid'] == 'b' and result.update['forfeit_sid'] == 'a'
+    assert result.update['player1_choice'] is None and state.round_ready == 0
+    assert engine.expire_round(state) is None
+
+
+def test_rps_outsider_cannot_choose():
+    engine = RPSEngine()
+    state = engine.init(['a', 'b'])
+    with pytest.raises(InvalidMove, match='não é um jogador'):
+        engine.validate_move(state, 'c', 'rps_choice', {'choice': 'pedra'})
+
+
+# --- Pedra, Papel e Tesoura: torneio ---
+
+def play_duel(engine, state, winner_choice='papel', loser_choice='pedra'):
+    """O player1 do duelo atual vence; retorna o MoveResult da rodada."""
+    players = list(state.standings)
+    choose(engine, state, state.player1_sid, winner_choice, players)
+    choose(engine, state, state.player2_sid, loser_choice, players)
+    return engine.reveal_round(state)
+
+
+@pytest.mark.parametrize('count', [2, 3, 4, 5, 6])
+def test_round_robin_pairs_every_player_once(count):
+    players = [f'p{index}' for index in range(count)]
+    pairs = round_robin_pairs(players)
+    assert sorted(tuple(sorted(pair)) for pair in pairs) == sorted(
+        (a, b) for index, a in enumerate(players) for b in players[index + 1:])
+
+
+def test_tournament_plays_every_duel_and_crowns_a_champion():
+    engine = RPSEngine(max_players=4)
+    state = engine.init(['a', 'b', 'c'])
+    assert state.tournament and state.scores == {'a': 0, 'b': 0, 'c': 0}
+    assert not engine.in_progress(state)
+    assert (state.player1_sid, state.player2_sid) == ('b', 'c')
+    with pytest.raises(InvalidMove, match='Aguarde'):
+        engine.validate_move(state, 'a', 'rps_choice', {'choice': 'pedra'})
+
+    # Empate não decide o duelo: os mesmos dois jogam de novo.
+    duel = [state.player1_sid, state.player2_sid]
+    result = play_duel(engine, state, 'pedra', 'pedra')
+    assert result.update['next_duel'] == duel and result.winner is None
+
+    winners = []
+    for _ in range(3):
+        winners.append(state.player1_sid)
+        result = play_duel(engine, state)
+        assert result.update['winner_sid'] == winners[-1] and result.full['player1_sid'] == winners[-1]
+    assert state.is_over() and not engine.in_progress(state)
+    assert result.update['next_duel'] is None and result.winner == result.update['champion']
+    # Tabela de três: b x c, a x c, a x b.
+    assert winners == ['b', 'a', 'a'] and state.scores == {'a': 2, 'b': 1, 'c': 0}
+    assert result.winner == 'a' and result.details == {'standings': {'a': 2, 'b': 1, 'c': 0}}
+    # Acabada a tabela nada mais vale até o reinício, que monta outra.
+    with pytest.raises(InvalidMove, match='torneio acabou'):
+        engine.validate_move(state, 'a', 'rps_choice', {'choice': 'pedra'})
+    assert engine.series_result(state) is None
+    assert not engine.reset(['a', 'b', 'c'], state).is_over()
+
+
+def test_tournament_expired_duel_and_late_joiner():
+    engine = RPSEngine(max_players=4)
+    state = engine.init(['a', 'b'])
+    assert len(state.schedule) == 0
+    state = engine.player_joined(state, ['a', 'b', 'c'], 'c')
+    assert state.schedule == [['a', 'c'], ['b', 'c']] and state.standings['c'] == 0
+
+    choose(engine, state, 'a', 'pedra', ['a', 'b', 'c'])
+    result = engine.expire_round(state)
+    assert result.update['forfeit_sid'] == 'b' and result.update['next_duel'] == ['a', 'c']
+    assert state.scores == {'a': 1, 'b': 0, 'c': 0}
+    assert engine.in_progress(state)
+
+
+def test_tournament_player_leaving_mid_duel():
+    engine = RPSEngine(max_players=4)
+    state = engine.init(['a', 'b', 'c', 'd'])
+    current = [state.player1_sid, state.player2_sid]
+    choose(engine, state, current[0], 'pedra', ['a', 'b', 'c', 'd'])
+    state = engine.player_left(state, ['a', 'b', 'c', 'd'], current[1])
+    # O duelo abandonado dá lugar ao próximo, e a tabela perde os duelos de quem saiu.
+    assert current[1] not in state.standings and state.round_ready == 0
+    assert all(current[1] not in pair for pair in state.schedule + [[state.player1_sid, state.player2_sid]])
+    assert len(state.schedule) == 2
+
+    # Saídas até esvaziar a tabela encerram o torneio sem campeão anunciado.
+    for sid in list(state.standings)[:2]:
+        state = engine.player_left(state, list(state.standings), sid)
+    assert state.is_over()
+
+
+def test_tournament_state_survives_dump_and_sid_swap():
+    engine = RPSEngine(max_players=3)
+    state = engine.init(['a', 'b', 'c'])
+    play_duel(engine, state)
+    loaded = load_state('rock-paper-scissors', state.dump())
+    assert (loaded.standings, loaded.schedule) == (state.standings, state.schedule)
+
+    loaded.replace_sid('c', 'c2')
+    assert 'c2' in loaded.standings and 'c' not in loaded.standings
+    assert all('c' not in pair for pair in loaded.schedule + [[loaded.player1_sid, loaded.player2_sid]])
+    # Estados gravados antes do torneio existir (seis campos) continuam carregando.
+    old = RPSState.load(['a', 'b', int(RPSChoice.PEDRA), None, 1, 0])
+    assert not old.tournament and old.player1_choice is RPSChoice.PEDRA and not old.is_over()
+
+
+# --- Forca ---
+
+def test_hangman_word_then_guesses_rotate_between_guessers():
+    engine = HangmanEngine(max_players=3)
+    players = ['s', 'g1', 'g2']
+    state = engine.init(players)
+    # Antes da palavra a vez é do definidor.
+    assert (state.setter_sid, state.guesser_sid, engine.turn_of(state)) == ('s', 'g1', 's')
+    with pytest.raises(InvalidMove):
+        engine.validate_move(state, 'g1', 'hangman_guess_udp', {'letter': 'A'})
+    move = engine.validate_move(state, 's', 'hangman_set_word', {'word': 'casa'})
+    engine.apply_move(state, 's', 'hangman_set_word', move, players)
+    assert engine.in_progress(state) and engine.turn_of(state) == 'g1'
+
+    result = engine.apply_move(state, 'g1', 'hangman_guess_udp',
+                               engine.validate_move(state, 'g1', 'hangman_guess_udp', {'letter': 'a'}), players)
+    assert result.event == 'hangman_update_udp' and result.winner is None
+    assert engine.turn_of(state) == 'g2'
+    with pytest.raises(InvalidMove):
+        engine.validate_move(state, 'g1', 'hangman_guess_udp', {'letter': 'C'})
+    for sid, letter in (('g2', 'C'), ('g1', 'S')):
+        result = engine.apply_move(state, sid, 'hangman_guess_udp', letter, players)
+    assert result.winner == 'g1' and result.details == {'word_length': 4, 'wrong_guesses': 0}
+    # O próximo a definir a palavra é o jogador seguinte ao definidor.
+    assert engine.reset(players, state).setter_sid == 'g1'
@@ -0,0 +1,77 @@
+import pytest
+from flask import Flask
+from flask_socketio import SocketIO, join_room
+from socketio import packet
+
+from fanout import PreEncodedPacket, fanout_emit
+
+
+@pytest.fixture
+def socketio():
+    app = Flask(__name__)
+    socketio = SocketIO(app, async_mode='threading')
+
+    @socketio.on('join')
+    def join(room):
+        join_room(room)
+
+    socketio.flask_app = app
+    return socketio
+
+
+def join(socketio, room):
+    client = socketio.test_client(socketio.flask_app)
+    client.emit('join', room)
+    client.get_received()
+    return client
+
+
+def test_packet_is_encoded_once_for_every_recipient(socketio):
+    clients = [join(socketio, 'spectators') for _ in range(3)]
+    outsider = join(socketio, 'other')
+    server = socketio.server
+    mock_send_packet = server._send_packet
+    sent = []
+
+    def send_packet(eio_sid, pkt):
+        sent.append(pkt)
+        mock_send_packet(eio_sid, pkt)
+    server._send_packet = send_packet
+
+    assert fanout_emit(server, 'update', {'n': 1}, 'spectators') == 3
+    # Um único pacote, já codificado, vai para as três conexões.
+    assert len({id(pkt) for pkt in sent}) == 1 and isinstance(sent[0], PreEncodedPacket)
+    assert sent[0]._encoded == packet.Packet(packet.EVENT, data=['update', {'n': 1}]).encode()
+    for client in clients:
+        assert client.get_received() == [{'name': 'update', 'args': [{'n': 1}], 'namespace': '/'}]
+    assert outsider.get_received() == []
+    assert fanout_emit(server, 'update', {}, 'empty') == 0
+
+
+class WithoutSendPacket:
+    """O mesmo servidor, como numa versão do python-socketio sem Server._send_packet."""
+
+    def __init__(self, server):
+        self.server = server
+
+    def __getattr__(self, name):
+        if name == '_send_packet':
+            raise AttributeError(name)
+        return getattr(self.server, name)
+
+
+def test_falls_back_to_emit_without_the_send_packet_hook(socketio, monkeypatch):
+    clients = [join(socketio, 'spectators') for _ in range(2)]
+    server = WithoutSendPacket(socketio.server)
+    emit = socketio.server.emit
+    emitted = []
+
+    def recording_emit(*args, **kwargs):
+        emitted.append((args, kwargs))
+        return emit(*args, **kwargs)
+    monkeypatch.setattr(socketio.server, 'emit', recording_emit)
+
+    assert fanout_emit(server, 'update', {'n': 1}, 'spectators') == 2
+    assert emitted == [(('update', {'n': 1}), {'to': 'spectators', 'namespace': '/'})]
+    for client in clients:
+        assert client.get_received() == [{'name': 'update', 'args': [{'n': 1}], 'namespace': '/'}]
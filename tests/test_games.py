@@ -0,0 +1,195 @@
+import json
+
+import pytest
+
+from engines import InvalidMove, create_engines
+from games import (RPS_OUTCOME, HangmanState, RPSChoice, RPSState, TicTacToeState, check_tic_tac_toe_winner,
+                   dump_state, letter_bit, load_state)
+
+
+def bits(*cells):
+    return sum(1 << cell for cell in cells)
+
+
+@pytest.mark.parametrize('cells, expected', [
+    ((0, 1, 2), True), ((3, 4, 5), True), ((6, 7, 8), True),
+    ((0, 3, 6), True), ((1, 4, 7), True), ((2, 5, 8), True),
+    ((0, 4, 8), True), ((2, 4, 6), True),
+    ((0, 1, 2, 4), True),
+    ((), False), ((0, 1), False), ((0, 1, 3), False), ((0, 4, 5, 7), False), ((1, 3, 5, 7), False),
+])
+def test_tic_tac_toe_winner(cells, expected):
+    assert check_tic_tac_toe_winner(bits(*cells)) is expected
+
+
+def test_tic_tac_toe_place_and_draw():
+    state = TicTacToeState()
+    state.assign_players('x', 'o')
+    # X O X / X O O / O X X: tabuleiro cheio sem linha.
+    moves = [(0, 'X'), (1, 'O'), (2, 'X'), (4, 'O'), (3, 'X'), (5, 'O'), (7, 'X'), (6, 'O'), (8, 'X')]
+    for cell, mark in moves:
+        assert not state.is_occupied(cell)
+        assert state.place(cell, mark) is False
+        assert state.is_occupied(cell)
+    assert state.is_full() and state.moves_count == 9
+    assert state.board == ['X', 'O', 'X', 'X', 'O', 'O', 'O', 'X', 'X']
+
+
+def test_tic_tac_toe_place_reports_win():
+    state = TicTacToeState()
+    assert not state.place(0, 'O') and not state.place(4, 'O')
+    assert state.place(8, 'O')
+    assert state.o_bits == bits(0, 4, 8) and state.x_bits == 0
+
+
+@pytest.mark.parametrize('choice1, choice2, outcome', [
+    (RPSChoice.PEDRA, RPSChoice.PEDRA, 0), (RPSChoice.PEDRA, RPSChoice.PAPEL, 2), (RPSChoice.PEDRA, RPSChoice.TESOURA, 1),
+    (RPSChoice.PAPEL, RPSChoice.PEDRA, 1), (RPSChoice.PAPEL, RPSChoice.PAPEL, 0), (RPSChoice.PAPEL, RPSChoice.TESOURA, 2),
+    (RPSChoice.TESOURA, RPSChoice.PEDRA, 2), (RPSChoice.TESOURA, RPSChoice.PAPEL, 1), (RPSChoice.TESOURA, RPSChoice.TESOURA, 0),
+])
+def test_rps_outcome(choice1, choice2, outcome):
+    assert RPS_OUTCOME[choice1][choice2] == outcome
+    state = RPSState()
+    state.assign_players('p1', 'p2')
+    state.set_choice(1, choice1)
+    state.set_choice(2, choice2)
+    assert state.round_ready == 2
+    assert state.resolve_round() == outcome
+    assert (state.player1_score, state.player2_score) == ((1, 0) if outcome == 1 else (0, 1) if outcome == 2 else (0, 0))
+
+
+def test_rps_forfeit_and_clear():
+    state = RPSState()
+    state.assign_players('p1', 'p2')
+    state.set_choice(2, RPSChoice.PAPEL)
+    assert state.forfeit(1) == 2 and state.scores == {'p1': 0, 'p2': 1}
+    state.clear_round()
+    assert state.round_ready == 0
+
+
+def json_round_trip(game_type, state):
+    return load_state(game_type, json.loads(json.dumps(dump_state(state))))
+
+
+def test_dump_load_round_trip():
+    ttt = TicTacToeState()
+    ttt.assign_players('x', 'o')
+    ttt.place(4, 'X')
+    ttt.current_turn = 'o'
+    assert json_round_trip('tic-tac-toe', ttt).to_dict() == ttt.to_dict()
+
+    rps = RPSState()
+    rps.assign_players('p1', 'p2')
+    rps.set_choice(1, RPSChoice.TESOURA)
+    rps.player2_score = 3
+    loaded = json_round_trip('rock-paper-scissors', rps)
+    # O JSON devolve inteiros; o load volta a RPSChoice.
+    assert loaded.player1_choice is RPSChoice.TESOURA and loaded.player2_choice is None
+    assert loaded.to_dict() == rps.to_dict()
+
+    hangman = HangmanState()
+    hangman.setter_sid, hangman.guesser_sid = 's', 'g'
+    hangman.set_word('BOA NOITE')
+    hangman.guess('O')
+    loaded = json_round_trip('hangman', hangman)
+    assert loaded.to_dict() == hangman.to_dict()
+    # O índice incremental também sobrevive: o próximo chute continua funcionando.
+    assert loaded.guess('T') == [7] and loaded.word_pattern == '_O_ _O_T_'
+
+    assert dump_state(None) is None and load_state('hangman', None) is None
+
+
+@pytest.mark.parametrize('letter, expected', [
+    ('A', 1), ('Z', 1 << 25), ('a', 0), ('', 0), ('AB', 0), ('1', 0), ('Ç', 0),
+])
+def test_letter_bit(letter, expected):
+    assert letter_bit(letter) == expected
+
+
+@pytest.fixture
+def engines():
+    return create_engines()
+
+
+@pytest.mark.parametrize('cell_index', [True, False, -1, 9, '4', 4.0, None])
+def test_tic_tac_toe_rejects_invalid_cells(engines, cell_index):
+    engine = engines['tic-tac-toe']
+    state = engine.init(['a', 'b'])
+    with pytest.raises(InvalidMove, match='Célula inválida'):
+        engine.validate_move(state, 'a', 'tic_tac_toe_move', {'cell_index': cell_index})
+
+
+@pytest.mark.parametrize('word', [None, 123, ['CASA'], {'w': 1}])
+def test_hangman_rejects_non_string_words(engines, word):
+    engine = engines['hangman']
+    state = engine.init(['s', 'g'])
+    with pytest.raises(InvalidMove, match='como texto'):
+        engine.validate_move(state, 's', 'hangman_set_word', {'word': word})
+
+
+@pytest.mark.parametrize('letter', [None, 1, ['A'], True, 'AB', '1', ''])
+def test_hangman_rejects_invalid_letters(engines, letter):
+    engine = engines['hangman']
+    state = engine.init(['s', 'g'])
+    state.set_word('CASA')
+    with pytest.raises(InvalidMove, match='apenas uma letra'):
+        engine.validate_move(state, 'g', 'hangman_guess_udp', {'letter': letter})
+
+
+@pytest.mark.parametrize('choice', [None, 1, ['pedra'], 'lagarto'])
+def test_rps_rejects_invalid_choices(engines, choice):
+    engine = engines['rock-paper-scissors']
+    state = engine.init(['a', 'b'])
+    with pytest.raises(InvalidMove, match='Escolha inválida'):
+        engine.validate_move(state, 'a', 'rps_choice', {'choice': choice})
+
+
+def test_hangman_phrase_index_with_repeated_letters():
+    state = HangmanState()
+    state.set_word('ARARA AZUL')
+    # Espaços já revelados; cada letra aponta para todas as suas posições.
+    assert state.word_pattern == '_____ ____'
+    assert state.hidden_count == 9
+    assert state.letter_positions['A'] == [0, 2, 4, 6]
+    assert state.letter_positions['R'] == [1, 3]
+
+    # (chute, posições reveladas, padrão, escondidas, erros)
+    steps = [
+        ('A', [0, 2, 4, 6], 'A_A_A A___', 5, 0),
+        ('E', [], 'A_A_A A___', 5, 1),
+        ('R', [1, 3], 'ARARA A___', 3, 1),
+        ('X', [], 'ARARA A___', 3, 2),
+        ('Z', [7], 'ARARA AZ__', 2, 2),
+        ('U', [8], 'ARARA AZU_', 1, 2),
+    ]
+    for letter, positions, pattern, hidden, wrong in steps:
+        assert state.guess(letter) == positions
+        assert (state.word_pattern, state.hidden_count, state.wrong_guesses) == (pattern, hidden, wrong)
+        assert state.is_guessed(letter)
+    assert not state.is_solved()
+    assert state.guess('L') == [9] and state.is_solved() and state.hidden_count == 0
+    assert state.word_display == 'A R A R A   A Z U L'
+    assert state.guessed_letters == ['A', 'E', 'L', 'R', 'U', 'X', 'Z']
+
+
+def test_hangman_repeated_guess_is_refused_before_touching_the_index(engines):
+    engine = engines['hangman']
+    state = engine.init(['s', 'g'])
+    state.set_word('BANANA')
+    state.guess('A')
+    state.guess('Q')
+    for letter in ('A', 'a ', 'Q'):
+        with pytest.raises(InvalidMove, match='já tentou'):
+            engine.validate_move(state, 'g', 'hangman_guess_udp', {'letter': letter})
+    # Recusados na validação: nada mudou no índice nem nos erros.
+    assert (state.word_pattern, state.hidden_count, state.wrong_guesses) == ('_A_A_A', 3, 1)
+
+
+def test_hangman_set_word_resets_the_index():
+    state = HangmanState()
+    state.set_word('CASA')
+    state.guess('A')
+    state.guess('Z')
+    state.set_word('OVO')
+    assert (state.word_pattern, state.hidden_count, state.wrong_guesses, state.guessed_mask) == ('___', 3, 0, 0)
+    assert state.letter_positions == {'O': [0, 2], 'V': [1]}
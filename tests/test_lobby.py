@@ -0,0 +1,54 @@
+from lobby import LobbyIndex
+
+
+def entry(room_id, players=1, max_players=2, status='waiting'):
+    return {'room_id': room_id, 'players': players, 'max_players': max_players, 'usernames': [], 'status': status}
+
+
+def test_pages_in_creation_order():
+    lobby = LobbyIndex()
+    for index in range(7):
+        lobby.update(f'r{index}', 'hangman', entry(f'r{index}'))
+    lobby.update('t0', 'tic-tac-toe', entry('t0'))
+    rooms, total = lobby.page('hangman', 0, 3)
+    assert [room['room_id'] for room in rooms] == ['r0', 'r1', 'r2'] and total == 7
+    rooms, total = lobby.page('hangman', 6, 3)
+    assert [room['room_id'] for room in rooms] == ['r6'] and total == 7
+    assert lobby.page('hangman', 10, 3) == ([], 7)
+    assert lobby.page('rock-paper-scissors') == ([], 0)
+    # Atualizar uma sala não muda a posição dela.
+    lobby.update('r0', 'hangman', entry('r0', players=1, status='playing', max_players=4))
+    assert lobby.page('hangman', 0, 1)[0][0]['status'] == 'playing'
+
+
+def test_only_open_rooms_are_listed():
+    lobby = LobbyIndex(update_interval=0)
+    lobby.update('open', 'hangman', entry('open', players=2, max_players=3))
+    assert not lobby.update('full', 'hangman', entry('full', players=2, max_players=2))
+    assert [room['room_id'] for room in lobby.page('hangman')[0]] == ['open']
+    lobby.drain_changes(now=1)
+
+    # A sala que lota sai do índice como remoção; vagando um lugar, volta.
+    lobby.update('open', 'hangman', entry('open', players=3, max_players=3))
+    assert lobby.page('hangman') == ([], 0)
+    assert lobby.drain_changes(now=2) == {'hangman': {'updated': [], 'removed': ['open'], 'total': 0}}
+    lobby.update('open', 'hangman', entry('open', players=2, max_players=3))
+    assert lobby.drain_changes(now=3)['hangman']['updated'][0]['room_id'] == 'open'
+
+
+def test_changes_are_coalesced_per_room_and_throttled():
+    lobby = LobbyIndex(update_interval=1.0)
+    lobby.update('a', 'hangman', entry('a'))
+    lobby.update('b', 'hangman', entry('b'))
+    lobby.update('t', 'tic-tac-toe', entry('t'))
+    assert not lobby.update('a', 'hangman', entry('a'))
+    diffs = lobby.drain_changes(now=10)
+    assert diffs['hangman'] == {'updated': [entry('a'), entry('b')], 'removed': [], 'total': 2}
+    assert diffs['tic-tac-toe']['total'] == 1
+
+    lobby.update('a', 'hangman', entry('a', status='playing'))
+    lobby.remove('a')
+    assert lobby.drain_changes(now=10.5) == {}
+    assert lobby.drain_changes(now=11) == {'hangman': {'updated': [], 'removed': ['a'], 'total': 1}}
+    assert lobby.drain_changes(now=20) == {}
+    assert not lobby.remove('a') and lobby.room_count() == 2
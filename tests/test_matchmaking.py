@@ -0,0 +1,60 @@
+from matchmaking import MatchmakingQueue
+
+
+def test_second_player_is_paired_with_the_first():
+    queue = MatchmakingQueue()
+    assert queue.enqueue('a', 'tic-tac-toe', 'ana') is None
+    assert queue.is_waiting('a') and queue.waiting_count('tic-tac-toe') == 1
+    assert queue.enqueue('b', 'tic-tac-toe', 'bia') == ('a', 'ana')
+    # Pareados saem da fila; quem chegou depois nunca entrou nela.
+    assert queue.waiting_count() == 0 and not queue.is_waiting('a') and not queue.is_waiting('b')
+    assert queue.queues == {} and queue.sid_to_key == {}
+
+
+def test_first_waiting_player_is_matched_first():
+    queue = MatchmakingQueue()
+    # Três jogos diferentes: cada um tem a própria fila.
+    assert queue.enqueue('a', 'tic-tac-toe', 'ana') is None
+    assert queue.enqueue('b', 'hangman', 'bia') is None
+    assert queue.enqueue('c', 'rock-paper-scissors', 'caio') is None
+    assert queue.waiting_count() == 3 and queue.waiting_count('hangman') == 1
+    assert queue.enqueue('d', 'hangman', 'duda') == ('b', 'bia')
+    assert queue.enqueue('e', 'tic-tac-toe', 'eva') == ('a', 'ana')
+    assert queue.waiting_count() == 1 and queue.is_waiting('c')
+    assert not queue.is_waiting('a') and not queue.is_waiting('e')
+
+
+def test_buckets_are_separate_queues():
+    queue = MatchmakingQueue()
+    assert queue.enqueue('a', 'hangman', 'ana', bucket='sa') is None
+    assert queue.enqueue('b', 'hangman', 'bia', bucket='eu') is None
+    assert queue.enqueue('c', 'hangman', 'caio') is None
+    assert queue.enqueue('d', 'hangman', 'duda', bucket='eu') == ('b', 'bia')
+    assert queue.waiting_count('hangman') == 2
+
+
+def test_cancel_removes_from_the_middle_of_the_queue():
+    queue = MatchmakingQueue()
+    for sid in ('a', 'b', 'c'):
+        # Buckets distintos para enfileirar sem parear.
+        assert queue.enqueue(sid, 'hangman', sid, bucket=sid) is None
+    assert queue.cancel('b')
+    assert not queue.cancel('b') and not queue.cancel('nobody')
+    assert queue.waiting_count() == 2 and not queue.is_waiting('b')
+    # A fila do bucket cancelado some; quem entra nele espera de novo.
+    assert queue.enqueue('d', 'hangman', 'd', bucket='b') is None
+
+
+def test_cancelled_player_is_skipped_in_fifo_order():
+    queue = MatchmakingQueue()
+    queue.enqueue('a', 'tic-tac-toe', 'ana', bucket='x')
+    queue.cancel('a')
+    queue.enqueue('b', 'tic-tac-toe', 'bia', bucket='x')
+    assert queue.enqueue('c', 'tic-tac-toe', 'caio', bucket='x') == ('b', 'bia')
+
+
+def test_enqueue_twice_does_not_duplicate():
+    queue = MatchmakingQueue()
+    assert queue.enqueue('a', 'hangman', 'ana') is None
+    assert queue.enqueue('a', 'hangman', 'ana') is None
+    assert queue.waiting_count() == 1
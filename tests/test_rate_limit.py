@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from rate_limit import DEFAULT_RATE_LIMITS, RateLimiter, parse_rate_limits
+
+
+def test_burst_then_refill():
+    limiter = RateLimiter({'move': (2, 3)})
+    assert [limiter.allow('s', 'move', now=0) for _ in range(4)] == [True, True, True, False]
+    # 2 tokens por segundo: meio segundo devolve um token.
+    assert not limiter.allow('s', 'move', now=0.25)
+    assert limiter.allow('s', 'move', now=0.5)
+    assert not limiter.allow('s', 'move', now=0.5)
+    # A rajada nunca passa do máximo, mesmo depois de muito tempo parado.
+    assert [limiter.allow('s', 'move', now=100) for _ in range(4)] == [True, True, True, False]
+
+
+def test_buckets_are_per_sid_and_event():
+    limiter = RateLimiter({'move': (1, 1), 'chat': (1, 1)})
+    assert limiter.allow('a', 'move', now=0) and not limiter.allow('a', 'move', now=0)
+    assert limiter.allow('b', 'move', now=0)
+    assert limiter.allow('a', 'chat', now=0)
+    assert limiter.allow('a', 'unlimited', now=0) and limiter.allow('a', 'unlimited', now=0)
+
+
+def test_notify_once_per_rejection_streak_and_retry_after():
+    limiter = RateLimiter({'move': (2, 1)})
+    limiter.allow('s', 'move', now=0)
+    assert not limiter.allow('s', 'move', now=0)
+    assert limiter.should_notify('s', 'move') and not limiter.should_notify('s', 'move')
+    assert limiter.retry_after('s', 'move') == pytest.approx(0.5)
+    assert limiter.allow('s', 'move', now=1)
+    assert not limiter.allow('s', 'move', now=1)
+    assert limiter.should_notify('s', 'move')
+
+
+def test_forget_drops_the_sid():
+    limiter = RateLimiter({'move': (1, 1)})
+    limiter.allow('s', 'move', now=0)
+    limiter.forget('s')
+    assert limiter.tracked_sids() == 0
+    assert not limiter.should_notify('s', 'move') and limiter.retry_after('s', 'move') == 0.0
+    assert limiter.allow('s', 'move', now=0)
+
+
+def test_concurrent_takes_never_exceed_the_burst():
+    limiter = RateLimiter({'move': (0, 500)})
+    allowed = []
+
+    def take():
+        allowed.append(sum(limiter.allow('s', 'move') for _ in range(200)))
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == 500
+
+
+@pytest.mark.parametrize('spec, expected', [
+    (None, DEFAULT_RATE_LIMITS),
+    ('off', {}),
+    ('chat_message=10/20', dict(DEFAULT_RATE_LIMITS, chat_message=(10.0, 20.0))),
+    ('rps_choice=3', dict(DEFAULT_RATE_LIMITS, rps_choice=(3.0, 3.0))),
+    ('rps_choice=off', {event: limit for event, limit in DEFAULT_RATE_LIMITS.items() if event != 'rps_choice'}),
+])
+def test_parse_rate_limits(spec, expected):
+    assert parse_rate_limits(spec) == expected
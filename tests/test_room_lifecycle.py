@@ -0,0 +1,67 @@
+from room_lifecycle import RoomLifecycle
+
+
+def make_lifecycle(**kwargs):
+    return RoomLifecycle(idle_timeout=100, waiting_timeout=50, finished_timeout=10, **kwargs)
+
+
+def test_rooms_expire_by_status_timeout():
+    lifecycle = make_lifecycle()
+    lifecycle.touch('w', 'waiting', now=0)
+    lifecycle.touch('p', 'playing', now=0)
+    lifecycle.touch('f', 'finished', now=0)
+    assert lifecycle.pop_expired(now=9) == []
+    assert lifecycle.pop_expired(now=10) == [('f', 'finished')]
+    assert lifecycle.pop_expired(now=50) == [('w', 'waiting')]
+    assert lifecycle.pop_expired(now=99) == []
+    assert lifecycle.pop_expired(now=100) == [('p', 'playing')]
+    # Uma sala vencida sai do heap: não é devolvida de novo.
+    assert lifecycle.pop_expired(now=1000) == []
+
+
+def test_activity_pushes_the_deadline_without_a_new_heap_entry():
+    lifecycle = make_lifecycle()
+    lifecycle.touch('p', 'playing', now=0)
+    for now in range(1, 90):
+        lifecycle.touch('p', 'playing', now=now)
+    assert len(lifecycle.heap) == 1
+    # A entrada original vence em 100, mas a sala foi usada em 89: é reagendada.
+    assert lifecycle.pop_expired(now=100) == []
+    assert lifecycle.scheduled['p'] == 189
+    assert lifecycle.pop_expired(now=189) == [('p', 'playing')]
+
+
+def test_shorter_deadline_gets_its_own_heap_entry():
+    lifecycle = make_lifecycle()
+    lifecycle.touch('r', 'playing', now=0)
+    lifecycle.touch('r', 'finished', now=5)
+    assert lifecycle.pop_expired(now=15) == [('r', 'finished')]
+    # A entrada antiga (100) ficou obsoleta e é ignorada.
+    assert lifecycle.pop_expired(now=100) == []
+
+
+def test_forgotten_rooms_never_expire():
+    lifecycle = make_lifecycle()
+    lifecycle.touch('r', 'waiting', now=0)
+    lifecycle.forget('r')
+    assert lifecycle.pop_expired(now=1000) == []
+    assert lifecycle.tracked_count() == 0 and lifecycle.last_activity('r') is None
+
+
+def test_room_cap_and_eviction_order():
+    lifecycle = make_lifecycle(max_rooms=3)
+    assert not lifecycle.is_full(2) and lifecycle.is_full(3)
+    assert not make_lifecycle().is_full(10 ** 6)
+
+    lifecycle.touch('a', 'waiting', now=0)
+    lifecycle.touch('b', 'waiting', now=1)
+    lifecycle.touch('c', 'playing', now=2)
+    assert lifecycle.oldest_waiting() == 'a'
+    # Atividade move a sala para o fim; sala em jogo nunca é candidata.
+    lifecycle.touch('a', 'waiting', now=3)
+    assert lifecycle.oldest_waiting() == 'b'
+    lifecycle.touch('b', 'playing', now=4)
+    assert lifecycle.oldest_waiting() == 'a'
+    lifecycle.forget('a')
+    assert lifecycle.oldest_waiting() is None
+    assert sorted(lifecycle.room_ids()) == ['b', 'c']
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from games import TicTacToeState
+from room_store import InMemoryRoomStore, RedisRoomStore
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+def make_room():
+    state = TicTacToeState()
+    state.assign_players('sid-a', 'sid-b')
+    state.current_turn = 'sid-a'
+    state.x_bits = 0b101
+    return {'game_type': 'tic-tac-toe', 'players': ['sid-a', 'sid-b'], 'game_state': state}
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def store(request):
+    if request.param == 'memory':
+        return InMemoryRoomStore()
+    return RedisRoomStore(fakeredis.FakeRedis())
+
+
+def test_room_round_trip(store):
+    store.save_room('R1', make_room())
+    room = store.get_room('R1')
+    assert room['players'] == ['sid-a', 'sid-b']
+    assert isinstance(room['game_state'], TicTacToeState)
+    assert (room['game_state'].x_bits, room['game_state'].current_turn) == (0b101, 'sid-a')
+    assert store.room_exists('R1') and store.room_count() == 1
+
+    store.delete_room('R1')
+    assert store.get_room('R1') is None
+    assert not store.room_exists('R1') and store.room_count() == 0
+
+
+def test_users(store):
+    store.set_user('sid-a', {'username': 'ana', 'room_id': 'R1'})
+    assert store.get_user('sid-a') == {'username': 'ana', 'room_id': 'R1'}
+    assert store.user_count() == 1
+    store.delete_user('sid-a')
+    assert store.get_user('sid-a') is None and store.user_count() == 0
+
+
+def test_redis_store_is_shared_between_workers():
+    server = fakeredis.FakeServer()
+    worker_a = RedisRoomStore(fakeredis.FakeRedis(server=server))
+    worker_b = RedisRoomStore(fakeredis.FakeRedis(server=server))
+    assert worker_a.shared and worker_a.ping()
+
+    worker_a.save_room('R1', make_room())
+    assert worker_b.get_room('R1')['game_state'].current_turn == 'sid-a'
+
+    # O lock de sala vale entre workers.
+    with worker_a.lock('R1'):
+        assert not worker_b.lock('R1').acquire(blocking=False)
+    lock = worker_b.lock('R1')
+    assert lock.acquire(blocking=False)
+    lock.release()
+
+
+def test_room_lock_is_reentrant(store):
+    # Os dois backends aceitam um lock de sala aninhado na mesma thread.
+    with store.lock('R1'):
+        with store.lock('R1'):
+            pass
+        other = []
+        thread = threading.Thread(target=lambda: other.append(store.lock('R1').acquire(blocking=False)))
+        thread.start()
+        thread.join()
+        assert other == [False]
+    lock = store.lock('R1')
+    assert lock.acquire(blocking=False)
+    lock.release()
+
+
+def test_redis_lock_lost_after_timeout_is_reported():
+    server = fakeredis.FakeServer()
+    lost = []
+    worker_a = RedisRoomStore(fakeredis.FakeRedis(server=server), lock_timeout=0.05, on_lock_lost=lost.append)
+    worker_b = RedisRoomStore(fakeredis.FakeRedis(server=server))
+    with worker_a.lock('R1'):
+        time.sleep(0.1)
+        # O prazo venceu: outro worker entra na sala.
+        assert worker_b.lock('R1').acquire(blocking=False)
+    assert lost == ['R1']
+
+
+def test_redis_lock_release_without_acquire_fails():
+    with pytest.raises(RuntimeError):
+        RedisRoomStore(fakeredis.FakeRedis()).lock('R1').release()
@@ -0,0 +1,123 @@
+import pytest
+
+from timer_wheel import TimerWheel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_wheel(clock, size=8, **kwargs):
+    # tick de 0.25 s: potência de 2, então as somas do relógio são exatas.
+    wheel = TimerWheel(tick=0.25, size=size, clock=clock, **kwargs)
+    wheel.catch_up()
+    return wheel
+
+
+def run_until(wheel, clock, when):
+    clock.now = when
+    return wheel.catch_up()
+
+
+def test_fires_on_the_tick_of_its_deadline(clock):
+    wheel = make_wheel(clock)
+    fired = []
+    wheel.schedule('a', 1.0, fired.append, 'a')
+    assert run_until(wheel, clock, 0.75) == 3 and fired == []
+    assert run_until(wheel, clock, 1.0) == 1 and fired == ['a']
+    assert not wheel.is_scheduled('a') and wheel.pending_count() == 0
+
+
+@pytest.mark.parametrize('delay', [0, 0.1, 0.25])
+def test_short_delays_fire_on_the_next_tick(clock, delay):
+    wheel = make_wheel(clock)
+    fired = []
+    wheel.schedule('a', delay, fired.append, 'a')
+    run_until(wheel, clock, 0.25)
+    assert fired == ['a']
+
+
+@pytest.mark.parametrize('ticks', [7, 8, 9, 16, 17, 20, 41])
+def test_delays_longer_than_a_revolution(clock, ticks):
+    # Com 8 posições, 2 s é uma volta inteira da roda.
+    wheel = make_wheel(clock)
+    fired = []
+    wheel.schedule('a', ticks * 0.25, fired.append, 'a')
+    run_until(wheel, clock, (ticks - 1) * 0.25)
+    assert fired == []
+    run_until(wheel, clock, ticks * 0.25)
+    assert fired == ['a']
+
+
+def test_cancel_before_fire(clock):
+    wheel = make_wheel(clock)
+    fired = []
+    wheel.schedule('a', 0.5, fired.append, 'a')
+    wheel.schedule('b', 5.0, fired.append, 'b')
+    assert wheel.cancel('a') and wheel.cancel('b')
+    assert not wheel.cancel('a')
+    run_until(wheel, clock, 10.0)
+    assert fired == [] and wheel.pending_count() == 0
+
+
+def test_same_key_replaces_the_previous_timer(clock):
+    wheel = make_wheel(clock)
+    fired = []
+    wheel.schedule('a', 0.5, fired.append, 'first')
+    wheel.schedule('a', 3.0, fired.append, 'second')
+    assert wheel.pending_count() == 1
+    run_until(wheel, clock, 2.75)
+    assert fired == []
+    run_until(wheel, clock, 3.0)
+    assert fired == ['second']
+
+
+def test_catch_up_runs_every_missed_tick_in_order(clock):
+    wheel = make_wheel(clock)
+    fired = []
+    for index in range(1, 6):
+        wheel.schedule(index, index * 0.25, fired.append, index)
+    assert run_until(wheel, clock, 1.3) == 5
+    assert fired == [1, 2, 3, 4, 5]
+
+
+def test_tick_hooks_run_every_tick_after_the_timers(clock):
+    wheel = make_wheel(clock)
+    calls = []
+    wheel.add_tick_hook(lambda: calls.append('hook'))
+    wheel.schedule('a', 0.5, calls.append, 'timer')
+    run_until(wheel, clock, 0.75)
+    assert calls == ['hook', 'timer', 'hook', 'hook']
+
+
+def test_callback_can_reschedule_itself(clock):
+    wheel = make_wheel(clock)
+    fired = []
+
+    def repeat():
+        # Instante do tick em andamento (o catch_up já aponta para o próximo).
+        fired.append(wheel.next_tick - wheel.tick)
+        if len(fired) < 3:
+            wheel.schedule('r', 0.5, repeat)
+    wheel.schedule('r', 0.5, repeat)
+    run_until(wheel, clock, 5.0)
+    assert fired == [0.5, 1.0, 1.5]
+
+
+def test_errors_go_to_on_error_and_the_wheel_keeps_running(clock):
+    errors = []
+    wheel = make_wheel(clock, on_error=lambda callback, exc: errors.append(str(exc)))
+    fired = []
+    wheel.schedule('bad', 0.25, lambda: 1 / 0)
+    wheel.schedule('good', 0.25, fired.append, 'good')
+    run_until(wheel, clock, 0.25)
+    assert errors == ['division by zero'] and fired == ['good']
@@ -0,0 +1,111 @@
+import math
+import threading
+import time
+
+from async_mode import start_daemon_task
+
+
+# --- Roda de Temporizadores ---
+# Uma única green thread avança a roda a cada `tick` segundos, para todas as
+# salas do worker, em vez de uma green thread dormindo por temporizador. Cada
+# posição da roda é um dicionário chave -> [voltas restantes, função, args]:
+# agendar e cancelar são O(1), e cada tick só percorre uma posição. Depois dos
+# temporizadores vencidos rodam os ganchos de tick, que enviam de uma vez o
+# que os handlers acumularam desde o tick anterior. O relógio (`clock`) pode ser
+# trocado: os testes avançam a roda com catch_up() sem dormir.
+
+class TimerWheel:
+    def __init__(self, tick=0.05, size=512, on_error=None, clock=time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self.next_tick = None
+        self.size = size
+        self.slots = [{} for _ in range(size)]
+        self.key_slots = {} # chave -> posição na roda
+        self.current = 0
+        self.tick_hooks = []
+        self.on_error = on_error
+        self._started = False
+        self._lock = threading.Lock()
+
+    def schedule(self, key, delay, callback, *args):
+        """Agenda `callback(*args)` para daqui a `delay` segundos; a mesma chave substitui o anterior."""
+        ticks = max(1, math.ceil(delay / self.tick))
+        with self._lock:
+            self._cancel(key)
+            position = (self.current + ticks) % self.size
+            self.slots[position][key] = [(ticks - 1) // self.size, callback, args]
+            self.key_slots[key] = position
+
+    def cancel(self, key):
+        with self._lock:
+            return self._cancel(key)
+
+    def _cancel(self, key):
+        position = self.key_slots.pop(key, None)
+        if position is None:
+            return False
+        del self.slots[position][key]
+        return True
+
+    def is_scheduled(self, key):
+        return key in self.key_slots
+
+    def pending_count(self):
+        return len(self.key_slots)
+
+    def add_tick_hook(self, hook):
+        self.tick_hooks.append(hook)
+
+    def advance(self):
+        # Os vencidos saem da roda sob o lock, mas rodam fora dele: podem agendar de novo.
+        with self._lock:
+            self.current = (self.current + 1) % self.size
+            slot = self.slots[self.current]
+            due = []
+            for key, entry in slot.items():
+                if entry[0]:
+                    entry[0] -= 1
+                else:
+                    due.append(key)
+            for index, key in enumerate(due):
+                due[index] = slot.pop(key)
+                del self.key_slots[key]
+        for _, callback, args in due:
+            self._call(callback, *args)
+        for hook in self.tick_hooks:
+            self._call(hook)
+
+    def catch_up(self):
+        """Avança um tick por intervalo vencido no relógio; retorna quantos ticks rodaram."""
+        now = self.clock()
+        if self.next_tick is None:
+            self.next_tick = now + self.tick
+            return 0
+        ticks = 0
+        while now >= self.next_tick:
+            self.next_tick += self.tick
+            self.advance()
+            ticks += 1
+        return ticks
+
+    def _call(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as exc:
+            if self.on_error is None:
+                raise
+            self.on_error(callback, exc)
+
+    def start(self, socketio):
+        """Inicia a green thread que avança a roda; ticks atrasados são recuperados em seguida."""
+        if self._started:
+            return
+        self._started = True
+        self.catch_up()
+
+        def run():
+            while True:
+                socketio.sleep(max(0.0, self.next_tick - self.clock()))
+                self.catch_up()
+        start_daemon_task(socketio, run)
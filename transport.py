@@ -0,0 +1,55 @@
+import json
+
+
+# --- Transporte Socket.IO ---
+# Serializador e compressão usados nas conexões. Com 'msgpack' os pacotes vão
+# em binário (MessagePack) e as chaves repetidas dos payloads deixam de ir
+# entre aspas; o cliente precisa do bundle do socket.io com o parser msgpack,
+# escolhido pelo template. A compressão HTTP do Engine.IO vale para as
+# respostas de long-polling acima do limiar; no WebSocket a compressão é a
+# extensão permessage-deflate, negociada pelo servidor (eventlet) quando o
+# navegador a oferece.
+
+SERIALIZERS = ('json', 'msgpack')
+
+CLIENT_BUNDLES = {
+    'json': 'https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.7.5/socket.io.min.js',
+    'msgpack': 'https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.7.5/socket.io.msgpack.min.js',
+}
+
+
+def socketio_transport_options(serializer='json', http_compression=True, compression_threshold=1024):
+    """Argumentos do SocketIO para o serializador e a compressão escolhidos."""
+    if serializer not in SERIALIZERS:
+        raise ValueError(f'SOCKETIO_SERIALIZER inválido: {serializer!r} (use {" ou ".join(SERIALIZERS)}).')
+    options = {'http_compression': http_compression, 'compression_threshold': compression_threshold}
+    if serializer == 'msgpack':
+        try:
+            import msgpack # noqa: F401
+        except ImportError as exc:
+            raise RuntimeError('O pacote "msgpack" é necessário para SOCKETIO_SERIALIZER=msgpack.') from exc
+        options['serializer'] = 'msgpack'
+    return options
+
+
+def payload_size_function(serializer='json'):
+    """Função que mede o tamanho de um payload no serializador em uso (para as métricas)."""
+    if serializer == 'msgpack':
+        import msgpack
+        return lambda payload: len(msgpack.packb(payload, default=str))
+    return lambda payload: len(json.dumps(payload, separators=(',', ':'), default=str))
+
+
+class WebSocketDeflateFilter:
+    """Middleware WSGI que impede a negociação do permessage-deflate.
+
+    O pedido de upgrade chega sem o cabeçalho Sec-WebSocket-Extensions e o
+    servidor responde sem a extensão; o restante da requisição não muda.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        environ.pop('HTTP_SEC_WEBSOCKET_EXTENSIONS', None)
+        return self.wsgi_app(environ, start_response)